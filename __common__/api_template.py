@@ -6,7 +6,7 @@
 """
 
 # Libraries
-import time, re
+import os, time, re
 from progressor import Progressor
 from general import safe_mkdir
 
@@ -18,7 +18,8 @@ RESULTS_DIR = "./results"
 class APITemplate:
 
     # Constructor
-    def __init__(self, title="", display=2):
+    #   output_path: directory to write the results to (None for a timestamped directory in the results directory)
+    def __init__(self, title="", display=2, output_path=None):
         
         # Prepare progressor
         title = "" if title == "" else f"_{title}"
@@ -28,11 +29,11 @@ class APITemplate:
         # Define paths
         self.input_path  = INPUT_DIR
         self.output_dir  = time.strftime("%y%m%d%H%M%S", time.localtime(time.time()))
-        self.output_path = f"{RESULTS_DIR}/{self.output_dir}{title}"
+        self.output_path = f"{RESULTS_DIR}/{self.output_dir}{title}" if output_path == None else output_path
         
         # Create directories
         safe_mkdir(RESULTS_DIR)
-        safe_mkdir(self.output_path)
+        os.makedirs(self.output_path, exist_ok=True)
 
     # Adds to the progressor
     def add(self, message):
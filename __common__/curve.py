@@ -7,13 +7,94 @@
 
 # Libraries
 import numpy as np
+from types import MappingProxyType
 
-# Returns a curve dictionary
-def get_curve(x_list, y_list, info_dict={}):
-    curve = {"x": x_list, "y": y_list}
-    for key in info_dict.keys():
-        curve[key] = info_dict[key]
-    return curve
+# The Curve class (contiguous x and y arrays, with conditions that are accessed like a dictionary)
+#   (the conditions are immutable, so that copies and views of a curve can share them)
+class Curve:
+
+    __slots__ = ("x", "y", "info")
+
+    # Constructor
+    #   dtype: type of the x and y arrays (e.g., np.float32 to halve the memory)
+    def __init__(self, x_list=[], y_list=[], info_dict={}, dtype=np.float64):
+        self.x = np.ascontiguousarray(x_list, dtype=dtype)
+        self.y = np.ascontiguousarray(y_list, dtype=dtype)
+        self.info = info_dict if isinstance(info_dict, MappingProxyType) else MappingProxyType(dict(info_dict))
+
+    # Returns the x or y array, or a condition
+    def __getitem__(self, key):
+        if key == "x":
+            return self.x
+        if key == "y":
+            return self.y
+        return self.info[key]
+
+    # Replaces the x or y array (converted to the type of the curve), or a condition (by replacing the conditions)
+    def __setitem__(self, key, value):
+        if key == "x":
+            self.x = np.ascontiguousarray(value, dtype=self.x.dtype)
+        elif key == "y":
+            self.y = np.ascontiguousarray(value, dtype=self.y.dtype)
+        else:
+            self.info = MappingProxyType({**self.info, key: value})
+
+    # Checks whether the curve has a field
+    def __contains__(self, key):
+        return key in ["x", "y"] or key in self.info
+
+    # Iterates through the fields
+    def __iter__(self):
+        return iter(self.keys())
+
+    # Returns the number of fields
+    def __len__(self):
+        return 2 + len(self.info)
+
+    # Returns the fields (x and y first)
+    def keys(self):
+        return ["x", "y"] + list(self.info.keys())
+
+    # Returns the values of the fields
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    # Returns the fields and their values
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    # Returns the value of a field (or a default value if it does not exist)
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    # Returns a copy of the curve (the conditions are shared)
+    def copy(self):
+        return Curve(self.x.copy(), self.y.copy(), self.info, self.x.dtype)
+
+    # Returns a view of a range of the data (without copying)
+    def view(self, start=None, end=None):
+        return Curve(self.x[start:end], self.y[start:end], self.info, self.x.dtype)
+
+    # Returns the curve with the data converted to another type
+    def astype(self, dtype):
+        return Curve(self.x, self.y, self.info, dtype)
+
+    # Copies the data (for copy.deepcopy)
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    # Reduces the curve to its data and conditions (for pickling)
+    def __reduce__(self):
+        return (Curve, (self.x, self.y, dict(self.info), self.x.dtype))
+
+    # Represents the curve
+    def __repr__(self):
+        return f"Curve({len(self.x)} points, {dict(self.info)})"
+
+# Returns a curve
+#   dtype: type of the x and y arrays
+def get_curve(x_list, y_list, info_dict={}, dtype=np.float64):
+    return Curve(x_list, y_list, info_dict, dtype)
 
 # Returns the coordinates of non-outliers (good to use with derivatives)
 def exclude_outliers(x_list, y_list):
@@ -30,6 +30,10 @@ class Interpolator:
     def evaluate(self, x_list):
         return list(splev(x_list, self.spl))
 
+    # Evaluate (as an array)
+    def evaluate_array(self, x_array):
+        return splev(x_array, self.spl)
+
     # Tests the interpolation by plotting
     def __test__(self, path):
         plt.scatter(self.thin_x_list, self.thin_y_list, color="b")
@@ -0,0 +1,108 @@
+"""
+ Title:         Stopwatch
+ Description:   For timing the stages of a process (with counts, totals, and percentiles)
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import json, math, threading, time
+
+# Constants
+MIN_LOG_DURATION = -7   # durations are binned from 10^-7 s
+MAX_LOG_DURATION = 5    # to 10^5 s
+BINS_PER_DECADE  = 20
+NUM_BINS         = (MAX_LOG_DURATION - MIN_LOG_DURATION) * BINS_PER_DECADE
+PERCENTILES      = [50, 90, 99]
+
+# Timings of each stage (name -> [count, total, max, histogram of durations])
+timings = {}
+lock = threading.Lock()
+enabled = True
+
+# Enables or disables timing (disabled timers record nothing)
+def set_enabled(is_enabled):
+    global enabled
+    enabled = is_enabled
+
+# Returns whether timing is enabled
+def is_enabled():
+    return enabled
+
+# The Timer class (times the block of a with statement)
+class Timer:
+
+    # Constructor
+    def __init__(self, name):
+        self.name = name
+
+    # Starts timing
+    def __enter__(self):
+        if enabled:
+            self.start_time = time.perf_counter()
+        return self
+
+    # Stops timing and records the duration
+    def __exit__(self, *_):
+        if enabled:
+            record(self.name, time.perf_counter() - self.start_time)
+
+# Records the duration of a stage
+def record(name, duration):
+    index = math.floor((math.log10(max(duration, 1e-12)) - MIN_LOG_DURATION) * BINS_PER_DECADE)
+    index = min(max(index, 0), NUM_BINS - 1)
+    with lock:
+        timing = timings.get(name)
+        if timing == None:
+            timing = [0, 0.0, 0.0, [0] * NUM_BINS]
+            timings[name] = timing
+        timing[0] += 1
+        timing[1] += duration
+        timing[2] = max(timing[2], duration)
+        timing[3][index] += 1
+
+# Removes and returns the timings (e.g., to send them from a worker process)
+def pop_timings():
+    global timings
+    with lock:
+        popped_timings, timings = timings, {}
+    return popped_timings
+
+# Adds timings (e.g., from a worker process) to the timings
+def merge_timings(other_timings):
+    with lock:
+        for name, other_timing in other_timings.items():
+            timing = timings.get(name)
+            if timing == None:
+                timings[name] = [other_timing[0], other_timing[1], other_timing[2], list(other_timing[3])]
+                continue
+            timing[0] += other_timing[0]
+            timing[1] += other_timing[1]
+            timing[2] = max(timing[2], other_timing[2])
+            timing[3] = [timing[3][i] + other_timing[3][i] for i in range(NUM_BINS)]
+
+# Returns a summary of the timings of each stage (in seconds)
+def get_summary():
+    with lock:
+        items = [(name, timing[0], timing[1], timing[2], list(timing[3])) for name, timing in timings.items()]
+    summary = {}
+    for name, count, total, maximum, histogram in sorted(items, key=lambda item: -item[2]):
+        summary[name] = {"count": count, "total": total, "mean": total / count, "max": maximum}
+        for percentile in PERCENTILES:
+            summary[name][f"p{percentile}"] = min(get_percentile(histogram, count, percentile), maximum)
+    return summary
+
+# Returns a percentile of the durations in a histogram (the upper edge of the bin)
+def get_percentile(histogram, count, percentile):
+    target = percentile / 100 * count
+    cumulative = 0
+    for i in range(NUM_BINS):
+        cumulative += histogram[i]
+        if cumulative >= target:
+            return 10 ** (MIN_LOG_DURATION + (i + 1) / BINS_PER_DECADE)
+    return 10 ** MAX_LOG_DURATION
+
+# Writes the summary of the timings to a JSON file
+def write_timings(file_path):
+    with open(file_path, "w+") as file:
+        json.dump(get_summary(), file, indent=4)
@@ -6,12 +6,16 @@
 """
 
 # Libraries
-import os, sys
+import os, sys, math
+import numpy as np
+import multiprocessing as mp
 from copy import deepcopy
+from collections import OrderedDict
 
 # Helper libraries
 sys.path += ["../__common__"]
 from curve import get_curve
+from stopwatch import Timer, set_enabled, is_enabled, pop_timings, merge_timings
 
 # Constants
 MIN_DATA = 10
@@ -24,6 +28,8 @@ class Model:
         self.name = name
         self.param_info = param_info
         self.exp_curves = exp_curves
+        self.args = []
+        self.fidelity = 1.0
 
     # Returns the name of the model
     def get_name(self):
@@ -48,18 +54,42 @@ class Model:
     # Returns the experimental curves
     def get_exp_curves(self):
         return self.exp_curves
+
+    # Defines the arguments used to prepare the model
+    def set_args(self, args):
+        self.args = args
+
+    # Returns the arguments used to prepare the model
+    def get_args(self):
+        return self.args
     
+    # Defines the fidelity of the predictions (as a fraction of the full number of steps; solver tolerances are unchanged)
+    def set_fidelity(self, fidelity):
+        self.fidelity = fidelity
+
+    # Returns the fidelity of the predictions
+    def get_fidelity(self):
+        return self.fidelity
+
+    # Returns a number of steps scaled to the fidelity (with enough steps for a valid curve)
+    def get_num_steps(self, num_steps):
+        return max(round(num_steps * self.fidelity), MIN_DATA)
+
     # Prepares the model (placeholder)
     def prepare(self, args):
         raise NotImplementedError
 
     # Gets the predicted curves (to be overridden)
     def get_prd_curves(self):
-        return [get_curve([], []) for _ in range(len(self.exp_curves))] # do not remove [], []
+        return [get_curve([], []) for _ in range(len(self.exp_curves))]
 
-    # Gets the predicted curves for specified curves
+    # Gets the predicted curves for a matrix of parameters (one row per individual)
+    def get_prd_curves_batch(self, param_matrix):
+        return [self.get_prd_curves(*params) for params in param_matrix]
+
+    # Gets the predicted curves for specified curves (the experimental curves are swapped, not copied)
     def get_specified_prd_curves(self, params, exp_curves):
-        old_exp_curves = deepcopy(self.exp_curves)
+        old_exp_curves = self.exp_curves
         self.exp_curves = exp_curves
         prd_curves = self.get_prd_curves(*params)
         self.exp_curves = old_exp_curves
@@ -72,6 +102,219 @@ class Model:
                 return []
         return prd_curves
 
+# The Cached Model Class (memoises the predictions of a model)
+class CachedModel:
+
+    # Constructor
+    #   size:       maximum number of predictions to store (least recently used are evicted first)
+    #   tolerance:  relative tolerance that parameters are quantised to (0 for exact matches)
+    #   max_memory: maximum size of the stored curves in megabytes (least recently used are evicted first)
+    def __init__(self, model, size=1000, tolerance=0, max_memory=500):
+        self.model      = model
+        self.size       = size
+        self.tolerance  = tolerance
+        self.max_memory = max_memory
+        self.cache      = OrderedDict()
+        self.num_bytes  = {} # key -> size of the stored curves in bytes
+        self.total_bytes = 0
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+    # Passes everything else to the wrapped model
+    def __getattr__(self, name):
+        if name.startswith("__") or name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    # Returns the wrapped model
+    def get_model(self):
+        return self.model
+
+    # Gets the predicted curves
+    def get_prd_curves(self, *params):
+        return self.get_specified_prd_curves(params, self.model.get_exp_curves())
+
+    # Gets the predicted curves for specified curves
+    def get_specified_prd_curves(self, params, exp_curves):
+        key = self.get_key(params, exp_curves)
+        if self.lookup(key):
+            return deepcopy(self.cache[key])
+        prd_curves = self.model.get_specified_prd_curves(params, exp_curves)
+        self.store(key, prd_curves)
+        return prd_curves
+
+    # Gets the predicted curves for a matrix of parameters (only the uncached are passed on, once for duplicates)
+    #   (the cached curves are copied out before any are stored, as storing can evict them)
+    def get_prd_curves_batch(self, param_matrix):
+        key_list = [self.get_key(params, self.model.get_exp_curves()) for params in param_matrix]
+        prd_curves_list = [None] * len(key_list)
+        uncached_indexes = {} # key -> index of the first individual with the key
+        for i in range(len(key_list)):
+            if key_list[i] in uncached_indexes.keys():
+                self.hits += 1
+            elif self.lookup(key_list[i]):
+                prd_curves_list[i] = deepcopy(self.cache[key_list[i]])
+            else:
+                uncached_indexes[key_list[i]] = i
+        uncached_params = [param_matrix[i] for i in uncached_indexes.values()]
+        uncached_prd_curves_list = self.model.get_prd_curves_batch(uncached_params) if len(uncached_params) > 0 else []
+        uncached_prd_curves_dict = dict(zip(uncached_indexes.keys(), uncached_prd_curves_list))
+        for key, prd_curves in uncached_prd_curves_dict.items():
+            self.store(key, prd_curves)
+        for i in range(len(key_list)):
+            if key_list[i] in uncached_prd_curves_dict.keys():
+                prd_curves = uncached_prd_curves_dict[key_list[i]]
+                prd_curves_list[i] = prd_curves if i == uncached_indexes[key_list[i]] else deepcopy(prd_curves)
+        return prd_curves_list
+
+    # Checks whether the predicted curves for a set of parameters are cached
+    def is_cached(self, params):
+        key = self.get_key(params, self.model.get_exp_curves())
+        return key in self.cache.keys()
+
+    # Adds the predicted curves of a set of parameters (evaluated elsewhere) to the cache
+    def add_to_cache(self, params, prd_curves):
+        key = self.get_key(params, self.model.get_exp_curves())
+        if self.lookup(key):
+            return
+        self.store(key, prd_curves)
+
+    # Returns a summary of the cache
+    def get_cache_summary(self):
+        return {"size": len(self.cache), "megabytes": round(self.total_bytes / 1e6, 1), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    # Returns the key for a set of parameters and experimental curves (at the fidelity of the model)
+    def get_key(self, params, exp_curves):
+        params = tuple([quantise(param, self.tolerance) for param in params])
+        conditions = tuple([get_conditions(exp_curve) for exp_curve in exp_curves])
+        return (self.model.get_name(), self.model.get_fidelity(), params, conditions)
+
+    # Looks up a key and updates the counters
+    def lookup(self, key):
+        if key in self.cache.keys():
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    # Stores the predicted curves and evicts the least recently used if full
+    def store(self, key, prd_curves):
+        if key in self.cache.keys():
+            self.total_bytes -= self.num_bytes[key]
+        self.cache[key] = deepcopy(prd_curves)
+        self.num_bytes[key] = get_num_bytes(prd_curves)
+        self.total_bytes += self.num_bytes[key]
+        while len(self.cache) > self.size or (len(self.cache) > 1 and self.total_bytes > self.max_memory * 1e6):
+            evicted_key, _ = self.cache.popitem(last=False)
+            self.total_bytes -= self.num_bytes.pop(evicted_key)
+            self.evictions += 1
+
+# The Parallel Model Class (simulates the experimental curves of an evaluation across a pool of processes)
+class ParallelModel:
+
+    # Constructor
+    #   num_processes: number of processes to simulate the curves with
+    def __init__(self, model, num_processes=2):
+        self.model = model
+        self.num_processes = num_processes
+        self.pool = None
+        self.start()
+
+    # Starts the pool of processes (if it is not running)
+    def start(self):
+        if self.pool != None:
+            return
+        init_args = (self.model.get_name(), self.model.get_exp_curves(), self.model.get_args(), is_enabled())
+        self.pool = mp.Pool(self.num_processes, initialise_curve_worker, init_args)
+
+    # Passes everything else to the wrapped model
+    def __getattr__(self, name):
+        if name.startswith("__") or name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    # Returns the wrapped model
+    def get_model(self):
+        return self.model
+
+    # Gets the predicted curves
+    def get_prd_curves(self, *params):
+        return self.get_specified_prd_curves(params, self.model.get_exp_curves())
+
+    # Gets the predicted curves for specified curves (each curve is simulated by a process)
+    def get_specified_prd_curves(self, params, exp_curves):
+        return self.get_prd_curves_list([params], exp_curves)[0]
+
+    # Gets the predicted curves for a matrix of parameters (every curve of every individual is simulated together)
+    def get_prd_curves_batch(self, param_matrix):
+        return self.get_prd_curves_list(param_matrix, self.model.get_exp_curves())
+
+    # Simulates every curve for every set of parameters and returns the predicted curves of each set in order
+    #   (the predicted curves of a set are empty if any of its curves fails, as with the wrapped model)
+    #   (the pool of processes is restarted if the model is used after it is closed)
+    def get_prd_curves_list(self, params_list, exp_curves):
+        self.start()
+        tasks = [(list(params), exp_curve, self.model.get_fidelity()) for params in params_list for exp_curve in exp_curves]
+        results_timings = self.pool.map(predict_curve_in_worker, tasks)
+        prd_curve_list = []
+        for prd_curve, timings in results_timings:
+            merge_timings(timings)
+            prd_curve_list.append(prd_curve)
+        prd_curves_list = []
+        for i in range(len(params_list)):
+            prd_curves = prd_curve_list[i*len(exp_curves):(i+1)*len(exp_curves)]
+            prd_curves_list.append([] if None in prd_curves else prd_curves)
+        return prd_curves_list
+
+    # Closes the pool of processes
+    def close(self):
+        if self.pool == None:
+            return
+        self.pool.close()
+        self.pool.join()
+        self.pool = None
+
+# The model of a process simulating curves (each process holds its own)
+curve_worker_model = None
+
+# Prepares the model of a process simulating curves
+#   (the factory is imported here because it imports the models, which import this module)
+def initialise_curve_worker(model_name, exp_curves, args, timing_enabled):
+    global curve_worker_model
+    from __model_factory__ import get_model
+    set_enabled(timing_enabled)
+    curve_worker_model = get_model(model_name, exp_curves, args)
+
+# Simulates a curve using the model of the process (and returns its timings)
+#   (None is returned if the simulation fails)
+def predict_curve_in_worker(task):
+    params, exp_curve, fidelity = task
+    curve_worker_model.set_fidelity(fidelity)
+    prd_curves = curve_worker_model.get_specified_prd_curves(params, [exp_curve])
+    return prd_curves[0] if prd_curves != [] else None, pop_timings()
+
+# Quantises a value to a relative tolerance
+def quantise(value, tolerance):
+    if tolerance == 0 or value == 0:
+        return float(value)
+    precision = max(0, math.ceil(-math.log10(tolerance)))
+    return float(f"{value:.{precision}e}")
+
+# Returns the size of the data of predicted curves in bytes
+def get_num_bytes(prd_curves):
+    return sum([np.asarray(prd_curve["x"]).nbytes + np.asarray(prd_curve["y"]).nbytes for prd_curve in prd_curves])
+
+# Returns the conditions of a curve (i.e., everything besides the data)
+def get_conditions(curve):
+    conditions = [(key, curve[key]) for key in sorted(curve.keys()) if not key in ["x", "y"]]
+    x_end = curve["x"][-1] if len(curve["x"]) > 0 else None
+    return tuple(conditions + [("x_end", x_end)])
+
+# Returns a timer for the prediction of an experimental curve
+def time_curve(exp_curves, index):
+    title = exp_curves[index]["title"] if "title" in exp_curves[index].keys() else index+1
+    return Timer(f"curve {title}")
+
 # For blocking prints
 class BlockPrint:
     def __enter__(self):
@@ -30,5 +30,6 @@ def get_model(model_name, exp_curves, args=[]):
         VSHAI_S(exp_curves),
     )
     model = [model for model in model_list if model.get_name() == model_name][0]
+    model.set_args(args)
     model.prepare(args)
     return model
\ No newline at end of file
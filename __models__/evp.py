@@ -59,20 +59,21 @@ class EVP(model.Model):
             temp = self.exp_curves[i]["temp"]
             type = self.exp_curves[i]["type"]
 
-            # Get predictions
-            try:
-                if type == "creep":
-                    stress_max = self.exp_curves[i]["stress"]
-                    creep_results = drivers.creep(evp_model, stress_max, STRESS_RATE, HOLD, T=temp, verbose=False, check_dmg=False, dtol=0.95, nsteps_up=NUM_STEPS_UP, nsteps=NUM_STEPS, logspace=False)
-                    prd_curves[i]["x"] = list(creep_results['rtime'] / 3600)
-                    prd_curves[i]["y"] = list(creep_results['rstrain'])
-                elif type == "tensile":
-                    strain_rate = self.exp_curves[i]["strain_rate"] / 3600
-                    tensile_results = drivers.uniaxial_test(evp_model, erate=strain_rate, T=temp, emax=STRAIN_MAX, nsteps=NUM_STEPS)
-                    prd_curves[i]["x"] = list(tensile_results['strain'])
-                    prd_curves[i]["y"] = list(tensile_results['stress'])
-            except MaximumIterations:
-                return []
+            # Get predictions (and time them)
+            with model.time_curve(self.exp_curves, i):
+                try:
+                    if type == "creep":
+                        stress_max = self.exp_curves[i]["stress"]
+                        creep_results = drivers.creep(evp_model, stress_max, STRESS_RATE, HOLD, T=temp, verbose=False, check_dmg=False, dtol=0.95, nsteps_up=self.get_num_steps(NUM_STEPS_UP), nsteps=self.get_num_steps(NUM_STEPS), logspace=False)
+                        prd_curves[i]["x"] = creep_results['rtime'] / 3600
+                        prd_curves[i]["y"] = creep_results['rstrain']
+                    elif type == "tensile":
+                        strain_rate = self.exp_curves[i]["strain_rate"] / 3600
+                        tensile_results = drivers.uniaxial_test(evp_model, erate=strain_rate, T=temp, emax=STRAIN_MAX, nsteps=self.get_num_steps(NUM_STEPS))
+                        prd_curves[i]["x"] = tensile_results['strain']
+                        prd_curves[i]["y"] = tensile_results['stress']
+                except MaximumIterations:
+                    return []
 
         # Return predicted curves
         return prd_curves
\ No newline at end of file
@@ -7,6 +7,7 @@
 
 # Libraries
 import math
+import numpy as np
 import __model__ as model
 
 # Constants
@@ -31,7 +32,7 @@ class TH(model.Model):
 
     # Prepares the model
     def prepare(self, args):
-        self.time_limit_list = [exp_curve["x"][-1] for exp_curve in self.exp_curves]
+        pass
 
     # Gets the predicted curves
     def get_prd_curves(self, th_a, th_n, th_m):
@@ -42,16 +43,53 @@ class TH(model.Model):
             stress = self.exp_curves[i]["stress"]
 
             # Calculate predicted curve at each stress
-            for time in range(0, round(self.time_limit_list[i]), TIME_STEP):
+            x_list, y_list = [], []
+            for time in range(0, round(self.exp_curves[i]["x"][-1]), TIME_STEP):
                 th_strain = th_a*stress**th_n/(th_m+1)*time**(th_m+1)
                 if math.isnan(th_strain) or abs(th_strain) > UNEXPECTED_BIG_NUMBER:
                     break
-                prd_curves[i]["x"].append(time)
-                prd_curves[i]["y"].append(th_strain)
+                x_list.append(time)
+                y_list.append(th_strain)
+            prd_curves[i]["x"], prd_curves[i]["y"] = x_list, y_list
 
             # Ensure non-empty
             if len(prd_curves[i]["x"]) < MIN_DATA or len(prd_curves[i]["y"]) < MIN_DATA:
                 return []
 
         # Return predicted curves
-        return prd_curves
\ No newline at end of file
+        return prd_curves
+
+    # Gets the predicted curves for a matrix of parameters
+    def get_prd_curves_batch(self, param_matrix):
+
+        # Define parameters (population), stresses, and times as broadcastable arrays
+        param_matrix = np.array(param_matrix, dtype=float)
+        th_a, th_n, th_m = [param_matrix[:,j].reshape(-1,1,1) for j in range(3)]
+        stress = np.array([exp_curve["stress"] for exp_curve in self.exp_curves]).reshape(1,-1,1)
+        num_times_list = [len(range(0, round(exp_curve["x"][-1]), TIME_STEP)) for exp_curve in self.exp_curves]
+        time = np.arange(0, TIME_STEP*max(num_times_list+[0]), TIME_STEP).reshape(1,1,-1)
+
+        # Calculate strains for the population at each stress and time
+        with np.errstate(all="ignore"):
+            th_strain = th_a*stress**th_n/(th_m+1)*time**(th_m+1)
+        
+        # Identify where each curve ends (i.e., the first invalid strain or the time limit)
+        invalid = np.isnan(th_strain) | (np.abs(th_strain) > UNEXPECTED_BIG_NUMBER)
+        invalid |= time >= np.array(num_times_list).reshape(1,-1,1)*TIME_STEP
+        num_points = np.where(invalid.any(axis=2), invalid.argmax(axis=2), invalid.shape[2])
+        
+        # Construct the predicted curves for each individual
+        prd_curves_list = []
+        time_list = time.flatten().tolist()
+        for i in range(len(param_matrix)):
+            if (num_points[i] < MIN_DATA).any():
+                prd_curves_list.append([])
+                continue
+            prd_curves = super().get_prd_curves()
+            for j in range(len(prd_curves)):
+                prd_curves[j]["x"] = time_list[:num_points[i,j]]
+                prd_curves[j]["y"] = th_strain[i,j,:num_points[i,j]].tolist()
+            prd_curves_list.append(prd_curves)
+
+        # Return predicted curves
+        return prd_curves_list
\ No newline at end of file
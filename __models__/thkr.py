@@ -7,8 +7,10 @@
 
 # Libraries
 import math
+import numpy as np
 import __model__ as model
 from cmath import inf
+from curve import get_curve
 
 # Constants
 TIME_STEP = 5
@@ -47,6 +49,7 @@ class THKR(model.Model):
             stress = self.exp_curves[i]["stress"]
             
             # Calculate primary strain with TH model
+            x_list, y_list = [], []
             offset_time, offset_strain = 0, 0
             for time in range(0, TIME_LIMIT, TIME_STEP):
 
@@ -54,8 +57,8 @@ class THKR(model.Model):
                 th_strain = th_a*stress**th_n/(th_m+1)*time**(th_m+1)
                 if math.isnan(th_strain) or abs(th_strain) == inf:
                     break
-                prd_curves[i]["x"].append(time)
-                prd_curves[i]["y"].append(th_strain)
+                x_list.append(time)
+                y_list.append(th_strain)
 
                 # Start using KR model when strain rate < minimum creep rate
                 offset_time, offset_strain = time, th_strain
@@ -68,8 +71,60 @@ class THKR(model.Model):
                 kr_strain = kr_A*stress**kr_n*((1-(kr_phi+1)*kr_M*stress**kr_chi*kr_time)**((kr_phi+1-kr_n)/(kr_phi+1))-1)/(kr_M*stress**kr_chi*(kr_n-kr_phi-1))
                 if isinstance(kr_strain, complex) or math.isnan(kr_strain) or abs(kr_strain) == inf:
                     break
-                prd_curves[i]["x"].append(time)
-                prd_curves[i]["y"].append(kr_strain + offset_strain)
+                x_list.append(time)
+                y_list.append(kr_strain + offset_strain)
+            prd_curves[i]["x"], prd_curves[i]["y"] = x_list, y_list
 
         # Return list of curves
-        return prd_curves
\ No newline at end of file
+        return prd_curves
+
+    # Gets the predicted curves for a matrix of parameters
+    def get_prd_curves_batch(self, param_matrix):
+        param_matrix = np.array(param_matrix, dtype=float)
+        param_list = [param_matrix[:,j] for j in range(param_matrix.shape[1])]
+        return get_thkr_curves_batch(self.exp_curves, *param_list)
+
+# Gets the predicted curves of the THKR model for a population of parameters (one array per parameter)
+def get_thkr_curves_batch(exp_curves, th_a, th_n, th_m, kr_A, kr_n, kr_M, kr_phi, kr_chi):
+
+    # Define parameters (population), stresses, and times as broadcastable arrays
+    th_a, th_n, th_m, kr_A, kr_n, kr_M, kr_phi, kr_chi = [np.array(param, dtype=float).reshape(-1,1,1)
+                                                          for param in [th_a, th_n, th_m, kr_A, kr_n, kr_M, kr_phi, kr_chi]]
+    stress = np.array([exp_curve["stress"] for exp_curve in exp_curves]).reshape(1,-1,1)
+    time = np.arange(0, TIME_LIMIT, TIME_STEP).reshape(1,1,-1)
+    num_times = time.shape[2]
+    
+    # Calculate primary strain with TH model
+    with np.errstate(all="ignore"):
+        th_strain = th_a*stress**th_n/(th_m+1)*time**(th_m+1)
+        th_invalid = np.isnan(th_strain) | np.isinf(th_strain)
+        th_switch = (time > 0) & (th_a * stress**th_n * time**th_m < kr_A*stress**kr_n)
+    
+    # Identify when to start using KR model (i.e., when strain rate < minimum creep rate)
+    first_invalid = np.where(th_invalid.any(axis=2), th_invalid.argmax(axis=2), num_times)
+    first_switch = np.where(th_switch.any(axis=2), th_switch.argmax(axis=2), num_times)
+    num_th_points = np.minimum(first_switch+1, first_invalid)
+    offset_index = np.maximum(num_th_points-1, 0)
+
+    # Calculate secondary and tertiary strain with KR model (relative to the time of the switch)
+    with np.errstate(all="ignore"):
+        kr_time = time
+        kr_strain = kr_A*stress**kr_n*((1-(kr_phi+1)*kr_M*stress**kr_chi*kr_time)**((kr_phi+1-kr_n)/(kr_phi+1))-1)/(kr_M*stress**kr_chi*(kr_n-kr_phi-1))
+        kr_invalid = np.isnan(kr_strain) | np.isinf(kr_strain)
+    first_kr_invalid = np.where(kr_invalid.any(axis=2), kr_invalid.argmax(axis=2), num_times)
+    num_kr_points = np.minimum(first_kr_invalid, num_times-offset_index)
+
+    # Construct the predicted curves for each individual
+    prd_curves_list = []
+    time = time.flatten()
+    for i in range(th_strain.shape[0]):
+        prd_curves = [get_curve([], []) for _ in range(len(exp_curves))]
+        for j in range(len(exp_curves)):
+            num_th, offset, num_kr = num_th_points[i,j], offset_index[i,j], num_kr_points[i,j]
+            offset_strain = th_strain[i,j,offset] if num_th > 0 else 0
+            prd_curves[j]["x"] = time[:num_th].tolist() + time[offset:offset+num_kr].tolist()
+            prd_curves[j]["y"] = th_strain[i,j,:num_th].tolist() + (kr_strain[i,j,:num_kr] + offset_strain).tolist()
+        prd_curves_list.append(prd_curves)
+    
+    # Return list of curves for each individual
+    return prd_curves_list
\ No newline at end of file
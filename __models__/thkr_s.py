@@ -7,8 +7,10 @@
 
 # Libraries
 import math
+import numpy as np
 import __model__ as model
 from cmath import inf
+from thkr import get_thkr_curves_batch
 
 # Constants
 TIME_STEP = 5
@@ -49,6 +51,7 @@ class THKR_S(model.Model):
             stress = self.exp_curves[i]["stress"]
             
             # Calculate primary strain with TH model
+            x_list, y_list = [], []
             offset_time, offset_strain = 0, 0
             for time in range(0, TIME_LIMIT, TIME_STEP):
 
@@ -56,8 +59,8 @@ class THKR_S(model.Model):
                 th_strain = self.th_a*stress**self.th_n/(self.th_m+1)*time**(self.th_m+1)
                 if math.isnan(th_strain) or abs(th_strain) == inf:
                     break
-                prd_curves[i]["x"].append(time)
-                prd_curves[i]["y"].append(th_strain)
+                x_list.append(time)
+                y_list.append(th_strain)
 
                 # Start using KR model when strain rate < minimum creep rate
                 offset_time, offset_strain = time, th_strain
@@ -70,8 +73,16 @@ class THKR_S(model.Model):
                 kr_strain = kr_A*stress**kr_n*((1-(kr_phi+1)*kr_M*stress**kr_chi*kr_time)**((kr_phi+1-kr_n)/(kr_phi+1))-1)/(kr_M*stress**kr_chi*(kr_n-kr_phi-1))
                 if isinstance(kr_strain, complex) or math.isnan(kr_strain) or abs(kr_strain) == inf:
                     break
-                prd_curves[i]["x"].append(time)
-                prd_curves[i]["y"].append(kr_strain + offset_strain)
+                x_list.append(time)
+                y_list.append(kr_strain + offset_strain)
+            prd_curves[i]["x"], prd_curves[i]["y"] = x_list, y_list
 
         # Return list of curves
-        return prd_curves
\ No newline at end of file
+        return prd_curves
+
+    # Gets the predicted curves for a matrix of parameters
+    def get_prd_curves_batch(self, param_matrix):
+        param_matrix = np.array(param_matrix, dtype=float)
+        kr_list = [param_matrix[:,j] for j in range(param_matrix.shape[1])]
+        th_list = [np.full(len(param_matrix), th_param) for th_param in [self.th_a, self.th_n, self.th_m]]
+        return get_thkr_curves_batch(self.exp_curves, *th_list, *kr_list)
\ No newline at end of file
@@ -14,6 +14,7 @@ import modules.param_changer as param_changer
 sys.path += ["../__common__", "../__models__"]
 from api_template import APITemplate
 from __model_factory__ import get_model
+from __model__ import ParallelModel
 from curve import get_curve
 
 # API Class
@@ -31,9 +32,12 @@ class API(APITemplate):
         self.curve_list.append(curve)
 
     # Defines the model
-    def define_model(self, model_name=""):
+    #   num_processes: number of processes to simulate the curves of each prediction with (1 to simulate them in turn)
+    def define_model(self, model_name="", num_processes=1):
         self.add(f"Defining the {model_name} model")
         self.model = get_model(model_name, self.curve_list)
+        if num_processes > 1:
+            self.model = ParallelModel(self.model, num_processes)
 
     # Assesses the failure points for individual parameters
     def locate_failure(self, dependency=False, trials=10):
@@ -44,9 +48,16 @@ class API(APITemplate):
             self.add(f"Locates model failures for individual parameter")
             domain_explorer.assess_individual(self.model, self.get_output(f"plot_{self.plot_count}"), trials)
         self.plot_count += 1
+        self.close_model()
     
     # Investigates the effects of changing individual parameters
     def param_effects(self, base_params, change=0.1, steps=3):
         self.add(f"Investigating the effects of changing parameters")
         param_changer.investigate_params(self.model, base_params, change, steps, self.get_output(f"plot_{self.plot_count}"))
-        self.plot_count += 1
\ No newline at end of file
+        self.plot_count += 1
+        self.close_model()
+
+    # Closes the processes of the model (if it simulates its curves in parallel)
+    def close_model(self):
+        if hasattr(self.model, "close"):
+            self.model.close()
\ No newline at end of file
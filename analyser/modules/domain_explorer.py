@@ -39,7 +39,7 @@ def assess_individual(model, output_path, trials=10):
         curve = {"x": curve[0]["x"], "y": curve[0]["y"]} if curve != [] else {"x": [], "y": []}
 
         # Test validity of curve
-        if curve["x"] == [] or curve["y"] == []: # or curve["y"][-1] < 0.01:
+        if len(curve["x"]) == 0 or len(curve["y"]) == 0: # or curve["y"][-1] < 0.01:
             valid = False
         else:
             valid_list = [y >= 0 and y <= 1 for y in curve["y"]]
@@ -85,7 +85,7 @@ def assess_dependency(model, output_path, trials=10):
         curve = {"x": curve[0]["x"], "y": curve[0]["y"]} if curve != [] else {"x": [], "y": []}
 
         # Test validity of curve
-        if curve["x"] == [] or curve["y"] == []: # or curve["y"][-1] < 0.01:
+        if len(curve["x"]) == 0 or len(curve["y"]) == 0: # or curve["y"][-1] < 0.01:
             valid = False
         else:
             valid_list = [y >= 0 and y <= 1 for y in curve["y"]]
@@ -0,0 +1,29 @@
+"""
+ Title:         Campaign Main
+ Description:   For calibrating a model against many groups of experimental data (python3 campaign_main.py)
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+from modules.campaign import Campaign
+
+# Settings shared by every job
+base = {
+    "model":            "evpwd",
+    "errors":           ["dy_area", "y_area", "x_end", "y_end"],
+    "constraints":      ["dec_x_end", "inc_y_end"],
+    "recorder":         {"interval": 10, "population": 10},
+    "hyperparameters":  {"num_gens": 10000, "init_pop": 400, "offspring": 400, "crossover": 0.65, "mutation": 0.35},
+}
+
+# Calibrate each group of experimental data
+jobs = [
+    {**base, "name": "inl_1_800", "files": ["inl_1/AirBase_800_80_G25.csv", "inl_1/AirBase_800_70_G44.csv", "inl_1/AirBase_800_65_G33.csv", "inl_1/AirBase_800_60_G32.csv"]},
+    {**base, "name": "inl_1_900", "files": ["inl_1/AirBase_900_36_G22.csv", "inl_1/AirBase_900_31_G50.csv", "inl_1/AirBase_900_28_G45.csv", "inl_1/AirBase_900_26_G59.csv"]},
+    {**base, "name": "inl_1_1000", "files": ["inl_1/AirBase_1000_16_G18.csv", "inl_1/AirBase_1000_13_G30.csv", "inl_1/AirBase_1000_12_G52.csv", "inl_1/AirBase_1000_11_G39.csv"]},
+    {**base, "name": "kaeri_base_air_950", "files": ["kaeri_base/AirBase_950_18_a.csv", "kaeri_base/AirBase_950_20_a.csv", "kaeri_base/AirBase_950_22_a.csv", "kaeri_base/AirBase_950_35_a.csv"]},
+    {**base, "name": "kaeri_base_he_950", "files": ["kaeri_base/HeBase_950_35_a.csv", "kaeri_base/HeBase_950_25_a.csv", "kaeri_base/HeBase_950_22_a.csv", "kaeri_base/HeBase_950_18_a.csv"]},
+]
+campaign = Campaign(jobs, num_cores=4)
+campaign.run()
@@ -11,7 +11,14 @@ from modules.reader import read_experimental_data, export_data_summary, prematur
 from modules.moga.objective import Objective
 from modules.moga.problem import Problem
 from modules.moga.moga import MOGA
+from modules.moga.checkpoint import load_checkpoint
+from modules.moga.terminator import Terminator
+from modules.moga.scheduler import Scheduler
+from modules.moga.islands import Islands
+from modules.moga.refiner import Refiner
+from modules.bo.bo import BO
 from modules.recorder import Recorder
+from modules.features import feature_index
 from modules.errors.__error_factory__ import get_error_list
 from modules.constraints.__constraint_factory__ import get_constraint_list
 
@@ -21,33 +28,58 @@ from api_template import APITemplate
 from plotter import quick_plot_N, quick_subplot
 from __model_factory__ import get_model
 from derivative import remove_after_sp
+from __model__ import CachedModel, ParallelModel
+from stopwatch import set_enabled
 
 # API Class
 class API(APITemplate):
 
     # Constructor
-    def __init__(self, title="", display=2):
-        super().__init__(title, display)
+    #   output_path: directory to write the results to (None for a timestamped directory)
+    def __init__(self, title="", display=2, output_path=None):
+        super().__init__(title, display, output_path)
         self.error_list, self.constraint_list = [], []
         self.train_curves, self.test_curves = [], []
         self.plot_count = 1
+        self.num_processes = 1
+        self.batched = False
+        self.sandboxed, self.timeout = False, None
+        self.abort_factor = None
+        self.broker_args = None
+        self.checkpoint_interval = None
+        self.terminator = None
+        self.scheduler = None
+        self.screener = None
+        self.refiner_args = None
+        self.data_cache_path = None
+        self.objective, self.recorder = None, None
         self.csv_path = self.get_output("moga")
     
+    # Caches the parsed experimental data in a directory between runs (call before reading the data)
+    #   (the cache of a file is reparsed when the file's size or modification time changes)
+    def define_data_cache(self, cache_path="./cache/data"):
+        self.add(f"Caching the parsed experimental data")
+        self.data_cache_path = cache_path
+
     # Reads in the experimental data from files
-    def read_files(self, train_files=[], test_files=[]):
+    #   num_processes: number of processes to parse the files with
+    def read_files(self, train_files=[], test_files=[], num_processes=1):
         self.add(f"Reading experimental data from files ({len(train_files)}/{len(test_files)})")
         train_file_paths = [f"{self.get_input(file)}" for file in train_files]
         test_file_paths = [f"{self.get_input(file)}" for file in test_files]
-        self.train_curves += read_experimental_data(train_file_paths)
-        self.test_curves += read_experimental_data(test_file_paths)
+        exp_curves = read_experimental_data(train_file_paths + test_file_paths, num_processes, self.data_cache_path)
+        self.train_curves += exp_curves[:len(train_file_paths)]
+        self.test_curves += exp_curves[len(train_file_paths):]
 
     # Reads in the experimental data from folders
-    def read_folder(self, train_folder="", test_folder=""):
+    #   num_processes: number of processes to parse the files with
+    def read_folder(self, train_folder="", test_folder="", num_processes=1):
         self.add(f"Reading experimental data from folders")
         train_file_paths = [self.get_input(f"{train_folder}/{file}") for file in os.listdir(self.get_input(train_folder)) if file.endswith(".csv")]
         test_file_paths = [self.get_input(f"{test_folder}/{file}") for file in os.listdir(self.get_input(test_folder)) if file.endswith(".csv")]
-        self.train_curves = read_experimental_data(train_file_paths)
-        self.test_curves = read_experimental_data(test_file_paths)
+        exp_curves = read_experimental_data(train_file_paths + test_file_paths, num_processes, self.data_cache_path)
+        self.train_curves = exp_curves[:len(train_file_paths)]
+        self.test_curves = exp_curves[len(train_file_paths):]
 
     # Exports summary about the experimental data
     def export_summary(self, file_name="summary.csv"):
@@ -88,10 +120,30 @@ class API(APITemplate):
         self.test_curves = [remove_after_sp(curve, "max", window, acceptance, 0) for curve in self.test_curves if curve["type"] == "creep"]
 
     # Initialising the model
-    def define_model(self, model_name, args=[]):
+    #   num_processes: number of processes to simulate the curves of each evaluation with (1 to simulate them in turn)
+    def define_model(self, model_name, args=[], num_processes=1):
         self.add(f"Defining the model ({model_name})")
         self.model = get_model(model_name, self.train_curves, args)
+        if num_processes > 1:
+            self.model = ParallelModel(self.model, num_processes)
+    
+    # Memoises the predictions of the model (before or after defining the recorder)
+    #   size:       maximum number of predictions to store
+    #   tolerance:  relative tolerance that parameters are quantised to (0 for exact matches)
+    #   max_memory: maximum size of the stored predictions in megabytes
+    #   (predictions evaluated by a pool of processes are cached in this process when they are returned)
+    def define_cache(self, size=1000, tolerance=0, max_memory=500):
+        self.add(f"Caching the predictions of the model ({size})")
+        self.model = CachedModel(self.model, size, tolerance, max_memory)
+        if self.recorder != None:
+            self.objective.set_model(self.model)
+            self.recorder.set_model(self.model)
     
+    # Caches the features of the experimental curves (e.g., splines) in a file between runs (call before defining the errors)
+    def define_feature_cache(self, file_path="./cache/features.pkl"):
+        self.add(f"Caching the features of the experimental curves")
+        feature_index.set_file_path(file_path)
+
     # Defining the errors
     def define_errors(self, type, error_names):
         self.add(f"Defining the errors to minimise ({len(error_names)})")
@@ -103,18 +155,201 @@ class API(APITemplate):
         self.constraint_list += get_constraint_list(type, constraint_names, self.train_curves)
 
     # Prepares the recorder
-    def define_recorder(self, interval=10, population=10):
+    #   asynchronous: writes the results on a background thread (without stalling the optimisation)
+    def define_recorder(self, interval=10, population=10, asynchronous=False):
         self.add("Preparing the results recorder")
         self.objective = Objective(self.model, self.error_list, self.constraint_list)
-        self.recorder = Recorder(self.objective, self.train_curves, self.test_curves, self.csv_path, interval, population)
+        self.recorder = Recorder(self.objective, self.train_curves, self.test_curves, self.csv_path, interval, population, asynchronous)
+
+    # Defines the archive of non-dominated individuals (call after defining the recorder)
+    #   capacity:     maximum number of individuals (the most crowded are removed when exceeded; None for no limit)
+    #   export_front: whether to write every individual of the archive to the results
+    def define_archive(self, capacity=None, export_front=False):
+        self.add(f"Defining the archive of non-dominated individuals")
+        self.recorder.define_archive(capacity, export_front)
+
+    # Logs every evaluation (call after defining the recorder)
+    def define_log(self, chunk_size=1000):
+        self.add("Preparing the evaluation log")
+        self.recorder.define_log(chunk_size)
+
+    # Evaluates each individual in a worker process that is killed and replaced if it times out or crashes
+    #   timeout: maximum time in seconds to evaluate an individual (None for no limit)
+    def define_sandbox(self, timeout=600):
+        self.add(f"Defining the sandbox for the evaluations ({timeout}s timeout)")
+        self.sandboxed, self.timeout = True, timeout
+
+    # Evaluates individuals one curve at a time, and stops once they are infeasible or hopeless
+    #   factor: individuals are hopeless if their errors so far are worse than this factor of an archived individual's errors
+    def define_early_abort(self, factor=1.0):
+        self.add(f"Defining the early abortion of evaluations (factor of {factor})")
+        self.abort_factor = factor
+
+    # Evaluates the individuals on workers that connect over TCP (started with 'python3 worker.py --host <host> --port <port> --authkey <key>')
+    #   host, port:   address to listen for the workers on
+    #   heartbeat:    seconds between the heartbeats of the workers
+    #   lost_timeout: seconds without hearing from a busy worker before its task is requeued
+    def define_broker(self, host="localhost", port=6000, authkey="calibrate", heartbeat=5, lost_timeout=30):
+        self.add(f"Defining the broker for the evaluations ({host}:{port})")
+        self.broker_args = ((host, port), authkey, heartbeat, lost_timeout)
+
+    # Enables or disables the timing of the stages of the evaluations (written with each snapshot)
+    def define_timing(self, enabled=True):
+        self.add(f"{'Enabling' if enabled else 'Disabling'} the timing of the evaluations")
+        set_enabled(enabled)
+
+    # Defines how the individuals of each generation are evaluated
+    #   batched: evaluates the population with one call to the model (vectorised for TH, THKR, and THKR_S)
+    def define_evaluation(self, num_processes=1, batched=False):
+        self.add(f"Defining the evaluation of individuals ({num_processes} process(es))")
+        self.num_processes = num_processes
+        self.batched = batched
+
+    # Saves the state of the optimisation periodically (and when terminated)
+    #   interval: number of generations between checkpoints
+    def define_checkpoint(self, interval=10):
+        self.add(f"Defining the checkpoints (every {interval} generation(s))")
+        self.checkpoint_interval = interval
+
+    # Screens the individuals with surrogate models before evaluating them (call after defining the recorder)
+    #   trainer_name:     representation of the curves predicted by the surrogates
+    #   surrogate_name:   type of the surrogates (one per experimental curve)
+    #   fraction:         share of the individuals with the best predicted errors that are evaluated
+    #   exploration:      share of the remaining individuals that are randomly evaluated
+    #   min_samples:      number of evaluations before the surrogates are first trained
+    #   retrain_interval: number of new evaluations before the surrogates are retrained
+    def define_screener(self, trainer_name="simple", surrogate_name="ann", fraction=0.25, exploration=0.05, min_samples=400, retrain_interval=400):
+        self.add(f"Defining the '{surrogate_name}' surrogates to screen individuals")
+        from modules.screener import Screener # imported here as the surrogates require tensorflow
+        self.screener = Screener(self.objective, trainer_name, surrogate_name, fraction, exploration, min_samples, retrain_interval)
+
+    # Defines criteria to stop the optimisation before the number of generations is reached
+    #   metric:    metric that must stagnate ("error" for the best sum of squared errors, "hypervolume", or None)
+    #   window:    number of generations that the metric must stagnate over (the hypervolume is only checked once per window)
+    #   tolerance: relative improvement over the window below which the metric is stagnant
+    #   max_evals: maximum number of evaluations (None for no limit)
+    #   max_time:  maximum wall-clock time in seconds (None for no limit)
+    def define_termination(self, metric="error", window=100, tolerance=0.001, max_evals=None, max_time=None):
+        self.add(f"Defining the termination criteria")
+        self.terminator = Terminator(metric, window, tolerance, max_evals, max_time)
+
+    # Defines the schedule of the fidelity of the predictions (coarse early, then full as the search converges)
+    #   (the fidelity only scales the number of steps; the solver tolerances of the NEML models are not loosened,
+    #   as even a tenfold looser tolerance shifts or fails the creep predictions far more than fewer steps do)
+    #   fidelities: increasing fidelities (fractions of the full number of steps) to optimise with
+    #   window:     number of generations that the best error must stagnate over before promoting
+    #   tolerance:  relative improvement over the window below which the best error is stagnant
+    def define_fidelity(self, fidelities=[0.25, 0.5, 1.0], window=20, tolerance=0.01):
+        self.add(f"Defining the schedule of the fidelity ({len(fidelities)} level(s))")
+        self.scheduler = Scheduler(fidelities, window, tolerance)
+
+    # Refines the best individuals with a bounded local optimiser after the optimisation
+    #   num_starts: number of the best archived individuals to refine
+    #   max_iters:  maximum number of trial points of the local optimiser for each individual
+    #   step:       step of the finite differences (as a fraction of the parameter ranges)
+    #   tolerance:  relative reduction in the sum of squared errors below which the local optimiser stops
+    def define_refinement(self, num_starts=5, max_iters=20, step=1e-3, tolerance=1e-4):
+        self.add(f"Defining the refinement of the best individuals ({num_starts})")
+        self.refiner_args = (num_starts, max_iters, step, tolerance)
 
     # Conducts the optimisation
     def optimise(self, num_gens=10000, init_pop=400, offspring=400, crossover=0.65, mutation=0.35):
         self.add("Optimising the parameters of the model")
-        self.recorder.define_hyperparameters(num_gens, init_pop, offspring, crossover, mutation)
-        problem = Problem(self.objective, self.recorder)
-        moga = MOGA(problem, num_gens, init_pop, offspring, crossover, mutation)
+        moga = self.get_moga(num_gens, init_pop, offspring, crossover, mutation)
         moga.optimise()
+        self.refine_results(moga.problem)
+        moga.problem.close()
+        self.recorder.close()
+        self.close_model()
+
+    # Conducts the optimisation with independent populations (islands) in parallel processes
+    #   num_islands:        number of populations (each evolved in its own process)
+    #   crossover:          crossover probability (or a list with one per island)
+    #   mutation:           mutation probability (or a list with one per island)
+    #   migration_interval: number of generations between migrations
+    #   num_migrants:       number of elite individuals that migrate to the next island
+    #   (each island evaluates its individuals in its own process, batched if defined)
+    def optimise_islands(self, num_islands=4, num_gens=10000, init_pop=400, offspring=400, crossover=0.65, mutation=0.35, migration_interval=10, num_migrants=5):
+        self.add(f"Optimising the parameters of the model with {num_islands} islands")
+        unsupported_settings = {
+            "evaluation processes": self.num_processes > 1,
+            "sandbox":              self.sandboxed,
+            "early abortion":       self.abort_factor != None,
+            "broker":               self.broker_args != None,
+            "screener":             self.screener != None,
+            "termination":          self.terminator != None,
+            "fidelity":             self.scheduler != None,
+            "checkpoints":          self.checkpoint_interval != None,
+        }
+        unsupported_settings = [name for name in unsupported_settings.keys() if unsupported_settings[name]]
+        if unsupported_settings != []:
+            raise ValueError(f"The islands do not support the defined settings ({', '.join(unsupported_settings)})!")
+        self.recorder.define_hyperparameters(num_gens, init_pop*num_islands, offspring*num_islands, crossover, mutation) # generations of every island are recorded together
+        problem = Problem(self.objective, self.recorder, 1, self.batched)
+        islands = Islands(problem, num_islands, num_gens, init_pop, offspring, crossover, mutation, migration_interval, num_migrants)
+        islands.optimise()
+        self.refine_results(problem)
+        problem.close()
+        self.recorder.close()
+        self.close_model()
+
+    # Conducts the optimisation with Bayesian optimisation (for expensive models)
+    #   num_iters:  number of iterations after the initial samples
+    #   num_init:   number of initial (latin hypercube) samples
+    #   batch_size: number of candidates proposed (and evaluated in parallel) per iteration
+    def optimise_bayesian(self, num_iters=100, num_init=20, batch_size=4):
+        self.add("Optimising the parameters of the model with Bayesian optimisation")
+        self.check_evaluation()
+        self.recorder.define_hyperparameters(num_iters+1, num_init, batch_size, 0, 0) # iterations are recorded as generations
+        problem = Problem(self.objective, self.recorder, self.num_processes, self.batched, None, self.sandboxed, self.timeout, self.abort_factor, self.broker_args)
+        bo = BO(problem, num_iters, num_init, batch_size, self.terminator)
+        bo.optimise()
+        self.refine_results(problem)
+        problem.close()
+        self.recorder.close()
+        self.close_model()
+
+    # Continues the optimisation from a checkpoint (the data, model, errors, constraints, and recorder must be defined identically)
+    def resume(self, checkpoint_path):
+        self.add(f"Resuming the optimisation from '{checkpoint_path}'")
+        state = load_checkpoint(checkpoint_path)
+        moga = self.get_moga(*state["hyperparameters"])
+        moga.resume(state)
+        self.refine_results(moga.problem)
+        moga.problem.close()
+        self.recorder.close()
+        self.close_model()
+
+    # Closes the processes of the model (if it simulates its curves in parallel)
+    def close_model(self):
+        if hasattr(self.model, "close"):
+            self.model.close()
+
+    # Returns the MOGA for the optimisation
+    def get_moga(self, num_gens, init_pop, offspring, crossover, mutation):
+        self.check_evaluation()
+        self.recorder.define_hyperparameters(num_gens, init_pop, offspring, crossover, mutation)
+        problem = Problem(self.objective, self.recorder, self.num_processes, self.batched, self.screener, self.sandboxed, self.timeout, self.abort_factor, self.broker_args)
+        if self.checkpoint_interval == None:
+            return MOGA(problem, num_gens, init_pop, offspring, crossover, mutation, self.terminator, self.scheduler)
+        checkpoint_path = self.get_output("checkpoint.pkl")
+        return MOGA(problem, num_gens, init_pop, offspring, crossover, mutation, self.terminator, self.scheduler, checkpoint_path, self.checkpoint_interval)
+
+    # Checks that the settings of the evaluation can be used together
+    #   (batched evaluations predict every curve of an individual at once, so cannot be stopped early)
+    def check_evaluation(self):
+        batched = self.batched and not self.sandboxed and self.broker_args == None # isolated evaluations are not batched
+        if batched and self.abort_factor != None:
+            raise ValueError("The early abortion of evaluations cannot be used with batched evaluations!")
+
+    # Refines the best individuals of the optimisation (if the refinement is defined) and records the results
+    def refine_results(self, problem):
+        if self.refiner_args == None:
+            return
+        refiner = Refiner(problem, *self.refiner_args)
+        self.recorder.set_refiner(refiner)
+        refiner.refine()
+        self.recorder.record_progress()
 
     # Plots the results of a set of parameters
     def plot_results(self, params):
@@ -131,5 +366,5 @@ class API(APITemplate):
         constraints = objective.get_constraint_values(prd_curves)
         
         # Output results
-        recorder.update_population(params, errors, constraints)
+        recorder.update_population(params, errors, constraints, prd_curves)
         recorder.write_results(self.get_output("results.xlsx"))
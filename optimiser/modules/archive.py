@@ -0,0 +1,144 @@
+"""
+ Title:         Archive
+ Description:   For storing the non-dominated (Pareto optimal) individuals
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import numpy as np
+
+# Constants
+INITIAL_SIZE = 64
+
+# The Archive class
+class Archive:
+
+    # Constructor
+    #   capacity: maximum number of individuals (the most crowded are removed when exceeded; None for no limit)
+    def __init__(self, num_params, num_errors, num_constraints, capacity=None):
+        self.capacity    = capacity
+        self.size        = 0
+        self.next_id     = 0
+        self.ids         = np.zeros(INITIAL_SIZE, dtype=np.int64)
+        self.params      = np.zeros((INITIAL_SIZE, num_params))
+        self.errors      = np.zeros((INITIAL_SIZE, num_errors))
+        self.constraints = np.zeros((INITIAL_SIZE, num_constraints))
+        self.curves      = {} # id -> [predicted training curves, predicted testing curves]
+
+    # Returns the number of individuals
+    def __len__(self):
+        return self.size
+
+    # Returns a copy of the archive (the curves are shared)
+    def copy(self):
+        archive = Archive(self.params.shape[1], self.errors.shape[1], self.constraints.shape[1], self.capacity)
+        archive.size, archive.next_id = self.size, self.next_id
+        archive.ids         = self.ids[:self.size].copy()
+        archive.params      = self.params[:self.size].copy()
+        archive.errors      = self.errors[:self.size].copy()
+        archive.constraints = self.constraints[:self.size].copy()
+        archive.curves      = {id: list(curves) for id, curves in self.curves.items()}
+        return archive
+
+    # Inserts an individual if it is not dominated and returns whether it was inserted
+    #   (individuals that it dominates are removed)
+    def insert(self, params, errors, constraints, prd_curves=[]):
+        errors = np.array(errors, dtype=np.float64)
+        if not np.all(np.isfinite(errors)):
+            return False
+        
+        # Check whether the individual is dominated by (or equal to) an existing individual
+        archive_errors = self.errors[:self.size]
+        if np.any(np.all(archive_errors <= errors, axis=1)):
+            return False
+        
+        # Remove existing individuals that the individual dominates
+        dominated = np.all(errors <= archive_errors, axis=1)
+        if np.any(dominated):
+            self.remove(dominated)
+        
+        # Add the individual
+        if self.size == len(self.ids):
+            self.grow()
+        self.ids[self.size]         = self.next_id
+        self.params[self.size]      = params
+        self.errors[self.size]      = errors
+        self.constraints[self.size] = constraints
+        self.curves[self.next_id]   = [prd_curves, None]
+        self.size += 1
+        self.next_id += 1
+
+        # Remove the most crowded individual if the capacity is exceeded
+        if self.capacity != None and self.size > self.capacity:
+            distances = get_crowding_distances(self.errors[:self.size])
+            distances[self.get_best_indexes(1)] = np.inf # always keep the best individual
+            self.remove(np.arange(self.size) == np.argmin(distances))
+        return True
+
+    # Removes the individuals that are flagged
+    def remove(self, flags):
+        for id in self.ids[:self.size][flags]:
+            self.curves.pop(id, None)
+        kept = ~flags
+        num_kept = int(np.sum(kept))
+        self.ids[:num_kept]         = self.ids[:self.size][kept]
+        self.params[:num_kept]      = self.params[:self.size][kept]
+        self.errors[:num_kept]      = self.errors[:self.size][kept]
+        self.constraints[:num_kept] = self.constraints[:self.size][kept]
+        self.size = num_kept
+
+    # Doubles the size of the arrays
+    def grow(self):
+        self.ids         = grow_array(self.ids)
+        self.params      = grow_array(self.params)
+        self.errors      = grow_array(self.errors)
+        self.constraints = grow_array(self.constraints)
+
+    # Returns the sum of the squared errors of each individual
+    def get_error_sqr_sums(self):
+        return np.sum(self.errors[:self.size]**2, axis=1)
+
+    # Returns the indexes of the best individuals, ordered by the sum of their squared errors
+    def get_best_indexes(self, num_best):
+        error_sqr_sums = self.get_error_sqr_sums()
+        if num_best < self.size:
+            indexes = np.argpartition(error_sqr_sums, num_best)[:num_best]
+        else:
+            indexes = np.arange(self.size)
+        return indexes[np.argsort(error_sqr_sums[indexes], kind="stable")]
+
+    # Returns the parameters, errors, and constraints of the individuals at a list of indexes
+    def get_individuals(self, indexes):
+        return self.params[indexes], self.errors[indexes], self.constraints[indexes]
+
+    # Returns the stored curves of an individual ([] / None if they have not been stored)
+    def get_curves(self, index):
+        return self.curves.setdefault(self.ids[index], [[], None])
+
+    # Only keeps the curves of the individuals at a list of indexes
+    def keep_curves(self, indexes):
+        kept_ids = set(self.ids[indexes].tolist())
+        for id in [id for id in self.curves.keys() if not id in kept_ids]:
+            self.curves.pop(id)
+
+# Returns a copy of an array with double the number of rows
+def grow_array(array):
+    grown_array = np.zeros((max(2*len(array), INITIAL_SIZE),) + array.shape[1:], dtype=array.dtype)
+    grown_array[:len(array)] = array
+    return grown_array
+
+# Returns the crowding distances of a set of errors
+def get_crowding_distances(errors):
+    num_points, num_errors = errors.shape
+    distances = np.zeros(num_points)
+    if num_points <= 2:
+        return np.full(num_points, np.inf)
+    for i in range(num_errors):
+        order = np.argsort(errors[:,i])
+        sorted_errors = errors[order,i]
+        distances[order[[0,-1]]] = np.inf
+        span = sorted_errors[-1] - sorted_errors[0]
+        if span > 0:
+            distances[order[1:-1]] += (sorted_errors[2:] - sorted_errors[:-2]) / span
+    return distances
@@ -0,0 +1,102 @@
+"""
+ Title:         Bayesian Optimisation
+ Description:   For parameter optimisation with few evaluations of expensive models
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import numpy as np
+from scipy.optimize import minimize
+from scipy.stats import norm, qmc
+from modules.moga.objective import BIG_VALUE
+from modules.bo.gp import GaussianProcess
+
+# Constants
+NUM_CANDIDATES = 2000   # number of random candidates to search the acquisition function over
+NUM_POLISHED   = 5      # number of the best candidates to locally optimise
+MIN_ERROR      = 1e-16  # sums of squared errors are floored before taking their logarithm
+
+# The Bayesian Optimisation (BO) class
+class BO:
+
+    # Constructor
+    #   num_iters:  number of iterations after the initial samples
+    #   num_init:   number of initial (latin hypercube) samples
+    #   batch_size: number of candidates proposed (and evaluated in parallel) per iteration
+    #   terminator: criteria to stop before the number of iterations is reached (None for no criteria)
+    def __init__(self, problem, num_iters, num_init, batch_size, terminator=None):
+        self.problem    = problem
+        self.num_iters  = num_iters
+        self.num_init   = num_init
+        self.batch_size = batch_size
+        self.terminator = terminator
+        self.lower_bounds = np.array(problem.xl, dtype=np.float64)
+        self.upper_bounds = np.array(problem.xu, dtype=np.float64)
+        self.gp = GaussianProcess()
+
+    # Runs the Bayesian optimisation
+    def optimise(self):
+
+        # Evaluate the initial samples
+        sampler = qmc.LatinHypercube(d=len(self.lower_bounds))
+        x_data = sampler.random(self.num_init)
+        y_data = self.evaluate(x_data)
+
+        # Propose and evaluate batches of candidates
+        for _ in range(self.num_iters):
+            self.gp.fit(x_data, impute_failures(y_data))
+            x_batch = self.propose(x_data, impute_failures(y_data))
+            x_data = np.concatenate((x_data, x_batch))
+            y_data = np.concatenate((y_data, self.evaluate(x_batch)))
+            stop_reason = self.terminator.update(self.problem.recorder) if self.terminator != None else None
+            if stop_reason != None:
+                self.problem.recorder.record_stop(stop_reason)
+                break
+
+    # Evaluates unit-scaled parameters with the problem and returns the log sum of squared errors
+    #   (failed evaluations are returned as NaN)
+    def evaluate(self, x_list):
+        params_list = self.lower_bounds + x_list * (self.upper_bounds - self.lower_bounds)
+        errors_list = self.problem.evaluate(params_list, return_values_of=["F"])
+        self.problem.recorder.next_generation()
+        y_list = np.log10(np.maximum(np.sum(errors_list**2, axis=1), MIN_ERROR))
+        y_list[np.any(errors_list == BIG_VALUE, axis=1) | ~np.isfinite(y_list)] = np.nan
+        return y_list
+
+    # Proposes a batch of candidates by maximising the expected improvement
+    #   (with the kriging believer strategy, where each candidate is assumed to equal its predicted mean)
+    def propose(self, x_data, y_data):
+        best_y = np.min(y_data)
+        x_batch = []
+        for i in range(self.batch_size):
+            if i > 0:
+                x_believed = np.concatenate((x_data, x_batch))
+                y_believed = np.concatenate((y_data, self.gp.predict(x_batch)[0]))
+                self.gp.update(x_believed, y_believed)
+            x_batch.append(self.maximise_acquisition(best_y))
+        return np.array(x_batch)
+
+    # Returns the unit-scaled parameters that maximise the expected improvement
+    def maximise_acquisition(self, best_y):
+        candidates = np.random.uniform(0, 1, (NUM_CANDIDATES, len(self.lower_bounds)))
+        improvements = self.get_expected_improvement(candidates, best_y)
+        best_x, best_improvement = None, -np.inf
+        for candidate in candidates[np.argsort(-improvements)[:NUM_POLISHED]]:
+            result = minimize(lambda x: -self.get_expected_improvement(x[None,:], best_y)[0], candidate, method="L-BFGS-B", bounds=[(0, 1)] * len(candidate))
+            if -result.fun > best_improvement:
+                best_x, best_improvement = result.x, -result.fun
+        return best_x
+
+    # Returns the expected improvement at a set of points
+    def get_expected_improvement(self, x_list, best_y):
+        mean, std = self.gp.predict(x_list)
+        z = (best_y - mean) / std
+        return (best_y - mean) * norm.cdf(z) + std * norm.pdf(z)
+
+# Replaces failed evaluations with the worst successful evaluation
+def impute_failures(y_data):
+    failed = np.isnan(y_data)
+    if np.all(failed):
+        return np.zeros(len(y_data))
+    return np.where(failed, np.nanmax(y_data), y_data)
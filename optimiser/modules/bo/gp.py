@@ -0,0 +1,82 @@
+"""
+ Title:         Gaussian Process
+ Description:   For modelling the errors as a function of the parameters
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+from scipy.optimize import minimize
+
+# Constants
+JITTER = 1e-8
+
+# The Gaussian Process class (with an ARD Matern 5/2 kernel)
+class GaussianProcess:
+
+    # Constructor
+    #   num_restarts: number of random restarts when fitting the hyperparameters
+    def __init__(self, num_restarts=3):
+        self.num_restarts = num_restarts
+        self.log_hyperparams = None # log length scales, log signal variance, log noise variance
+
+    # Fits the hyperparameters to the data by maximising the log marginal likelihood
+    def fit(self, x_data, y_data):
+        self.x_data = np.array(x_data, dtype=np.float64)
+        y_data = np.array(y_data, dtype=np.float64)
+        self.y_mean, self.y_std = np.mean(y_data), max(np.std(y_data), 1e-12)
+        self.y_data = (y_data - self.y_mean) / self.y_std
+
+        # Optimise from the previous hyperparameters and random restarts
+        num_dims = self.x_data.shape[1]
+        initial_list = [np.concatenate((np.log(np.full(num_dims, 0.3)), [0.0, np.log(1e-2)]))]
+        if self.log_hyperparams != None:
+            initial_list.append(np.array(self.log_hyperparams))
+        initial_list += [np.concatenate((np.random.uniform(-3, 1, num_dims), [np.random.uniform(-1, 1), np.random.uniform(-8, -2)])) for _ in range(self.num_restarts)]
+        bounds = [(-5, 3)] * num_dims + [(-5, 5), (-12, 0)]
+        best_result = None
+        for initial in initial_list:
+            result = minimize(self.get_negative_log_likelihood, initial, method="L-BFGS-B", bounds=bounds)
+            if best_result == None or result.fun < best_result.fun:
+                best_result = result
+        self.log_hyperparams = list(best_result.x)
+        self.update(self.x_data, self.y_data * self.y_std + self.y_mean)
+
+    # Conditions the fitted model on data (without refitting the hyperparameters)
+    def update(self, x_data, y_data):
+        self.x_data = np.array(x_data, dtype=np.float64)
+        self.y_data = (np.array(y_data, dtype=np.float64) - self.y_mean) / self.y_std
+        covariance = self.get_covariance(self.x_data, self.x_data, self.log_hyperparams)
+        covariance[np.diag_indices_from(covariance)] += np.exp(self.log_hyperparams[-1]) + JITTER
+        self.cholesky = cho_factor(covariance, lower=True)
+        self.alpha = cho_solve(self.cholesky, self.y_data)
+
+    # Returns the predicted means and standard deviations at a set of points
+    def predict(self, x_list):
+        covariance = self.get_covariance(np.array(x_list, dtype=np.float64), self.x_data, self.log_hyperparams)
+        mean = covariance @ self.alpha
+        variance = np.exp(self.log_hyperparams[-2]) - np.sum(covariance * cho_solve(self.cholesky, covariance.T).T, axis=1)
+        std = np.sqrt(np.maximum(variance, JITTER))
+        return mean * self.y_std + self.y_mean, std * self.y_std
+
+    # Returns the negative log marginal likelihood of the data
+    def get_negative_log_likelihood(self, log_hyperparams):
+        covariance = self.get_covariance(self.x_data, self.x_data, log_hyperparams)
+        covariance[np.diag_indices_from(covariance)] += np.exp(log_hyperparams[-1]) + JITTER
+        try:
+            cholesky = cho_factor(covariance, lower=True)
+        except np.linalg.LinAlgError:
+            return 1e10
+        alpha = cho_solve(cholesky, self.y_data)
+        log_determinant = 2 * np.sum(np.log(np.diag(cholesky[0])))
+        return 0.5 * (self.y_data @ alpha + log_determinant + len(self.y_data) * np.log(2 * np.pi))
+
+    # Returns the covariance between two sets of points
+    def get_covariance(self, x_list_1, x_list_2, log_hyperparams):
+        length_scales = np.exp(np.array(log_hyperparams[:-2]))
+        signal_variance = np.exp(log_hyperparams[-2])
+        differences = (x_list_1[:,None,:] - x_list_2[None,:,:]) / length_scales
+        distances = np.sqrt(5 * np.sum(differences**2, axis=2))
+        return signal_variance * (1 + distances + distances**2 / 3) * np.exp(-distances)
@@ -0,0 +1,146 @@
+"""
+ Title:         Campaign
+ Description:   For calibrating many groups of experimental data concurrently
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import json, os, queue, re, time, traceback
+import multiprocessing as mp
+from modules.api import API
+
+# Constants
+INDEX_FILE = "index.json"
+EARLY_OPTIONS = ["define_cache"] # options that must be defined before the recorder
+JOB_DEFAULTS = {
+    "test_files":       [],
+    "args":             [],
+    "type":             "creep",
+    "constraints":      [],
+    "recorder":         {},
+    "options":          {},
+    "hyperparameters":  {},
+    "priority":         0,
+    "cores":            1,
+}
+
+# The Campaign class
+class Campaign:
+
+    # Constructor
+    #   jobs:        list of job dictionaries; each job needs a "name", "files", "model", and "errors", and can define
+    #                "test_files", "args", "type", "constraints", "recorder" (arguments of define_recorder),
+    #                "options" (other API methods and their arguments), "hyperparameters" (arguments of optimise),
+    #                "priority" (higher first), and "cores" (processes used to evaluate the job)
+    #   num_cores:   number of cores shared by the jobs
+    #   output_path: directory to write the results of every job and the index to
+    def __init__(self, jobs, num_cores=1, output_path="./results/campaign"):
+
+        # Define the jobs
+        self.jobs = [{**JOB_DEFAULTS, **job} for job in jobs]
+        self.num_cores = num_cores
+        self.output_path = output_path
+        names = [job["name"] for job in self.jobs]
+        for job in self.jobs:
+            if names.count(job["name"]) > 1:
+                raise ValueError(f"The job name '{job['name']}' is not unique!")
+            if job["cores"] > num_cores:
+                raise ValueError(f"The job '{job['name']}' requires more cores ({job['cores']}) than available ({num_cores})!")
+
+        # Describe the jobs in the index
+        os.makedirs(output_path, exist_ok=True)
+        self.index = {job["name"]: {
+            "status":   "pending",
+            "priority": job["priority"],
+            "cores":    job["cores"],
+            "path":     get_job_path(output_path, job["name"]),
+        } for job in self.jobs}
+        self.write_index()
+
+    # Runs the jobs (in order of priority) until all have finished
+    def run(self):
+        pending = sorted(self.jobs, key=lambda job: -job["priority"]) # stable for jobs of equal priority
+        running = {}
+        results = mp.Queue()
+        while len(pending) > 0 or len(running) > 0:
+
+            # Start the highest priority jobs that fit on the free cores
+            free_cores = self.num_cores - sum([running[name][1] for name in running.keys()])
+            for job in list(pending):
+                if job["cores"] <= free_cores:
+                    process = mp.Process(target=run_job, args=(job, self.index[job["name"]]["path"], results))
+                    process.start()
+                    running[job["name"]] = (process, job["cores"])
+                    pending.remove(job)
+                    free_cores -= job["cores"]
+                    self.update_index(job["name"], status="running", start_time=get_time_str())
+
+            # Record the results of finished jobs
+            try:
+                name, summary = results.get(timeout=1)
+                running.pop(name)[0].join()
+                self.update_index(name, end_time=get_time_str(), **summary)
+            except queue.Empty:
+                pass
+
+            # Check for jobs that died without reporting
+            for name in list(running.keys()):
+                process = running[name][0]
+                if not process.is_alive() and results.empty():
+                    running.pop(name)
+                    self.update_index(name, status="failed", end_time=get_time_str(), error=f"Exited with code {process.exitcode}")
+
+    # Updates the entry of a job and rewrites the index
+    def update_index(self, name, **entry):
+        self.index[name].update(entry)
+        self.write_index()
+
+    # Writes the index of the jobs (atomically so that it can be read at any time)
+    def write_index(self):
+        index_path = f"{self.output_path}/{INDEX_FILE}"
+        with open(f"{index_path}.tmp", "w+") as file:
+            json.dump(self.index, file, indent=4)
+        os.replace(f"{index_path}.tmp", index_path)
+
+# Returns the path to the results of a job
+def get_job_path(output_path, name):
+    return f"{output_path}/{re.sub(r'[^a-zA-Z0-9_]', '', name.replace(' ', '_'))}"
+
+# Returns the current time as a string
+def get_time_str():
+    return time.strftime("%A, %D, %H:%M:%S", time.localtime())
+
+# Runs a job, and reports its status and best results
+def run_job(job, output_path, results):
+    start_time = time.time()
+    try:
+
+        # Define the optimisation
+        api = API(job["name"], 0, output_path)
+        api.read_files(job["files"], job["test_files"])
+        api.define_model(job["model"], job["args"])
+        api.define_errors(job["type"], job["errors"])
+        if job["constraints"] != []:
+            api.define_constraints(job["type"], job["constraints"])
+        for option in [option for option in job["options"].keys() if option in EARLY_OPTIONS]:
+            getattr(api, option)(**job["options"][option])
+        api.define_recorder(**job["recorder"])
+        for option in [option for option in job["options"].keys() if not option in EARLY_OPTIONS]:
+            getattr(api, option)(**job["options"][option])
+        if job["cores"] > 1:
+            api.define_evaluation(job["cores"])
+
+        # Optimise and summarise the best results
+        api.optimise(**job["hyperparameters"])
+        summary = {"status": "complete", "duration": round(time.time() - start_time)}
+        archive = api.recorder.archive
+        if len(archive) > 0:
+            params, errors, _ = archive.get_individuals(archive.get_best_indexes(1))
+            summary["best_params"] = dict(zip(api.model.get_param_names(), params[0].tolist()))
+            summary["best_errors"] = dict(zip(api.recorder.error_info, errors[0].tolist()))
+            summary["best_error_sqr_sum"] = float(archive.get_error_sqr_sums()[archive.get_best_indexes(1)[0]])
+            summary["stop_reason"] = api.recorder.get_stop_reason()
+    except Exception:
+        summary = {"status": "failed", "duration": round(time.time() - start_time), "error": traceback.format_exc()}
+    results.put((job["name"], summary))
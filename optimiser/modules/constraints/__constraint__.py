@@ -5,6 +5,10 @@
 
 """
 
+# Libraries
+import numpy as np
+from modules.features import feature_index
+
 # The Constraint Class
 class Constraint:
 
@@ -26,11 +30,22 @@ class Constraint:
     def get_exp_curves(self):
         return self.exp_curves
     
+    # Prepares the object for evaluation (placeholder)
+    def prepare(self):
+        raise NotImplementedError
+
     # Returns a constraint (placeholder)
     #   Constraint is violated if value > 0
+    #   Curves that have not been simulated yet are None, and contribute nothing (giving a lower bound)
     def get_value(self):
         raise NotImplementedError
 
+    # Returns the constraints of a population from its packed predicted curves (NaN for failed predictions)
+    #   (evaluates each individual in turn unless overridden)
+    def get_batch_values(self, ragged_curves):
+        return np.array([self.get_value(ragged_curves.get_prd_curves(i)) if ragged_curves.valid[i] else np.nan
+                         for i in range(ragged_curves.num_individuals)], dtype=np.float64)
+
 # Returns the stress from a curve
 def get_stress(curve):
     return curve["stress"]
@@ -46,13 +61,27 @@ def get_curve_map(exp_curves):
     curve_dict = {}
     for temp in temp_list:
 
-        # Sort curves by stress
-        curve_list = [exp_curve for exp_curve in exp_curves if exp_curve["type"] == "creep" and exp_curve["temp"] == temp]
-        curve_list.sort(key=get_stress)
-        
-        # Get their indexes and add to map
-        index_list = [exp_curves.index(temp_curve) for temp_curve in curve_list]
+        # Get the indexes of the curves sorted by stress, and add to map
+        index_list = [i for i in range(len(exp_curves)) if exp_curves[i]["type"] == "creep" and exp_curves[i]["temp"] == temp]
+        index_list.sort(key=lambda i: get_stress(exp_curves[i]))
         curve_dict[temp] = index_list
     
     # Return the mapping
-    return curve_dict
\ No newline at end of file
+    return curve_dict
+
+# Returns the indexes of the consecutive pairs of creep curves (indexed by the content of the curves)
+def get_curve_pairs(exp_curves, type):
+    return feature_index.get_group(exp_curves, f"curve_pairs {type}", lambda exp_curves: find_curve_pairs(exp_curves, type))
+
+# Finds the indexes of the consecutive pairs of creep curves (of lower and higher stress) at each temperature
+def find_curve_pairs(exp_curves, type):
+    curve_dict = get_curve_map(exp_curves)
+    lower_indexes, higher_indexes = [], []
+    for temp in curve_dict.keys():
+        index_list = curve_dict[temp]
+        for i in range(1,len(index_list)):
+            if exp_curves[i]["type"] != type:
+                continue
+            lower_indexes.append(index_list[i-1])
+            higher_indexes.append(index_list[i])
+    return np.array(lower_indexes, dtype=int), np.array(higher_indexes, dtype=int)
\ No newline at end of file
@@ -5,6 +5,9 @@
 
 """
 
+# Libraries
+from modules.features import feature_index
+
 # Constraints
 from modules.constraints.dec_x_end import DecXEnd
 from modules.constraints.inc_y_end import IncYEnd
@@ -16,4 +19,6 @@ def get_constraint_list(type, constraint_names, exp_curves):
         IncYEnd(type, exp_curves),
     )
     constraint_list = [constraint for constraint in constraint_list if constraint.get_name() in constraint_names]
+    [constraint.prepare() for constraint in constraint_list]
+    feature_index.save()
     return constraint_list
\ No newline at end of file
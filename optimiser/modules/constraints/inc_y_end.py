@@ -6,6 +6,7 @@
 """
 
 # Libraries
+import numpy as np
 import modules.constraints.__constraint__ as constraint
 
 # The IncYEnd Class
@@ -14,17 +15,24 @@ class IncYEnd(constraint.Constraint):
     # Constructor
     def __init__(self, type, exp_curves):
         super().__init__("inc_y_end", type, exp_curves)
-        self.curve_dict = constraint.get_curve_map(exp_curves)
+
+    # Prepares for evaluation (with the indexed pairs of the experimental curves)
+    def prepare(self):
+        self.lower_indexes, self.higher_indexes = constraint.get_curve_pairs(self.exp_curves, self.type)
 
     # Returns the constraint vayue
     def get_value(self, prd_curves):
         constraint_value = 0
-        for temp in self.curve_dict.keys():
-            curves = [prd_curves[i] for i in self.curve_dict[temp]]
-            for i in range(1,len(curves)):
-                if self.exp_curves[i]["type"] != self.type:
-                    continue
-                y_end_diff = curves[i-1]["y"][-1] - curves[i]["y"][-1]
-                if y_end_diff > 0:
-                    constraint_value += y_end_diff
-        return constraint_value
\ No newline at end of file
+        for lower_index, higher_index in zip(self.lower_indexes, self.higher_indexes):
+            if prd_curves[lower_index] == None or prd_curves[higher_index] == None: # not simulated yet
+                continue
+            y_end_diff = prd_curves[lower_index]["y"][-1] - prd_curves[higher_index]["y"][-1]
+            if y_end_diff > 0:
+                constraint_value += y_end_diff
+        return constraint_value
+
+    # Returns the constraint values of a population
+    def get_batch_values(self, ragged_curves):
+        ends = ragged_curves.get_ends("y")
+        y_end_diffs = ends[:,self.lower_indexes] - ends[:,self.higher_indexes] # NaN if either curve is not simulated yet
+        return np.sum(np.where(y_end_diffs > 0, y_end_diffs, 0), axis=1)
\ No newline at end of file
@@ -5,6 +5,9 @@
 
 """
 
+# Libraries
+import numpy as np
+
 # The Error Class
 class Error:
 
@@ -13,6 +16,7 @@ class Error:
         self.name = name
         self.type = type
         self.exp_curves = exp_curves
+        self.type_indexes = [i for i in range(len(exp_curves)) if exp_curves[i]["type"] == type]
 
     # Returns the name of the error
     def get_name(self):
@@ -30,6 +34,51 @@ class Error:
     def prepare(self):
         raise NotImplementedError
     
-    # Returns an error (placeholder)
-    def get_value(self):
-        raise NotImplementedError
\ No newline at end of file
+    # Returns an error
+    #   Curves that have not been simulated yet are None, and contribute nothing (giving a lower bound)
+    def get_value(self, prd_curves):
+        return self.get_shared_value(get_shared_curves(prd_curves))
+
+    # Returns an error from predicted curves shared with the other errors (placeholder)
+    def get_shared_value(self, shared_curves):
+        raise NotImplementedError
+
+    # Returns the errors of a population from its packed predicted curves (NaN for failed predictions)
+    #   (evaluates each individual in turn unless overridden)
+    def get_batch_values(self, ragged_curves):
+        return np.array([self.get_value(ragged_curves.get_prd_curves(i)) if ragged_curves.valid[i] else np.nan
+                         for i in range(ragged_curves.num_individuals)], dtype=np.float64)
+
+# The Shared Curve Class (a predicted curve converted to arrays once, and thinned and differentiated once)
+class SharedCurve:
+
+    # Constructor
+    def __init__(self, curve):
+        self.x = np.asarray(curve["x"], dtype=np.float64)
+        self.y = np.asarray(curve["y"], dtype=np.float64)
+        self.thinned, self.bfds = {}, {}
+
+    # Returns the thinned x and y arrays
+    def get_thinned(self, num_points):
+        if not num_points in self.thinned.keys():
+            thin_indexes = get_thin_indexes(len(self.x), num_points)
+            self.thinned[num_points] = (self.x[thin_indexes], self.y[thin_indexes])
+        return self.thinned[num_points]
+
+    # Returns the backward finite differences of the thinned arrays (and their x values)
+    def get_bfd(self, num_points):
+        if not num_points in self.bfds.keys():
+            x, y = self.get_thinned(num_points)
+            increasing = x[1:] > x[:-1]
+            self.bfds[num_points] = (x[1:][increasing], (y[1:] - y[:-1])[increasing] / (x[1:] - x[:-1])[increasing])
+        return self.bfds[num_points]
+
+# Returns the predicted curves as shared curves (None if not simulated yet)
+def get_shared_curves(prd_curves):
+    return [None if prd_curve == None else SharedCurve(prd_curve) for prd_curve in prd_curves]
+
+# Returns an array of indexes corresponding to thinned data (as with derivative.get_thin_indexes)
+def get_thin_indexes(src_data_size, dst_data_size):
+    step_size = src_data_size/dst_data_size
+    thin_indexes = np.floor(step_size*np.arange(1, dst_data_size-1)).astype(int)
+    return np.concatenate(([0], thin_indexes, [src_data_size-1]))
\ No newline at end of file
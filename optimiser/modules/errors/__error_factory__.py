@@ -5,6 +5,9 @@
 
 """
 
+# Libraries
+from modules.features import feature_index
+
 # Errors
 from modules.errors.dy_area import DyArea
 from modules.errors.x_area import XArea
@@ -23,4 +26,5 @@ def get_error_list(type, error_names, exp_curves):
     )
     error_list = [error for error in error_list if error.get_name() in error_names]
     [error.prepare() for error in error_list]
+    feature_index.save()
     return error_list
\ No newline at end of file
@@ -8,11 +8,8 @@
 # Libraries
 import numpy as np
 import modules.errors.__error__ as error
-
-# Helper libraries
-import sys
-sys.path += ["../__common__"]
-from derivative import Interpolator, get_bfd, get_thin_indexes
+from modules.features import get_d_interpolator, get_avg_dy
+from modules.ragged import get_masked_averages
 
 # Constants
 NUM_POINTS = 50
@@ -24,27 +21,33 @@ class DyArea(error.Error):
     def __init__(self, type, exp_curves):
         super().__init__("dy_area", type, exp_curves)
     
-    # Prepares for evaluation
+    # Prepares for evaluation (with the indexed features of the experimental curves)
     def prepare(self):
         self.interpolator_list, self.exp_x_end_list, self.avg_dy_list = [], [], []
         for exp_curve in self.exp_curves:
-            interpolator = Interpolator(exp_curve["x"], exp_curve["y"], NUM_POINTS)
-            interpolator.differentiate()
-            self.interpolator_list.append(interpolator)
+            self.interpolator_list.append(get_d_interpolator(exp_curve, NUM_POINTS))
             self.exp_x_end_list.append(exp_curve["x"][-1])
-            self.avg_dy_list.append(np.average(interpolator.evaluate(exp_curve["x"])))
+            self.avg_dy_list.append(get_avg_dy(exp_curve, NUM_POINTS))
 
     # Computes the error value
-    def get_value(self, prd_curves):
+    def get_shared_value(self, shared_curves):
         value_list = []
-        for i in range(len(prd_curves)):
-            if self.exp_curves[i]["type"] != self.type:
+        for i in self.type_indexes:
+            if shared_curves[i] == None: # not simulated yet
+                value_list.append(0)
                 continue
-            thin_indexes = get_thin_indexes(len(prd_curves[i]["x"]), NUM_POINTS)
-            prd_x_list = [prd_curves[i]["x"][j] for j in thin_indexes]
-            prd_y_list = [prd_curves[i]["y"][j] for j in thin_indexes]
-            prd_x_list, prd_dy_list = get_bfd(prd_x_list, prd_y_list)
-            exp_dy_list = self.interpolator_list[i].evaluate(prd_x_list)
-            area = [abs(prd_dy_list[j] - exp_dy_list[j]) for j in range(len(prd_dy_list)) if prd_x_list[j] <= self.exp_x_end_list[i]]
+            prd_x, prd_dy = shared_curves[i].get_bfd(NUM_POINTS)
+            exp_dy = self.interpolator_list[i].evaluate_array(prd_x)
+            area = np.abs(prd_dy - exp_dy)[prd_x <= self.exp_x_end_list[i]]
             value_list.append(np.average(area) / self.avg_dy_list[i])
-        return np.average(value_list)
\ No newline at end of file
+        return np.average(value_list)
+
+    # Computes the error values of a population
+    def get_batch_values(self, ragged_curves):
+        prd_x, prd_dy, increasing = ragged_curves.get_bfd(NUM_POINTS)
+        value_list = np.zeros((ragged_curves.num_individuals, len(self.type_indexes)))
+        for j, i in enumerate(self.type_indexes):
+            exp_dy = self.interpolator_list[i].evaluate_array(prd_x[:,i])
+            area = get_masked_averages(np.abs(prd_dy[:,i] - exp_dy), increasing[:,i] & (prd_x[:,i] <= self.exp_x_end_list[i]))
+            value_list[:,j] = np.where(ragged_curves.simulated[:,i], area / self.avg_dy_list[i], 0)
+        return np.average(value_list, axis=1)
\ No newline at end of file
@@ -8,11 +8,8 @@
 # Libraries
 import numpy as np
 import modules.errors.__error__ as error
-
-# Helper libraries
-import sys
-sys.path += ["../__common__"]
-from derivative import Interpolator, get_thin_indexes
+from modules.features import get_interpolator, get_average
+from modules.ragged import get_masked_averages
 
 # Constants
 NUM_POINTS = 50
@@ -24,24 +21,33 @@ class YArea(error.Error):
     def __init__(self, type, exp_curves):
         super().__init__("y_area", type, exp_curves)
     
-    # Prepares for evaluation
+    # Prepares for evaluation (with the indexed features of the experimental curves)
     def prepare(self):
         self.interpolator_list, self.exp_x_end_list, self.avg_y_list = [], [], []
         for exp_curve in self.exp_curves:
-            self.interpolator_list.append(Interpolator(exp_curve["x"], exp_curve["y"], NUM_POINTS))
+            self.interpolator_list.append(get_interpolator(exp_curve, NUM_POINTS))
             self.exp_x_end_list.append(exp_curve["x"][-1])
-            self.avg_y_list.append(np.average(exp_curve["y"]))
+            self.avg_y_list.append(get_average(exp_curve, "y"))
             
     # Computing the error
-    def get_value(self, prd_curves):
+    def get_shared_value(self, shared_curves):
         value_list = []
-        for i in range(len(prd_curves)):
-            if self.exp_curves[i]["type"] != self.type:
+        for i in self.type_indexes:
+            if shared_curves[i] == None: # not simulated yet
+                value_list.append(0)
                 continue
-            thin_indexes = get_thin_indexes(len(prd_curves[i]["x"]), NUM_POINTS)
-            prd_x_list = [prd_curves[i]["x"][j] for j in thin_indexes]
-            prd_y_list = [prd_curves[i]["y"][j] for j in thin_indexes]
-            exp_y_list = self.interpolator_list[i].evaluate(prd_x_list)
-            area = [abs(prd_y_list[j] - exp_y_list[j]) for j in range(NUM_POINTS) if prd_x_list[j] <= self.exp_x_end_list[i]]
+            prd_x, prd_y = shared_curves[i].get_thinned(NUM_POINTS)
+            exp_y = self.interpolator_list[i].evaluate_array(prd_x)
+            area = np.abs(prd_y - exp_y)[prd_x <= self.exp_x_end_list[i]]
             value_list.append(np.average(area) / self.avg_y_list[i])
-        return np.average(value_list)
\ No newline at end of file
+        return np.average(value_list)
+
+    # Computing the errors of a population
+    def get_batch_values(self, ragged_curves):
+        prd_x, prd_y = ragged_curves.get_thinned(NUM_POINTS)
+        value_list = np.zeros((ragged_curves.num_individuals, len(self.type_indexes)))
+        for j, i in enumerate(self.type_indexes):
+            exp_y = self.interpolator_list[i].evaluate_array(prd_x[:,i])
+            area = get_masked_averages(np.abs(prd_y[:,i] - exp_y), prd_x[:,i] <= self.exp_x_end_list[i])
+            value_list[:,j] = np.where(ragged_curves.simulated[:,i], area / self.avg_y_list[i], 0)
+        return np.average(value_list, axis=1)
\ No newline at end of file
@@ -20,9 +20,19 @@ class YEnd(error.Error):
     def prepare(self):
         self.exp_y_end_list = [exp_curve["y"][-1] for exp_curve in self.exp_curves]
     
-    # Computing the error
-    def get_value(self, prd_curves):
-        prd_y_end_list = [prd_curves[i]["y"][-1] for i in range(len(prd_curves))]
-        value_list = [abs(prd_y_end_list[i] - self.exp_y_end_list[i]) / self.exp_y_end_list[i] for i in range(len(self.exp_y_end_list))]
-        value_list = [value_list[i] if self.exp_curves[i]["type"] == self.type else 0 for i in range(len(value_list))]
-        return np.average(value_list)
\ No newline at end of file
+    # Computing the error (curves of other types contribute zeros to the average)
+    def get_shared_value(self, shared_curves):
+        value_list = np.zeros(len(self.exp_y_end_list))
+        for i in self.type_indexes:
+            if shared_curves[i] != None: # not simulated yet otherwise
+                value_list[i] = abs(shared_curves[i].y[-1] - self.exp_y_end_list[i]) / self.exp_y_end_list[i]
+        return np.average(value_list)
+
+    # Computing the errors of a population
+    def get_batch_values(self, ragged_curves):
+        prd_ends = ragged_curves.get_ends("y")
+        exp_ends = np.array(self.exp_y_end_list)
+        value_list = np.zeros((ragged_curves.num_individuals, len(exp_ends)))
+        for i in self.type_indexes:
+            value_list[:,i] = np.where(ragged_curves.simulated[:,i], np.abs(prd_ends[:,i] - exp_ends[i]) / exp_ends[i], 0)
+        return np.average(value_list, axis=1)
\ No newline at end of file
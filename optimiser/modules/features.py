@@ -0,0 +1,115 @@
+"""
+ Title:         Features
+ Description:   For indexing the features of experimental curves by their content (and caching them on disk)
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import atexit, hashlib, os, pickle, sys
+import numpy as np
+
+# Helper libraries
+sys.path += ["../__common__"]
+from derivative import Interpolator, differentiate_curve
+
+# Constants
+VERSION = 1 # increase when the features change (to ignore features cached by older versions)
+
+# The Feature Index class
+class FeatureIndex:
+
+    # Constructor
+    def __init__(self):
+        self.features = {} # (content hash, feature name) -> feature
+        self.file_path = None
+        self.hits, self.misses = 0, 0
+        self.dirty = False # whether features have been computed since the file was last written
+
+    # Caches the features in a file (and loads any features already cached there)
+    #   (the features computed later are written when the errors and constraints are prepared, and at exit)
+    def set_file_path(self, file_path):
+        if self.file_path == None:
+            atexit.register(self.save)
+        self.file_path = file_path
+        if not os.path.exists(file_path):
+            return
+        with open(file_path, "rb") as file:
+            version, features = pickle.load(file)
+        if version == VERSION:
+            self.features.update(features)
+
+    # Returns a feature of a curve (computed and cached only if the curve's content has not been seen)
+    #   name:    name of the feature (including any arguments that it is computed with)
+    #   compute: function that computes the feature from the curve
+    def get(self, curve, name, compute):
+        return self.get_by_key((get_content_hash(curve), name), lambda: compute(curve))
+
+    # Returns a feature of a group of curves (computed and cached only if the content of the group has not been seen)
+    #   name:    name of the feature (including any arguments that it is computed with)
+    #   compute: function that computes the feature from the list of curves
+    def get_group(self, curves, name, compute):
+        group_hash = hashlib.sha1("".join([get_content_hash(curve) for curve in curves]).encode()).hexdigest()
+        return self.get_by_key((group_hash, name), lambda: compute(curves))
+
+    # Returns the feature of a key (computing it if it has not been cached)
+    def get_by_key(self, key, compute):
+        if key in self.features.keys():
+            self.hits += 1
+            return self.features[key]
+        self.misses += 1
+        self.features[key] = compute()
+        self.dirty = True
+        return self.features[key]
+
+    # Writes the features to the file if any have been computed since it was last written
+    #   (atomically so that concurrent runs can share it)
+    def save(self):
+        if self.file_path == None or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.file_path)), exist_ok=True)
+        with open(f"{self.file_path}.{os.getpid()}.tmp", "wb") as file:
+            pickle.dump((VERSION, self.features), file)
+        os.replace(f"{self.file_path}.{os.getpid()}.tmp", self.file_path)
+        self.dirty = False
+
+    # Returns a summary of the index
+    def get_summary(self):
+        return {"size": len(self.features), "hits": self.hits, "misses": self.misses}
+
+# The feature index shared by the errors, constraints, and recorder
+feature_index = FeatureIndex()
+
+# Returns the hash of a curve's data and conditions
+def get_content_hash(curve):
+    content = hashlib.sha1()
+    content.update(np.asarray(curve["x"], dtype=np.float64).tobytes())
+    content.update(np.asarray(curve["y"], dtype=np.float64).tobytes())
+    content.update(repr([(key, curve[key]) for key in sorted(curve.keys()) if not key in ["x", "y"]]).encode())
+    return content.hexdigest()
+
+# Returns the interpolator of a curve (of the x values over the y values if swapped)
+def get_interpolator(curve, resolution=50, swapped=False):
+    if swapped:
+        return feature_index.get(curve, f"interpolator {resolution} swapped", lambda curve: Interpolator(curve["y"], curve["x"], resolution))
+    return feature_index.get(curve, f"interpolator {resolution}", lambda curve: Interpolator(curve["x"], curve["y"], resolution))
+
+# Returns the interpolator of the derivative of a curve
+def get_d_interpolator(curve, resolution=50):
+    def compute(curve):
+        interpolator = Interpolator(curve["x"], curve["y"], resolution)
+        interpolator.differentiate()
+        return interpolator
+    return feature_index.get(curve, f"d_interpolator {resolution}", compute)
+
+# Returns the average of the derivative of a curve (evaluated at every x value)
+def get_avg_dy(curve, resolution=50):
+    return feature_index.get(curve, f"avg_dy {resolution}", lambda curve: np.average(get_d_interpolator(curve, resolution).evaluate(curve["x"])))
+
+# Returns the average of the x or y values of a curve
+def get_average(curve, field):
+    return feature_index.get(curve, f"average {field}", lambda curve: np.average(curve[field]))
+
+# Returns the differentiated curve (which must not be modified)
+def get_d_curve(curve):
+    return feature_index.get(curve, "d_curve", differentiate_curve)
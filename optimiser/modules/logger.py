@@ -0,0 +1,80 @@
+"""
+ Title:         Logger
+ Description:   For logging every evaluation to binary columnar files
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import atexit, json, os, sys
+import numpy as np
+
+# Helper libraries
+sys.path += ["../__common__"]
+from general import safe_mkdir
+
+# Constants
+MANIFEST_FILE = "manifest.json"
+
+# The Logger class
+class Logger:
+
+    # Constructor
+    #   column_info: list of (column name, numpy data type) pairs
+    #   chunk_size:  number of records to buffer before appending them to the files
+    def __init__(self, dir_path, column_info, chunk_size=1000):
+
+        # Initialise
+        self.dir_path   = dir_path
+        self.names      = [column[0] for column in column_info]
+        self.dtypes     = [column[1] for column in column_info]
+        self.chunk_size = chunk_size
+        self.buffer     = []
+        self.num_logged = 0
+
+        # Create directory and describe the columns
+        safe_mkdir(dir_path)
+        manifest = {"columns": [{"name": name, "dtype": dtype} for name, dtype in zip(self.names, self.dtypes)]}
+        with open(f"{dir_path}/{MANIFEST_FILE}", "w+") as file:
+            json.dump(manifest, file, indent=4)
+        atexit.register(self.close)
+
+    # Appends a record (in the order of the columns)
+    def append(self, values):
+        self.buffer.append(values)
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    # Appends the buffered records to the column files
+    def flush(self):
+        if len(self.buffer) == 0:
+            return
+        data = np.array(self.buffer, dtype=np.float64)
+        for i in range(len(self.names)):
+            with open(get_column_path(self.dir_path, self.names[i]), "ab") as file:
+                data[:,i].astype(self.dtypes[i]).tofile(file)
+        self.num_logged += len(self.buffer)
+        self.buffer = []
+
+    # Flushes the remaining records
+    def close(self):
+        self.flush()
+
+# Returns the path to the file of a column
+def get_column_path(dir_path, name):
+    return f"{dir_path}/{name}.bin"
+
+# Reads a log into a dictionary of numpy arrays (one per column)
+def read_log(dir_path):
+    with open(f"{dir_path}/{MANIFEST_FILE}", "r") as file:
+        manifest = json.load(file)
+
+    # Read each column
+    log = {}
+    for column in manifest["columns"]:
+        path = get_column_path(dir_path, column["name"])
+        log[column["name"]] = np.fromfile(path, dtype=column["dtype"]) if os.path.exists(path) else np.array([], dtype=column["dtype"])
+
+    # Ignore incomplete records (e.g., if interrupted while appending)
+    num_records = min([len(values) for values in log.values()])
+    return {name: log[name][:num_records] for name in log.keys()}
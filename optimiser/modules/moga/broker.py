@@ -0,0 +1,178 @@
+"""
+ Title:         Broker
+ Description:   For evaluating individuals on workers that connect over TCP (from any number of hosts)
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import queue, sys, threading, time
+from collections import deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client, wait
+from modules.moga.pool import merge_results, evaluate_curves
+
+# Helper libraries
+sys.path += ["../__common__"]
+from stopwatch import is_enabled
+
+# The Broker class
+class Broker:
+
+    # Constructor
+    #   address:      host and port to listen for the workers on
+    #   authkey:      key that the workers must authenticate with
+    #   heartbeat:    seconds between the heartbeats of the workers
+    #   lost_timeout: seconds without hearing from a worker before it is lost (and its task is requeued)
+    def __init__(self, objective, address=("localhost", 6000), authkey="calibrate", heartbeat=5, lost_timeout=30):
+        model = objective.get_model()
+        self.objective = objective
+        self.init_args = (model.get_name(), model.get_exp_curves(), model.get_args(), objective.get_error_list(), objective.get_constraint_list(), is_enabled(), model.get_fidelity())
+        self.heartbeat = heartbeat
+        self.lost_timeout = lost_timeout
+        self.workers = {} # connection -> [id of the task being evaluated (None if idle), time last heard from]
+        self.next_task_id = 0
+        self.num_lost, self.num_requeued, self.num_duplicates, self.num_crashes = 0, 0, 0, 0
+
+        # Accept workers in the background
+        self.closed = False
+        self.address, self.authkey = tuple(address), authkey.encode()
+        self.connections = queue.Queue()
+        self.listener = Listener(self.address, authkey=self.authkey)
+        self.thread = threading.Thread(target=self.__accept__, daemon=True)
+        self.thread.start()
+
+    # Accepts the connections of workers until closed
+    def __accept__(self):
+        while True:
+            try:
+                connection = self.listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                continue
+            if self.closed:
+                connection.close()
+                return
+            self.connections.put(connection)
+
+    # Prepares the workers that have connected since the last call
+    def add_workers(self):
+        while True:
+            try:
+                connection = self.connections.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                connection.send(("init", self.init_args, self.heartbeat))
+                self.workers[connection] = [None, time.time()]
+            except OSError:
+                connection.close()
+
+    # Removes a lost worker and requeues its task (unless the task is finished or evaluated by another worker)
+    def remove_worker(self, connection, tasks, pending, results):
+        task_id = self.workers.pop(connection)[0]
+        connection.close()
+        self.num_lost += 1
+        in_flight = [worker[0] for worker in self.workers.values()]
+        if task_id in tasks.keys() and not task_id in results.keys() and not task_id in in_flight:
+            pending.appendleft(task_id)
+            self.num_requeued += 1
+
+    # Returns a task that is evaluated by exactly one worker, to also evaluate with an idle worker (None if none)
+    #   (whichever worker finishes first provides the result, and the other result is discarded)
+    def get_straggler(self, tasks, results):
+        in_flight = [worker[0] for worker in self.workers.values()]
+        for task_id in in_flight:
+            if task_id in tasks.keys() and not task_id in results.keys() and in_flight.count(task_id) == 1:
+                return task_id
+        return None
+
+    # Evaluates a list of parameters (results are returned in the same order, and the timings of the workers are merged)
+    #   bound_errors: evaluates the individuals lazily with these bounds if defined
+    #   (waits for workers to connect if there are none, and individuals that crash the worker's evaluator
+    #   are evaluated as if they had no predicted curves)
+    def evaluate(self, params_list, batched=False, bound_errors=None):
+
+        # Define the tasks (with identifiers that are unique across evaluations)
+        tasks = {}
+        for params in params_list:
+            tasks[self.next_task_id] = params
+            self.next_task_id += 1
+        pending = deque(tasks.keys())
+        results = {}
+
+        # Evaluate until every task has a result
+        while len(results) < len(tasks):
+            self.add_workers()
+
+            # Assign tasks to the idle workers
+            for connection in list(self.workers.keys()):
+                if self.workers[connection][0] != None:
+                    continue
+                task_id = pending.popleft() if len(pending) > 0 else self.get_straggler(tasks, results)
+                if task_id == None:
+                    break
+                try:
+                    connection.send(("task", task_id, tasks[task_id], bound_errors))
+                    self.workers[connection] = [task_id, time.time()]
+                except OSError:
+                    pending.appendleft(task_id)
+                    self.remove_worker(connection, tasks, pending, results)
+
+            # Receive results and heartbeats (the first result of a task is kept)
+            for connection in wait(list(self.workers.keys()), timeout=self.heartbeat):
+                try:
+                    message = connection.recv()
+                except (EOFError, OSError):
+                    self.remove_worker(connection, tasks, pending, results)
+                    continue
+                self.workers[connection][1] = time.time()
+                if message[0] in ["result", "crashed"]:
+                    task_id = message[1]
+                    self.workers[connection][0] = None
+                    if task_id in results.keys() or not task_id in tasks.keys():
+                        self.num_duplicates += 1
+                    elif message[0] == "result":
+                        results[task_id] = merge_results(*message[2:])
+                    else:
+                        results[task_id] = evaluate_curves(self.objective, [], time.time())
+                        self.num_crashes += 1
+
+            # Remove the busy workers that have not been heard from
+            for connection in list(self.workers.keys()):
+                task_id, last_time = self.workers[connection]
+                if task_id != None and time.time() - last_time > self.lost_timeout:
+                    self.remove_worker(connection, tasks, pending, results)
+
+        # Return the results in order
+        return [results[task_id] for task_id in tasks.keys()]
+
+    # Returns a summary of the workers
+    def get_summary(self):
+        return {"workers": len(self.workers), "lost": self.num_lost, "requeued": self.num_requeued, "duplicates": self.num_duplicates, "crashes": self.num_crashes}
+
+    # Stops listening and releases the workers (which wait for the next broker)
+    def close(self):
+
+        # Stop accepting connections (waking the thread with a connection of its own)
+        self.closed = True
+        threading.Thread(target=wake, args=(self.address, self.authkey), daemon=True).start()
+        self.thread.join()
+        self.listener.close()
+        while not self.connections.empty():
+            self.connections.get_nowait().close()
+
+        # Release the workers
+        for connection in self.workers.keys():
+            try:
+                connection.send(("stop",))
+            except OSError:
+                pass
+            connection.close()
+        self.workers = {}
+
+# Connects to a listener (to wake the thread accepting its connections)
+def wake(address, authkey):
+    try:
+        Client(address, authkey=authkey).close()
+    except (OSError, EOFError):
+        pass
@@ -0,0 +1,29 @@
+"""
+ Title:         Checkpoint
+ Description:   For saving and loading the state of the optimisation
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import os, pickle, tempfile
+
+# Saves a state (or an already pickled state) to a file
+#   (atomically, so an interrupted save never corrupts an existing checkpoint)
+def save_checkpoint(file_path, state):
+    dir_path = os.path.dirname(os.path.abspath(file_path))
+    file_descriptor, tmp_path = tempfile.mkstemp(dir=dir_path, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as file:
+            file.write(state if isinstance(state, bytes) else pickle.dumps(state))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+# Loads a state from a file
+def load_checkpoint(file_path):
+    with open(file_path, "rb") as file:
+        return pickle.load(file)
@@ -0,0 +1,147 @@
+"""
+ Title:         Islands
+ Description:   For running independent populations in parallel with periodic migration
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import queue, random, sys
+import numpy as np
+import multiprocessing as mp
+from pymoo.core.population import Population
+from modules.moga import pool
+from modules.moga.problem import Problem
+from modules.moga.moga import get_algorithm
+
+# Helper libraries
+sys.path += ["../__common__"]
+from stopwatch import is_enabled
+
+# The Islands class
+class Islands:
+
+    # Constructor
+    #   num_islands:        number of populations (each evolved in its own process)
+    #   crossover:          crossover probability (or a list with one per island)
+    #   mutation:           mutation probability (or a list with one per island)
+    #   migration_interval: number of generations between migrations
+    #   num_migrants:       number of elite individuals that migrate to the next island (in a ring)
+    #   seed:               seed of the first island (the other islands are seeded consecutively; None for random)
+    def __init__(self, problem, num_islands, num_gens, init_pop, offspring, crossover, mutation, migration_interval=10, num_migrants=5, seed=None):
+
+        # Initialise
+        self.problem    = problem
+        self.num_islands = num_islands
+        self.num_gens   = num_gens
+        self.init_pop   = init_pop
+        self.offspring  = offspring
+        self.crossover  = crossover if isinstance(crossover, list) else [crossover] * num_islands
+        self.mutation   = mutation if isinstance(mutation, list) else [mutation] * num_islands
+        self.migration_interval = migration_interval
+        self.num_migrants = num_migrants
+        self.seed       = seed if seed != None else np.random.randint(0, 2**31 - num_islands)
+        if len(self.crossover) != num_islands or len(self.mutation) != num_islands:
+            raise ValueError(f"The crossover and mutation probabilities must be defined for each island ({num_islands})!")
+
+    # Runs the islands and merges their evaluations into the recorder of the problem
+    def optimise(self):
+
+        # Start the islands (each receives migrants from the previous island)
+        model = self.problem.objective.get_model()
+        init_args = (model.get_name(), model.get_exp_curves(), model.get_args(), self.problem.objective.get_error_list(),
+                     self.problem.objective.get_constraint_list(), is_enabled(), model.get_fidelity())
+        batched = self.problem.batched
+        results = mp.Queue()
+        inboxes = [mp.Queue() for _ in range(self.num_islands)]
+        processes = []
+        for i in range(self.num_islands):
+            hyperparameters = (self.init_pop, self.offspring, self.crossover[i], self.mutation[i])
+            args = (i, init_args, hyperparameters, self.num_gens, self.seed + i, self.migration_interval,
+                    self.num_migrants, inboxes[i], inboxes[(i+1) % self.num_islands], results, batched)
+            process = mp.Process(target=run_island, args=args, daemon=True)
+            process.start()
+            processes.append(process)
+
+        # Record the evaluations until every island finishes (or dies)
+        num_running = self.num_islands
+        while num_running > 0:
+            try:
+                index, result = results.get(timeout=1)
+            except queue.Empty:
+                if not True in [process.is_alive() for process in processes] and results.empty():
+                    break
+                continue
+            if result == None:
+                num_running -= 1
+                continue
+            params, error_values, constraint_values, duration, generation = result
+            self.problem.recorder.generation = generation
+            self.problem.recorder.update_results(params, error_values, constraint_values, [], duration)
+
+        # Stop the islands
+        for process in processes:
+            process.join()
+
+# Relays the evaluations of an island to the main process (in place of a recorder)
+class Relay:
+
+    # Constructor
+    def __init__(self, index, results):
+        self.index = index
+        self.results = results
+        self.generation = 0
+
+    # Advances the generation of the evaluations (called after each generation)
+    def next_generation(self):
+        self.generation += 1
+
+    # Sends the results of an evaluation with its generation (the predicted curves are not sent)
+    def update_results(self, params, errors, constraints, prd_curves=[], duration=0):
+        self.results.put((self.index, (list(params), list(errors), list(constraints), duration, self.generation)))
+
+# Evolves the population of an island, and exchanges elite individuals with the neighbouring islands
+#   batched: evaluates the population of each generation with one call to the model
+def run_island(index, init_args, hyperparameters, num_gens, seed, migration_interval, num_migrants, inbox, outbox, results, batched=False):
+
+    # Prepare the island
+    pool.initialise_worker(*init_args)
+    np.random.seed(seed)
+    random.seed(seed)
+    relay = Relay(index, results)
+    problem = Problem(pool.worker_objective, relay, 1, batched)
+    algo = get_algorithm(*hyperparameters)
+    algo.setup(problem, termination=("n_gen", num_gens), seed=seed, verbose=False)
+
+    # Evolve the population (and migrate periodically)
+    while algo.has_next():
+        algo.next()
+        relay.next_generation()
+        num_gens_completed = algo.n_gen - 1 # counter is advanced after each generation
+        if num_gens_completed % migration_interval == 0 and algo.has_next():
+            migrate(algo, problem, num_migrants, inbox, outbox)
+    results.put((index, None))
+
+# Sends the elite individuals of a population, and replaces the worst individuals with any received
+#   (migrants are received without waiting so that the islands do not synchronise, and are sent as evaluated
+#   individuals so that their errors, constraints, and feasibility are all kept)
+def migrate(algo, problem, num_migrants, inbox, outbox):
+
+    # Send the elite individuals (by rank, then crowding distance)
+    rank, crowding = algo.pop.get("rank"), algo.pop.get("crowding")
+    elite_indexes = np.lexsort((-crowding, rank))[:num_migrants]
+    outbox.put(algo.pop[elite_indexes])
+
+    # Receive migrants
+    migrants = []
+    while True:
+        try:
+            migrants.append(inbox.get_nowait())
+        except queue.Empty:
+            break
+    if migrants == []:
+        return
+
+    # Merge the migrants and keep the fittest individuals
+    merged = Population.merge(algo.pop, *migrants)
+    algo.pop = algo.survival.do(problem, merged, n_survive=len(algo.pop), algorithm=algo)
@@ -6,17 +6,23 @@
 """
 
 # Libraries
+import pickle, random, signal, sys
+import numpy as np
 from pymoo.algorithms.moo.nsga2 import NSGA2
 from pymoo.operators.sampling.lhs import LHS
 from pymoo.operators.crossover.sbx import SBX
 from pymoo.operators.mutation.pm import PolynomialMutation
-from pymoo.optimize import minimize
+from modules.moga.checkpoint import save_checkpoint
 
 # The Multi-Objective Genetic Algorithm (MOGA) class
 class MOGA:
     
     # Constructor
-    def __init__(self, problem, num_gens, init_pop, offspring, crossover, mutation):
+    #   terminator:          criteria to stop before the number of generations is reached (None for no criteria)
+    #   scheduler:           schedule of the fidelity of the predictions (None to always use the full fidelity)
+    #   checkpoint_path:     path to save the checkpoints to (None to disable checkpointing)
+    #   checkpoint_interval: number of generations between checkpoints
+    def __init__(self, problem, num_gens, init_pop, offspring, crossover, mutation, terminator=None, scheduler=None, checkpoint_path=None, checkpoint_interval=10):
         
         # Initialise
         self.problem    = problem
@@ -25,17 +31,117 @@ class MOGA:
         self.offspring  = offspring
         self.crossover  = crossover
         self.mutation   = mutation
+        self.terminator = terminator
+        self.scheduler  = scheduler
+        self.checkpoint_path     = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.terminated = False # whether SIGTERM was received (checkpointed after the current generation)
 
         # Define algorithm
-        self.algo = NSGA2(
-            pop_size     = init_pop,
-            n_offsprings = offspring,
-            sampling     = LHS(),                               # latin hypercube sampling
-            crossover    = SBX(prob=crossover, prob_var=1.0),   # simulated binary crossover 
-            mutation     = PolynomialMutation(prob=mutation),   # polynomial mutation
-            eliminate_duplicates = True
-        )
+        self.algo = get_algorithm(init_pop, offspring, crossover, mutation)
 
     # Runs the genetic optimisation
     def optimise(self):
-        minimize(self.problem, self.algo, ("n_gen", self.num_gens), verbose=False, seed=None)
\ No newline at end of file
+        if self.scheduler != None:
+            self.problem.set_fidelity(self.scheduler.get_fidelity())
+        self.algo.setup(self.problem, termination=("n_gen", self.num_gens), seed=None, verbose=False)
+        self.run()
+
+    # Continues the genetic optimisation from a checkpointed state
+    def resume(self, state):
+        self.algo = state["algorithm"]
+        self.algo.problem = self.problem
+        np.random.set_state(state["np_random"])
+        random.setstate(state["random"])
+        self.problem.recorder.set_state(state["recorder"])
+        if self.terminator != None and state["terminator"] != None:
+            self.terminator.set_state(state["terminator"])
+        if self.scheduler != None and state.get("scheduler") != None:
+            self.scheduler.set_state(state["scheduler"])
+            self.problem.set_fidelity(self.scheduler.get_fidelity())
+        self.run()
+
+    # Runs the generations one at a time (checkpointing periodically, and after the current generation on SIGTERM)
+    def run(self):
+        if self.checkpoint_path != None:
+            handler = signal.signal(signal.SIGTERM, self.terminate)
+        try:
+            stop_reason = None
+            while self.algo.has_next() and stop_reason == None:
+                self.algo.next()
+                self.problem.recorder.next_generation()
+                fidelity = self.scheduler.update(self.problem.recorder) if self.scheduler != None else None
+                if fidelity != None:
+                    self.promote(fidelity)
+                stop_reason = self.terminator.update(self.problem.recorder) if self.terminator != None else None
+                if self.checkpoint_path != None:
+                    self.checkpoint(stop_reason)
+            self.finalise(stop_reason)
+        finally:
+            if self.checkpoint_path != None:
+                signal.signal(signal.SIGTERM, handler)
+
+    # Saves the state of the completed generation if a checkpoint is due (and exits if terminated)
+    def checkpoint(self, stop_reason):
+        num_gens_completed = self.algo.n_gen - 1 # counter is advanced after each generation
+        if self.terminated or num_gens_completed % self.checkpoint_interval == 0 or stop_reason != None or not self.algo.has_next():
+            save_checkpoint(self.checkpoint_path, self.get_state())
+        if self.terminated:
+            self.problem.recorder.record_event(f"Terminated; saved checkpoint to '{self.checkpoint_path}'")
+            sys.exit(128 + signal.SIGTERM)
+
+    # Changes the fidelity of the predictions, and reevaluates the archive and population so they remain comparable
+    #   (the population is ranked again, so that the parents are selected with the reevaluated errors)
+    def promote(self, fidelity):
+        self.problem.recorder.record_event(f"Promoting the fidelity to {fidelity}")
+        self.problem.set_fidelity(fidelity)
+        recorder = self.problem.recorder
+        params_list = np.vstack([self.algo.pop.get("X"), recorder.archive.params[:len(recorder.archive)]])
+        recorder.clear_archive()
+        unique_params_list, inverse = np.unique(params_list, axis=0, return_inverse=True)
+        error_values_list = self.problem.reevaluate(unique_params_list)[inverse]
+        self.algo.pop.set("F", error_values_list[:len(self.algo.pop)])
+        self.algo.pop = self.algo.survival.do(self.problem, self.algo.pop, n_survive=len(self.algo.pop), algorithm=self.algo)
+        if self.terminator != None:
+            self.terminator.reset()
+
+    # Reevaluates at the full fidelity before reporting the final results (if coarser)
+    def finalise(self, stop_reason):
+        promoted = self.scheduler != None and self.problem.model.get_fidelity() < 1
+        if promoted:
+            self.promote(1.0)
+        if stop_reason != None:
+            self.problem.recorder.record_stop(stop_reason)
+        elif promoted:
+            self.problem.recorder.record_progress()
+
+    # Handles SIGTERM (the state is saved once the current generation finishes)
+    def terminate(self, *_):
+        self.terminated = True
+
+    # Returns the pickled state of the optimisation (without the problem)
+    def get_state(self):
+        problem, self.algo.problem = self.algo.problem, None
+        try:
+            return pickle.dumps({
+                "hyperparameters":  (self.num_gens, self.init_pop, self.offspring, self.crossover, self.mutation),
+                "algorithm":        self.algo,
+                "np_random":        np.random.get_state(),
+                "random":           random.getstate(),
+                "recorder":         self.problem.recorder.get_state(),
+                "terminator":       self.terminator.get_state() if self.terminator != None else None,
+                "scheduler":        self.scheduler.get_state() if self.scheduler != None else None,
+            })
+        finally:
+            self.algo.problem = problem
+
+# Returns the genetic algorithm (NSGA-II)
+def get_algorithm(init_pop, offspring, crossover, mutation):
+    return NSGA2(
+        pop_size     = init_pop,
+        n_offsprings = offspring,
+        sampling     = LHS(),                               # latin hypercube sampling
+        crossover    = SBX(prob=crossover, prob_var=1.0),   # simulated binary crossover 
+        mutation     = PolynomialMutation(prob=mutation),   # polynomial mutation
+        eliminate_duplicates = True
+    )
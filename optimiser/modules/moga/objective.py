@@ -6,7 +6,14 @@
 """
 
 # Libraries
-import math
+import math, sys
+import numpy as np
+from modules.errors.__error__ import get_shared_curves
+from modules.ragged import RaggedCurves
+
+# Helper libraries
+sys.path += ["../__common__"]
+from stopwatch import Timer
 
 # Constants
 BIG_VALUE = 100
@@ -24,6 +31,18 @@ class Objective():
     def get_model(self):
         return self.model
 
+    # Replaces the model (e.g., with a wrapped model)
+    def set_model(self, model):
+        self.model = model
+
+    # Returns the list of errors
+    def get_error_list(self):
+        return self.error_list
+
+    # Returns the list of constraints
+    def get_constraint_list(self):
+        return self.constraint_list
+
     # Returns the objective names
     def get_error_names(self):
         return [error.get_name() for error in self.error_list]
@@ -32,11 +51,13 @@ class Objective():
     def get_error_types(self):
         return [error.get_type() for error in self.error_list]
 
-    # Gets all the errors
+    # Gets all the errors (the predicted curves are converted, thinned, and differentiated once for every error)
     def get_error_values(self, prd_curves):
         if prd_curves == []:
             return [BIG_VALUE] * len(self.error_list)
-        error_values = [error.get_value(prd_curves) for error in self.error_list]
+        with Timer("error curves"):
+            shared_curves = get_shared_curves(prd_curves)
+        error_values = [get_timed_value(error, shared_curves, "error", shared=True) for error in self.error_list]
         error_values = [BIG_VALUE if math.isnan(error_value) else error_value for error_value in error_values]
         return error_values
     
@@ -52,6 +73,31 @@ class Objective():
     def get_constraint_values(self, prd_curves):
         if prd_curves == []:
             return [BIG_VALUE] * len(self.constraint_list)
-        constraint_values = [constraint.get_value(prd_curves) for constraint in self.constraint_list]
+        constraint_values = [get_timed_value(constraint, prd_curves, "constraint") for constraint in self.constraint_list]
         constraint_values = [BIG_VALUE if math.isnan(constraint_value) else constraint_value for constraint_value in constraint_values]
-        return constraint_values
\ No newline at end of file
+        return constraint_values
+
+    # Gets the errors and constraints of a population (as matrices with a row per individual)
+    #   (the predicted curves are packed into flat arrays, and each error and constraint is evaluated once for every individual)
+    def get_values_batch(self, prd_curves_list):
+        with Timer("error curves"):
+            ragged_curves = RaggedCurves(prd_curves_list, len(self.model.get_exp_curves()))
+        error_values_list = get_batch_values(self.error_list, ragged_curves, "error")
+        constraint_values_list = get_batch_values(self.constraint_list, ragged_curves, "constraint")
+        return error_values_list, constraint_values_list
+
+# Returns the values of errors or constraints of a population (and times them)
+#   (values of failed predictions, and NaN values, are big)
+def get_batch_values(function_list, ragged_curves, kind):
+    values_list = np.zeros((ragged_curves.num_individuals, len(function_list)))
+    for i in range(len(function_list)):
+        with Timer(f"{kind} {function_list[i].get_type()}_{function_list[i].get_name()}"):
+            values_list[:,i] = function_list[i].get_batch_values(ragged_curves)
+    values_list[np.isnan(values_list) | ~ragged_curves.valid[:,None]] = BIG_VALUE
+    return values_list
+
+# Returns the value of an error or constraint (and times it)
+#   shared: whether the predicted curves are shared curves (for errors)
+def get_timed_value(function, prd_curves, kind, shared=False):
+    with Timer(f"{kind} {function.get_type()}_{function.get_name()}"):
+        return function.get_shared_value(prd_curves) if shared else function.get_value(prd_curves)
\ No newline at end of file
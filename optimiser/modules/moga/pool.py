@@ -0,0 +1,153 @@
+"""
+ Title:         Pool
+ Description:   For evaluating individuals across a pool of processes
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import sys, time, warnings
+import numpy as np
+import multiprocessing as mp
+from modules.moga.objective import Objective
+
+# Helper libraries
+sys.path += ["../__models__"]
+from __model_factory__ import get_model
+sys.path += ["../__common__"]
+from stopwatch import Timer, record, set_enabled, is_enabled, pop_timings, merge_timings
+
+# The Unfinished Curves class (no predicted curves, for evaluations that were stopped before they finished)
+#   (equal to the empty curves of a failed prediction, but not cached, as the same evaluation may finish later)
+class UnfinishedCurves(list):
+    pass
+
+# The objective of the worker process (each worker holds its own)
+worker_objective = None
+
+# Prepares the model and objective of a worker process
+def initialise_worker(model_name, exp_curves, args, error_list, constraint_list, timing_enabled, fidelity=1.0):
+    global worker_objective
+    set_enabled(timing_enabled)
+    model = get_model(model_name, exp_curves, args)
+    model.set_fidelity(fidelity)
+    worker_objective = Objective(model, error_list, constraint_list)
+
+# Evaluates a set of parameters using the objective of the worker process (and returns its timings)
+def evaluate_in_worker(params):
+    return evaluate(worker_objective, params), pop_timings()
+
+# Evaluates a set of parameters lazily using the objective of the worker process (and returns its timings)
+def evaluate_lazily_in_worker(task):
+    return evaluate_lazily(worker_objective, *task), pop_timings()
+
+# Evaluates a batch of parameters using the objective of the worker process (and returns its timings)
+def evaluate_batch_in_worker(params_list):
+    return evaluate_batch(worker_objective, params_list), pop_timings()
+
+# Evaluates a set of parameters and returns the predicted curves, errors, constraints, and duration
+def evaluate(objective, params):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore") # ignore warnings
+        start_time = time.time()
+        with Timer("predict"):
+            prd_curves = objective.get_model().get_prd_curves(*params)
+        return evaluate_curves(objective, prd_curves, start_time)
+
+# Evaluates a set of parameters one curve at a time, and stops early if the individual is infeasible or hopeless
+#   bound_errors: list of errors that make the individual hopeless if its errors so far are worse in every objective
+#   (stopped individuals are evaluated as if they had no predicted curves, which are marked as unfinished)
+def evaluate_lazily(objective, params, bound_errors=[]):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore") # ignore warnings
+        start_time = time.time()
+        model = objective.get_model()
+        exp_curves = model.get_exp_curves()
+        prd_curves = [None] * len(exp_curves)
+        for i in range(len(exp_curves)):
+
+            # Predict the next curve
+            with Timer("predict"):
+                prd_curve_list = model.ensure_validity(model.get_specified_prd_curves(params, [exp_curves[i]]))
+            if prd_curve_list == []:
+                return evaluate_curves(objective, [], start_time)
+            prd_curves[i] = prd_curve_list[0]
+            
+            # Stop if the remaining curves cannot make the individual feasible or competitive
+            abort_reason = get_abort_reason(objective, prd_curves, bound_errors) if i < len(exp_curves) - 1 else None
+            if abort_reason != None:
+                record(f"aborted ({abort_reason})", time.time() - start_time)
+                return evaluate_curves(objective, UnfinishedCurves(), start_time)
+        return evaluate_curves(objective, prd_curves, start_time)
+
+# Returns the reason to stop evaluating an individual from its partially predicted curves (None to continue)
+#   (the errors and constraints of partially predicted curves are lower bounds)
+def get_abort_reason(objective, prd_curves, bound_errors):
+    constraint_values = objective.get_constraint_values(prd_curves)
+    if len(constraint_values) > 0 and max(constraint_values) > 0:
+        return "infeasible"
+    if len(bound_errors) > 0:
+        error_values = np.array(objective.get_error_values(prd_curves))
+        if np.any(np.all(np.array(bound_errors) <= error_values, axis=1)):
+            return "hopeless"
+    return None
+
+# Evaluates a batch of parameters at once and returns the results of each set of parameters
+#   (the errors and constraints of the batch are evaluated together, and the duration of the batch is shared equally)
+def evaluate_batch(objective, params_list):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore") # ignore warnings
+        start_time = time.time()
+        with Timer("predict batch"):
+            prd_curves_list = objective.get_model().get_prd_curves_batch(params_list)
+        return evaluate_curves_batch(objective, prd_curves_list, start_time)
+
+# Returns the predicted curves (if valid), errors, constraints, and share of the duration since the start time of a batch
+def evaluate_curves_batch(objective, prd_curves_list, start_time):
+    prd_curves_list = [objective.get_model().ensure_validity(prd_curves) for prd_curves in prd_curves_list]
+    with Timer("errors and constraints"):
+        error_values_list, constraint_values_list = objective.get_values_batch(prd_curves_list)
+    duration = (time.time() - start_time) / max(len(prd_curves_list), 1)
+    return [(prd_curves_list[i], error_values_list[i].tolist(), constraint_values_list[i].tolist(), duration) for i in range(len(prd_curves_list))]
+
+# Returns the predicted curves (if valid), errors, constraints, and duration since the start time
+def evaluate_curves(objective, prd_curves, start_time):
+    prd_curves = objective.get_model().ensure_validity(prd_curves)
+    with Timer("errors"):
+        error_values = objective.get_error_values(prd_curves)
+    with Timer("constraints"):
+        constraint_values = objective.get_constraint_values(prd_curves)
+    return prd_curves, error_values, constraint_values, time.time() - start_time
+
+# Merges the timings of a worker and returns its results
+def merge_results(results, timings):
+    merge_timings(timings)
+    return results
+
+# The Pool class
+class Pool:
+
+    # Constructor
+    def __init__(self, objective, num_processes):
+        model = objective.get_model()
+        init_args = (model.get_name(), model.get_exp_curves(), model.get_args(), objective.get_error_list(), objective.get_constraint_list(), is_enabled(), model.get_fidelity())
+        self.num_processes = num_processes
+        self.pool = mp.Pool(num_processes, initialise_worker, init_args)
+
+    # Evaluates a list of parameters (results are returned in the same order, and the timings of the workers are merged)
+    #   bound_errors: evaluates the individuals lazily with these bounds if defined (unless batched)
+    def evaluate(self, params_list, batched=False, bound_errors=None):
+        if not batched and bound_errors != None:
+            results_timings = self.pool.map(evaluate_lazily_in_worker, [(params, bound_errors) for params in params_list])
+            return [merge_results(*result_timings) for result_timings in results_timings]
+        if not batched:
+            results_timings = self.pool.map(evaluate_in_worker, params_list)
+            return [merge_results(*result_timings) for result_timings in results_timings]
+        params_chunks = [chunk for chunk in np.array_split(params_list, self.num_processes) if len(chunk) > 0]
+        results_timings = self.pool.map(evaluate_batch_in_worker, params_chunks)
+        return [result for results, timings in results_timings for result in merge_results(results, timings)]
+
+    # Closes the pool
+    def close(self):
+        self.pool.close()
+        self.pool.join()
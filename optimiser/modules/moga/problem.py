@@ -6,23 +6,49 @@
 """
 
 # Libraries
-import warnings
+import sys
 import numpy as np
-from pymoo.core.problem import ElementwiseProblem
+from pymoo.core.problem import Problem as PymooProblem
+from modules.moga.pool import Pool, UnfinishedCurves, evaluate, evaluate_batch, evaluate_lazily
+from modules.moga.sandbox import Sandbox
+from modules.moga.broker import Broker
+from modules.moga.objective import BIG_VALUE
+
+# Helper libraries
+sys.path += ["../__models__"]
+from __model__ import CachedModel
+sys.path += ["../__common__"]
+from stopwatch import Timer
 
 # The Problem class
-class Problem(ElementwiseProblem):
+class Problem(PymooProblem):
 
     # Constructor
-    def __init__(self, objective, recorder):
+    #   screener:  surrogates that decide which individuals are evaluated with the model (None to evaluate all)
+    #   sandboxed: evaluates each individual in a worker process that is killed if it times out or crashes
+    #   timeout:   maximum time in seconds to evaluate an individual in the sandbox (None for no limit)
+    #   abort_factor: evaluates individuals one curve at a time, and stops if they are infeasible, or if their errors
+    #                 so far are worse than this factor of an archived individual's errors (None to evaluate fully)
+    #   broker_args:  arguments of the broker to evaluate individuals on workers over TCP (None to evaluate locally)
+    def __init__(self, objective, recorder, num_processes=1, batched=False, screener=None, sandboxed=False, timeout=None, abort_factor=None, broker_args=None):
         
         # Initialise
         self.objective  = objective
         self.model      = objective.get_model()
         self.recorder   = recorder
         self.penalty    = 10
+        self.batched    = batched
+        self.screener   = screener
+        self.abort_factor = abort_factor
+        self.num_processes = num_processes
+        self.sandboxed  = sandboxed
+        self.timeout    = timeout
+        self.broker_args = broker_args
+        self.pool       = self.get_pool()
+        if sandboxed or broker_args != None:
+            self.batched = False # individuals are evaluated separately to isolate failures
         
-        # Define the element wise problem
+        # Define the problem (evaluated a population at a time)
         super().__init__(
             n_var        = len(self.model.get_param_info()),
             n_obj        = len(self.objective.get_error_names()),
@@ -30,21 +56,122 @@ class Problem(ElementwiseProblem):
             xu           = np.array(self.model.get_param_upper_bounds()),
         )
     
+    # Returns the pool of processes to evaluate the individuals with (None to evaluate in this process)
+    def get_pool(self):
+        if self.broker_args != None:
+            broker = Broker(self.objective, *self.broker_args)
+            self.recorder.set_broker(broker)
+            return broker
+        if self.sandboxed:
+            sandbox = Sandbox(self.objective, self.num_processes, self.timeout)
+            self.recorder.set_sandbox(sandbox)
+            return sandbox
+        return Pool(self.objective, self.num_processes) if self.num_processes > 1 else None
+
+    # Changes the fidelity of the predictions (the workers are restarted with the new fidelity)
+    def set_fidelity(self, fidelity):
+        if fidelity == self.model.get_fidelity():
+            return
+        self.model.set_fidelity(fidelity)
+        if self.pool != None:
+            self.pool.close()
+            self.pool = self.get_pool()
+
+    # Reevaluates individuals at the current fidelity (or evaluates them outside of the optimisation) and returns their errors
+    #   (the archive is updated, but the reevaluations do not count towards the optimisation)
+    def reevaluate(self, params_list):
+        results = self.get_model_results(params_list)
+        error_values_list = []
+        for params, (prd_curves, error_values, constraint_values, _) in zip(params_list, results):
+            feasible_list = [constraint <= 0 for constraint in constraint_values]
+            error_values = [self.penalty*error for error in error_values] if False in feasible_list else error_values
+            if not BIG_VALUE in error_values:
+                self.recorder.update_population(params, error_values, constraint_values, prd_curves)
+            error_values_list.append(error_values)
+        return np.array(error_values_list)
+
     # Minimises expression "F" such that the expression "G <= 0" is satisfied
-    def _evaluate(self, params, out, *args, **kwargs):
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore") # ignore warnings
+    def _evaluate(self, params_list, out, *args, **kwargs):
+        with Timer("evaluate"):
+            self.__evaluate__(params_list, out)
+
+    # Evaluates the individuals and updates the recorder
+    def __evaluate__(self, params_list, out):
+
+        # Get predicted curves, errors, and constraints of every individual
+        results = self.get_results(params_list)
 
-            # Get errors and constraints
-            prd_curves = self.model.get_prd_curves(*params)
-            prd_curves = self.model.ensure_validity(prd_curves)
-            error_values = self.objective.get_error_values(prd_curves)
-            constraint_values = self.objective.get_constraint_values(prd_curves)
+        # Process the results in order
+        error_values_list = []
+        for params, result in zip(params_list, results):
+
+            # Give individuals rejected by the screener big errors (without counting them as evaluations)
+            if result == None:
+                self.recorder.update_screened()
+                error_values_list.append([BIG_VALUE] * self.n_obj)
+                continue
 
             # Check constraints and adjust error values
+            prd_curves, error_values, constraint_values, duration = result
             feasible_list = [constraint <= 0 for constraint in constraint_values]
             error_values = [self.penalty*error for error in error_values] if False in feasible_list else error_values
             
-            # Update the recorder and pass in error values
-            self.recorder.update_results(params, error_values, constraint_values)
-            out["F"] = error_values
\ No newline at end of file
+            # Update the recorder and store error values
+            with Timer("recorder"):
+                self.recorder.update_results(params, error_values, constraint_values, prd_curves, duration)
+            error_values_list.append(error_values)
+        
+        # Pass in error values
+        out["F"] = np.array(error_values_list)
+
+    # Evaluates a list of parameters and returns the results in the same order
+    #   (individuals rejected by the screener are not evaluated, and their results are None)
+    def get_results(self, params_list):
+        if self.screener == None:
+            return self.get_model_results(params_list)
+        screened_indexes = self.screener.screen(params_list)
+        screened_results = self.get_model_results(params_list[screened_indexes]) if len(screened_indexes) > 0 else []
+        self.screener.add_samples(params_list[screened_indexes], [result[0] for result in screened_results])
+        results = [None] * len(params_list)
+        for i, result in zip(screened_indexes, screened_results):
+            results[i] = result
+        return results
+
+    # Evaluates a list of parameters with the model and returns the results in the same order
+    def get_model_results(self, params_list):
+        bound_errors = self.get_bound_errors()
+        if self.pool == None and self.batched:
+            return evaluate_batch(self.objective, params_list)
+        elif self.pool == None and bound_errors != None:
+            return [evaluate_lazily(self.objective, params, bound_errors) for params in params_list]
+        elif self.pool == None:
+            return [evaluate(self.objective, params) for params in params_list]
+        
+        # Evaluate cached predictions in this process, and the rest with the pool
+        results = [None] * len(params_list)
+        uncached_indexes = []
+        for i in range(len(params_list)):
+            if isinstance(self.model, CachedModel) and self.model.is_cached(params_list[i]):
+                results[i] = evaluate(self.objective, params_list[i])
+            else:
+                uncached_indexes.append(i)
+        uncached_results = self.pool.evaluate(params_list[uncached_indexes], self.batched, bound_errors) if len(uncached_indexes) > 0 else []
+
+        # Combine results (and cache those from the pool, unless they were stopped before they finished)
+        for i, result in zip(uncached_indexes, uncached_results):
+            if isinstance(self.model, CachedModel) and not isinstance(result[0], UnfinishedCurves):
+                self.model.add_to_cache(params_list[i], result[0])
+            results[i] = result
+        return results
+
+    # Returns the errors that make individuals hopeless when evaluated lazily (None if not evaluated lazily)
+    def get_bound_errors(self):
+        if self.abort_factor == None:
+            return None
+        archive = self.recorder.archive
+        return (self.abort_factor * archive.errors[:archive.size]).tolist()
+
+    # Closes the pool of processes (if any)
+    def close(self):
+        if self.pool != None:
+            self.pool.close()
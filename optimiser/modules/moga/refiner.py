@@ -0,0 +1,79 @@
+"""
+ Title:         Refiner
+ Description:   For refining the best individuals with a bounded local optimiser after the global optimisation
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import numpy as np
+from scipy.optimize import least_squares
+from modules.moga.objective import BIG_VALUE
+
+# The Refiner class
+class Refiner:
+
+    # Constructor
+    #   num_starts: number of the best archived individuals to refine
+    #   max_iters:  maximum number of trial points of the local optimiser for each individual
+    #   step:       step of the finite differences (as a fraction of the parameter ranges)
+    #   tolerance:  relative reduction in the sum of squared errors below which the local optimiser stops
+    def __init__(self, problem, num_starts=5, max_iters=20, step=1e-3, tolerance=1e-4):
+        self.problem    = problem
+        self.num_starts = num_starts
+        self.max_iters  = max_iters
+        self.step       = step
+        self.tolerance  = tolerance
+        self.lower_bounds = np.array(problem.xl, dtype=np.float64)
+        self.upper_bounds = np.array(problem.xu, dtype=np.float64)
+        self.residuals  = {} # unit-scaled parameters (as bytes) -> errors
+        self.num_evals  = 0
+        self.num_failed = 0
+        self.initial_best, self.refined_best = None, None
+
+    # Refines the best individuals of the archive (the refined individuals are added to the archive)
+    #   (the sum of squared errors is minimised with the errors as residuals)
+    def refine(self):
+        archive = self.problem.recorder.archive
+        if len(archive) == 0:
+            return
+        params_list = archive.get_individuals(archive.get_best_indexes(self.num_starts))[0].copy()
+        self.problem.recorder.record_event(f"Refining the {len(params_list)} best individual(s)")
+        self.initial_best = np.min(archive.get_error_sqr_sums())
+        for params in params_list:
+            self.residuals = {}
+            x = np.clip((params - self.lower_bounds) / (self.upper_bounds - self.lower_bounds), 0, 1)
+            result = least_squares(self.get_residuals, x, jac=self.get_jacobian, bounds=(0, 1), method="trf",
+                                   max_nfev=self.max_iters, ftol=self.tolerance, xtol=self.step, gtol=None)
+            self.num_failed += 0 if result.success else 1
+        self.refined_best = np.min(self.problem.recorder.archive.get_error_sqr_sums())
+
+    # Evaluates unit-scaled parameters with the problem and returns their errors (in the same order)
+    #   (the evaluations are not counted towards the optimisation, and the errors are clipped to the big error given to
+    #   failed evaluations, so that penalised or failed evaluations do not overflow the jacobian)
+    def evaluate(self, x_list):
+        params_list = self.lower_bounds + np.array(x_list) * (self.upper_bounds - self.lower_bounds)
+        errors_list = self.problem.reevaluate(params_list)
+        self.num_evals += len(x_list)
+        for x, errors in zip(x_list, errors_list):
+            self.residuals[x.tobytes()] = np.clip(np.nan_to_num(errors, nan=BIG_VALUE, posinf=BIG_VALUE, neginf=-BIG_VALUE), -BIG_VALUE, BIG_VALUE)
+        return [self.residuals[x.tobytes()] for x in x_list]
+
+    # Returns the errors of unit-scaled parameters (reusing any previous evaluation)
+    def get_residuals(self, x):
+        if x.tobytes() in self.residuals.keys():
+            return self.residuals[x.tobytes()]
+        return self.evaluate([x])[0]
+
+    # Returns the jacobian of the errors by forward differences (with the perturbations evaluated together)
+    #   (the perturbations are reversed at the upper bounds)
+    def get_jacobian(self, x):
+        residuals = self.get_residuals(x)
+        steps = np.where(x + self.step > 1, -self.step, self.step)
+        x_list = [x + np.eye(len(x))[i] * steps[i] for i in range(len(x))]
+        perturbed_residuals = np.array(self.evaluate(x_list))
+        return ((perturbed_residuals - residuals) / steps[:,None]).T
+
+    # Returns a summary of the refinement
+    def get_summary(self):
+        return {"evaluations": self.num_evals, "unconverged": self.num_failed, "initial_best": self.initial_best, "refined_best": self.refined_best}
@@ -0,0 +1,118 @@
+"""
+ Title:         Sandbox
+ Description:   For evaluating individuals in worker processes that are killed if they time out or crash
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import sys, time
+import multiprocessing as mp
+from multiprocessing.connection import wait
+from modules.moga.pool import UnfinishedCurves, initialise_worker, evaluate_in_worker, evaluate_lazily_in_worker, evaluate_curves
+
+# Helper libraries
+sys.path += ["../__common__"]
+from stopwatch import is_enabled, merge_timings
+
+# Runs a worker process that evaluates the parameters it receives (until it receives None)
+def run_worker(connection, init_args):
+    initialise_worker(*init_args)
+    while True:
+        task = connection.recv()
+        if task == None:
+            return
+        params, bound_errors = task
+        connection.send(evaluate_in_worker(params) if bound_errors == None else evaluate_lazily_in_worker(task))
+
+# The Sandbox class
+class Sandbox:
+
+    # Constructor
+    #   timeout: maximum time in seconds to evaluate an individual (None for no limit)
+    def __init__(self, objective, num_processes, timeout=None):
+        model = objective.get_model()
+        self.init_args = (model.get_name(), model.get_exp_curves(), model.get_args(), objective.get_error_list(), objective.get_constraint_list(), is_enabled(), model.get_fidelity())
+        self.objective = objective
+        self.timeout = timeout
+        self.num_timeouts, self.num_crashes = 0, 0
+        self.workers = [self.start_worker() for _ in range(num_processes)]
+
+    # Starts a worker process and returns it with its connection
+    def start_worker(self):
+        parent_connection, child_connection = mp.Pipe()
+        process = mp.Process(target=run_worker, args=(child_connection, self.init_args), daemon=True)
+        process.start()
+        child_connection.close()
+        return process, parent_connection
+
+    # Kills a worker process and replaces it
+    def replace_worker(self, index):
+        process, connection = self.workers[index]
+        process.kill()
+        process.join()
+        connection.close()
+        self.workers[index] = self.start_worker()
+
+    # Evaluates a list of parameters (results are returned in the same order)
+    #   bound_errors: evaluates the individuals lazily with these bounds if defined
+    #   (individuals that time out or crash are evaluated as if they had no predicted curves, which are marked as
+    #   unfinished if they timed out)
+    def evaluate(self, params_list, batched=False, bound_errors=None):
+        results = [None] * len(params_list)
+        pending_indexes = list(range(len(params_list)))[::-1]
+        running = {} # worker index -> (individual index, start time)
+        while len(pending_indexes) > 0 or len(running) > 0:
+
+            # Send individuals to idle workers
+            for i in range(len(self.workers)):
+                if not i in running.keys() and len(pending_indexes) > 0:
+                    index = pending_indexes.pop()
+                    self.workers[i][1].send((params_list[index], bound_errors))
+                    running[i] = (index, time.time())
+            
+            # Wait for a result or the earliest timeout
+            wait_time = None
+            if self.timeout != None:
+                earliest_start_time = min([start_time for _, start_time in running.values()])
+                wait_time = max(earliest_start_time + self.timeout - time.time(), 0)
+            ready_connections = wait([self.workers[i][1] for i in running.keys()], wait_time)
+
+            # Collect results, and replace workers that crashed or timed out
+            for i in list(running.keys()):
+                index, start_time = running[i]
+                connection = self.workers[i][1]
+                if connection in ready_connections:
+                    try:
+                        results[index], timings = connection.recv()
+                        merge_timings(timings)
+                    except (EOFError, OSError):
+                        self.num_crashes += 1
+                        self.replace_worker(i)
+                        results[index] = evaluate_curves(self.objective, [], start_time)
+                elif self.timeout != None and time.time() - start_time >= self.timeout:
+                    self.num_timeouts += 1
+                    self.replace_worker(i)
+                    results[index] = evaluate_curves(self.objective, UnfinishedCurves(), start_time)
+                else:
+                    continue
+                running.pop(i)
+        return results
+
+    # Returns a summary of the failed evaluations
+    def get_summary(self):
+        return {"timeouts": self.num_timeouts, "crashes": self.num_crashes}
+
+    # Stops the worker processes
+    def close(self):
+        for process, connection in self.workers:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process, connection in self.workers:
+            process.join(1)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            connection.close()
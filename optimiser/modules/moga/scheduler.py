@@ -0,0 +1,48 @@
+"""
+ Title:         Scheduler
+ Description:   For scheduling the fidelity of the predictions (coarse early, then full as the search converges)
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+from modules.moga.terminator import Terminator
+
+# The Scheduler class
+class Scheduler:
+
+    # Constructor
+    #   fidelities: increasing fidelities to optimise with (the last should be 1 for the full fidelity)
+    #   window:     number of generations that the best error must stagnate over before promoting
+    #   tolerance:  relative improvement over the window below which the best error is stagnant
+    def __init__(self, fidelities=[0.25, 0.5, 1.0], window=20, tolerance=0.01):
+        if sorted(fidelities) != list(fidelities) or min(fidelities) <= 0 or max(fidelities) > 1:
+            raise ValueError(f"The fidelities must be increasing and between 0 and 1!")
+        self.fidelities = fidelities
+        self.window     = window
+        self.tolerance  = tolerance
+        self.level      = 0
+        self.terminator = Terminator("error", window, tolerance)
+
+    # Returns the current fidelity
+    def get_fidelity(self):
+        return self.fidelities[self.level]
+
+    # Returns the level and the convergence of the current fidelity (for checkpointing)
+    def get_state(self):
+        return {"level": self.level, "terminator": self.terminator.get_state()}
+
+    # Restores the level and the convergence of the current fidelity
+    def set_state(self, state):
+        self.level = state["level"]
+        self.terminator.set_state(state["terminator"])
+
+    # Updates the convergence after a generation and returns the promoted fidelity (None to stay)
+    def update(self, recorder):
+        if self.level == len(self.fidelities) - 1:
+            return None
+        if self.terminator.update(recorder) == None:
+            return None
+        self.level += 1
+        self.terminator = Terminator("error", self.window, self.tolerance)
+        return self.get_fidelity()
@@ -0,0 +1,98 @@
+"""
+ Title:         Terminator
+ Description:   For stopping the optimisation when it converges or exceeds its budget
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import time
+import numpy as np
+from pymoo.indicators.hv import HV
+
+# Constants
+MIN_ERROR = 1e-16 # errors are floored before taking their logarithm
+
+# The Terminator class
+class Terminator:
+
+    # Constructor
+    #   metric:    metric that must stagnate ("error" for the best sum of squared errors, "hypervolume", or None)
+    #   window:    number of generations that the metric must stagnate over (the hypervolume is only checked once per window)
+    #   tolerance: relative improvement over the window below which the metric is stagnant
+    #   max_evals: maximum number of evaluations (None for no limit)
+    #   max_time:  maximum wall-clock time in seconds (None for no limit)
+    def __init__(self, metric="error", window=100, tolerance=0.001, max_evals=None, max_time=None):
+        if not metric in ["error", "hypervolume", None]:
+            raise ValueError(f"The metric '{metric}' is not supported!")
+        self.metric    = metric
+        self.window    = window
+        self.tolerance = tolerance
+        self.max_evals = max_evals
+        self.max_time  = max_time
+        self.reference = None # reference point of the hypervolume (in log space)
+        self.history   = []   # metric of the sampled generations
+        self.num_gens  = 0    # number of generations since the metrics were reset
+
+    # Returns the metrics of the previous generations (for checkpointing)
+    def get_state(self):
+        return {"reference": self.reference, "history": self.history, "num_gens": self.num_gens}
+
+    # Restores the metrics of the previous generations
+    def set_state(self, state):
+        self.reference = state["reference"]
+        self.history = state["history"]
+        self.num_gens = state["num_gens"]
+
+    # Forgets the metrics of the previous generations (e.g., when the errors are no longer comparable)
+    def reset(self):
+        self.reference = None
+        self.history = []
+        self.num_gens = 0
+
+    # Updates the metrics after a generation and returns the reason to stop (None to continue)
+    def update(self, recorder):
+
+        # Check the budget
+        if self.max_evals != None and recorder.num_evals_completed >= self.max_evals:
+            return f"Reached the maximum number of evaluations ({self.max_evals})"
+        if self.max_time != None and time.time() - recorder.start_time >= self.max_time:
+            return f"Reached the maximum time ({self.max_time}s)"
+        
+        # Sample the metric (the hypervolume is only sampled every window generations, as it is costly)
+        if self.metric == None or len(recorder.archive) == 0:
+            return None
+        self.num_gens += 1
+        sample_interval = self.window if self.metric == "hypervolume" else 1
+        if (self.num_gens - 1) % sample_interval != 0:
+            return None
+        self.history.append(self.get_metric(recorder.archive))
+
+        # Check the stagnation of the metric over the window
+        lag = self.window // sample_interval
+        self.history = self.history[-lag-1:]
+        if len(self.history) <= lag:
+            return None
+        previous, current = self.history[0], self.history[-1]
+        improvement = previous - current if self.metric == "error" else current - previous
+        if improvement <= self.tolerance * abs(previous):
+            return f"Stagnated {self.metric} ({self.window} generations)"
+        return None
+
+    # Returns the metric of the archive
+    def get_metric(self, archive):
+        if self.metric == "error":
+            return float(np.min(archive.get_error_sqr_sums()))
+        return self.get_hypervolume(archive)
+
+    # Returns the hypervolume of the archive in log space
+    #   (relative to a reference point a decade beyond the first archive)
+    def get_hypervolume(self, archive):
+        log_errors = np.log10(np.maximum(archive.errors[:archive.size], MIN_ERROR))
+        if self.reference == None:
+            self.reference = list(np.max(log_errors, axis=0) + 1)
+        reference = np.array(self.reference)
+        log_errors = log_errors[np.all(log_errors < reference, axis=1)]
+        if len(log_errors) == 0:
+            return 0.0
+        return float(HV(ref_point=reference)(log_errors))
@@ -0,0 +1,74 @@
+"""
+ Title:         Ragged Curves
+ Description:   For packing the predicted curves of a population into flat arrays (for batched errors and constraints)
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import numpy as np
+
+# The Ragged Curves class
+class RaggedCurves:
+
+    # Constructor
+    #   prd_curves_list: predicted curves of each individual (empty if the prediction failed)
+    #   num_curves:      number of experimental curves that each individual predicts
+    #   (the curves are packed end to end into flat buffers, and located by their offsets)
+    def __init__(self, prd_curves_list, num_curves):
+
+        # Identify the valid individuals and the simulated curves (curves not simulated yet are None)
+        self.prd_curves_list = prd_curves_list
+        self.num_individuals = len(prd_curves_list)
+        self.num_curves = num_curves
+        self.valid = np.array([prd_curves != [] for prd_curves in prd_curves_list], dtype=bool)
+        curves = [curve for prd_curves in prd_curves_list for curve in (prd_curves if prd_curves != [] else [None] * num_curves)]
+        lengths = np.array([0 if curve == None else len(curve["x"]) for curve in curves], dtype=int)
+
+        # Pack the curves into flat buffers
+        self.offsets = np.concatenate(([0], np.cumsum(lengths)))
+        simulated_curves = [curve for curve in curves if curve != None]
+        if simulated_curves == []:
+            simulated_curves = [{"x": [0], "y": [0]}] # gathers from curves that are not simulated are masked out
+        self.x = np.concatenate([np.asarray(curve["x"], dtype=np.float64) for curve in simulated_curves])
+        self.y = np.concatenate([np.asarray(curve["y"], dtype=np.float64) for curve in simulated_curves])
+        self.lengths = lengths.reshape(self.num_individuals, num_curves)
+        self.starts = self.offsets[:-1].reshape(self.num_individuals, num_curves)
+        self.simulated = self.lengths > 0
+        self.thinned, self.bfds = {}, {}
+
+    # Returns the predicted curves of an individual
+    def get_prd_curves(self, index):
+        return self.prd_curves_list[index]
+
+    # Returns the last x or y values of the curves (individuals by curves; NaN if not simulated)
+    def get_ends(self, field):
+        values = self.x if field == "x" else self.y
+        ends = values[np.maximum(self.starts + self.lengths - 1, 0)]
+        return np.where(self.simulated, ends, np.nan)
+
+    # Returns the thinned x and y values of the curves (individuals by curves by points)
+    #   (thinned as with derivative.get_thin_indexes)
+    def get_thinned(self, num_points):
+        if not num_points in self.thinned.keys():
+            step_sizes = self.lengths / num_points
+            thin_indexes = np.floor(step_sizes[:,:,None] * np.arange(1, num_points-1)).astype(int)
+            thin_indexes = np.concatenate((np.zeros(self.lengths.shape + (1,), dtype=int), thin_indexes, (self.lengths - 1)[:,:,None]), axis=2)
+            indexes = np.clip(self.starts[:,:,None] + thin_indexes, 0, len(self.x) - 1)
+            self.thinned[num_points] = (self.x[indexes], self.y[indexes])
+        return self.thinned[num_points]
+
+    # Returns the backward finite differences of the thinned curves (with their x values, and whether x increases)
+    #   (differences where x does not increase are zero, and must be masked out)
+    def get_bfd(self, num_points):
+        if not num_points in self.bfds.keys():
+            x, y = self.get_thinned(num_points)
+            dx, dy = x[:,:,1:] - x[:,:,:-1], y[:,:,1:] - y[:,:,:-1]
+            increasing = dx > 0
+            self.bfds[num_points] = (x[:,:,1:], np.divide(dy, dx, out=np.zeros(dy.shape), where=increasing), increasing)
+        return self.bfds[num_points]
+
+# Returns the averages of the masked values of each row (NaN for rows without unmasked values)
+def get_masked_averages(values, mask):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.sum(np.where(mask, values, 0), axis=-1) / np.sum(mask, axis=-1)
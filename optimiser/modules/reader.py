@@ -6,44 +6,112 @@
 """
 
 # Libraries
-import sys
+import hashlib, json, os, sys
+import numpy as np
+import pandas as pd
+import multiprocessing as mp
 sys.path += ["../__common__"]
 from curve import get_curve
 
+# Constants
+MANIFEST_FILE = "manifest.json"
+
 # For reading experimental data
-def read_experimental_data(file_paths):
-    exp_curves = []
+#   num_processes: number of processes to parse the files with
+#   cache_path:    directory to cache the parsed data in, which is reused until a file's size or modification time
+#                  changes (None to parse every file)
+def read_experimental_data(file_paths, num_processes=1, cache_path=None):
 
-    # Get experimental data for each path
-    for file_path in file_paths:
+    # Load the cached data of unchanged files
+    manifest = load_manifest(cache_path) if cache_path != None else {}
+    exp_curves = [None] * len(file_paths)
+    parsed_indexes = []
+    for i in range(len(file_paths)):
+        entry = manifest.get(os.path.abspath(file_paths[i]))
+        if entry != None and entry["stamp"] == get_stamp(file_paths[i]):
+            exp_curves[i] = load_curve(f"{cache_path}/{entry['file']}", file_paths[i])
+        else:
+            parsed_indexes.append(i)
+    if parsed_indexes == []:
+        return exp_curves
 
-        # Read data
-        file = open(file_path, "r")
-        headers = file.readline().replace("\n","").split(",")
-        data = [line.replace("\n","").split(",") for line in file.readlines()]
-        file.close()
-        
-        # Get x and y data
-        x_index = headers.index("x")
-        y_index = headers.index("y")
-        x_list = [float(d[x_index]) for d in data]
-        y_list = [float(d[y_index]) for d in data]
-
-        # Get auxiliary information
-        info_dict = {"file_path": file_path}
-        for i in range(len(headers)):
-            if not headers[i] in ["x", "y"]:
-                try:
-                    value = float(data[0][i])
-                except:
-                    value = data[0][i]
-                info_dict[headers[i]] = value
-
-        # Create curve and append
-        exp_curve = get_curve(x_list, y_list, info_dict)
-        exp_curves.append(exp_curve)
+    # Parse the other files (in parallel if more than one process)
+    parsed_file_paths = [file_paths[i] for i in parsed_indexes]
+    if num_processes > 1 and len(parsed_file_paths) > 1:
+        with mp.Pool(min(num_processes, len(parsed_file_paths))) as pool:
+            parsed_curves = pool.map(read_curve, parsed_file_paths)
+    else:
+        parsed_curves = [read_curve(file_path) for file_path in parsed_file_paths]
+    for i, exp_curve in zip(parsed_indexes, parsed_curves):
+        exp_curves[i] = exp_curve
+
+    # Cache the parsed data
+    if cache_path != None:
+        for file_path, exp_curve in zip(parsed_file_paths, parsed_curves):
+            file_name = f"{hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()}.npz"
+            save_curve(f"{cache_path}/{file_name}", exp_curve)
+            manifest[os.path.abspath(file_path)] = {"stamp": get_stamp(file_path), "file": file_name}
+        save_manifest(cache_path, manifest)
     return exp_curves
 
+# Reads the experimental data from a file (the x and y columns are parsed by pandas)
+def read_curve(file_path):
+
+    # Read the headers and the first row (which contains the auxiliary information)
+    with open(file_path, "r") as file:
+        headers = file.readline().replace("\n","").split(",")
+        first_row = file.readline().replace("\n","").split(",")
+
+    # Get x and y data (parsed exactly as with python floats)
+    data = pd.read_csv(file_path, usecols=["x", "y"], dtype=np.float64, float_precision="round_trip")
+    x_list = data["x"].to_numpy()
+    y_list = data["y"].to_numpy()
+
+    # Get auxiliary information
+    info_dict = {"file_path": file_path}
+    for i in range(len(headers)):
+        if not headers[i] in ["x", "y"]:
+            try:
+                value = float(first_row[i])
+            except:
+                value = first_row[i]
+            info_dict[headers[i]] = value
+    return get_curve(x_list, y_list, info_dict)
+
+# Returns the size and modification time of a file (which identify its version)
+def get_stamp(file_path):
+    stat = os.stat(file_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+# Returns the manifest of the cached files (empty if there is none)
+def load_manifest(cache_path):
+    manifest_path = f"{cache_path}/{MANIFEST_FILE}"
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r") as file:
+        return json.load(file)
+
+# Writes the manifest of the cached files (atomically so that concurrent runs can share it)
+def save_manifest(cache_path, manifest):
+    manifest_path = f"{cache_path}/{MANIFEST_FILE}"
+    with open(f"{manifest_path}.{os.getpid()}.tmp", "w+") as file:
+        json.dump(manifest, file, indent=4)
+    os.replace(f"{manifest_path}.{os.getpid()}.tmp", manifest_path)
+
+# Loads a cached curve (with the path that it was read from)
+def load_curve(cache_file_path, file_path):
+    with np.load(cache_file_path) as data:
+        info_dict = {"file_path": file_path, **json.loads(str(data["info"]))}
+        return get_curve(data["x"], data["y"], info_dict)
+
+# Caches a curve (without the path that it was read from)
+def save_curve(cache_file_path, curve):
+    os.makedirs(os.path.dirname(cache_file_path), exist_ok=True)
+    info_dict = {key: curve[key] for key in curve.keys() if not key in ["x", "y", "file_path"]}
+    with open(f"{cache_file_path}.{os.getpid()}.tmp", "wb") as file:
+        np.savez(file, x=curve["x"], y=curve["y"], info=np.array(json.dumps(info_dict)))
+    os.replace(f"{cache_file_path}.{os.getpid()}.tmp", cache_file_path)
+
 # For exporting experimental data
 def export_data_summary(file_path, curves):
     
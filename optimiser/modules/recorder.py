@@ -6,13 +6,20 @@
 """
 
 # Libraries
-import time, math, sys
+import time, math, sys, copy, warnings
+import numpy as np
 import pandas as pd
 from modules.moga.objective import BIG_VALUE
+from modules.writer import Writer
+from modules.logger import Logger
+from modules.archive import Archive
+from modules.features import get_d_curve
 
 # Helper libraries
-sys.path += ["../__common__"]
+sys.path += ["../__common__", "../__models__"]
 from derivative import differentiate_curve
+from __model__ import CachedModel
+from stopwatch import Timer, is_enabled, write_timings
 
 # Constants
 CURVE_DENSITY = 100
@@ -21,7 +28,8 @@ CURVE_DENSITY = 100
 class Recorder:
 
     # Constructor
-    def __init__(self, objective, train_curves, test_curves, path, interval, population):
+    #   asynchronous: writes the results on a background thread
+    def __init__(self, objective, train_curves, test_curves, path, interval, population, asynchronous=False):
 
         # Initialise
         self.model            = objective.get_model()
@@ -30,6 +38,11 @@ class Recorder:
         self.path             = path
         self.interval         = interval
         self.population       = population
+        self.writer           = Writer() if asynchronous else None
+        self.logger           = None
+        self.sandbox          = None
+        self.broker           = None
+        self.refiner          = None
 
         # Define error names / types
         error_types      = objective.get_error_types()
@@ -43,8 +56,24 @@ class Recorder:
         self.start_time = time.time()
         self.update_time = self.start_time
         self.start_time_str = time.strftime("%A, %D, %H:%M:%S", time.localtime())
+        self.snapshot_time = None
+        self.stop_reason = None
+        self.num_evals_recorded = None # number of evaluations completed when the results were last recorded
         self.num_evals_completed, self.num_gens_completed = 0, 0
-        self.opt_params, self.opt_errors, self.opt_constraints = [], [], []
+        self.num_screened = 0 # individuals rejected by the screener (not evaluated, logged, or archived)
+        self.generation = 0 # generation of the evaluations being logged (0 for the initial population)
+        self.define_archive()
+
+    # Defines the archive of non-dominated individuals
+    #   capacity:     maximum number of individuals (the most crowded are removed when exceeded; None for no limit)
+    #   export_front: whether to write every individual of the archive to the results
+    def define_archive(self, capacity=None, export_front=False):
+        self.archive = Archive(len(self.model.get_param_names()), len(self.error_info), len(self.constraint_info), capacity)
+        self.export_front = export_front
+
+    # Empties the archive (e.g., before reevaluating its individuals at another fidelity)
+    def clear_archive(self):
+        self.archive = Archive(len(self.model.get_param_names()), len(self.error_info), len(self.constraint_info), self.archive.capacity)
 
     # Define MOGA hyperparameters
     def define_hyperparameters(self, num_gens, init_pop, offspring, crossover, mutation):
@@ -54,83 +83,198 @@ class Recorder:
         self.crossover  = crossover
         self.mutation   = mutation
 
-    # Returns a writer object
+    # Writes the results and the timings (in the background if asynchronous)
+    #   (snapshots are written by the writer's thread, so the timings are only written by one thread at a time)
     def write_results(self, file_path):
-        writer = pd.ExcelWriter(file_path, engine = "xlsxwriter")
-        self.record_settings(writer)
-        self.record_results(writer)
-        self.record_plot(writer, "creep")
-        self.record_plot(writer, "tensile")
-        writer.save()
+        if self.writer != None:
+            self.writer.submit(self.get_snapshot(), file_path)
+            return
+        if is_enabled():
+            write_timings(f"{self.path}_timing.json")
+        self.__write_results__(file_path)
+
+    # Returns a copy of the recorder that can be written independently
+    def get_snapshot(self):
+        if len(self.archive) > 0:
+            self.get_opt_prd_curves() # simulate in this thread
+        snapshot = copy.copy(self)
+        snapshot.writer         = None
+        snapshot.snapshot_time  = time.time()
+        snapshot.archive        = self.archive.copy()
+        return snapshot
+
+    # Returns the progress and optimal parameters (for checkpointing)
+    def get_state(self):
+        return {
+            "time_elapsed":         time.time() - self.start_time,
+            "start_time_str":       self.start_time_str,
+            "num_evals_completed":  self.num_evals_completed,
+            "num_screened":         self.num_screened,
+            "num_gens_completed":   self.num_gens_completed,
+            "generation":           self.generation,
+            "stop_reason":          self.stop_reason,
+            "archive":              self.archive,
+        }
+
+    # Restores the progress and optimal parameters from a checkpoint
+    def set_state(self, state):
+        self.start_time = time.time() - state["time_elapsed"]
+        self.update_time = time.time()
+        self.start_time_str = state["start_time_str"]
+        self.num_evals_completed = state["num_evals_completed"]
+        self.num_screened = state["num_screened"]
+        self.num_gens_completed = state["num_gens_completed"]
+        self.generation = state["generation"]
+        self.stop_reason = state["stop_reason"]
+        self.archive = state["archive"]
+
+    # Replaces the model (e.g., with a wrapped model)
+    def set_model(self, model):
+        self.model = model
+
+    # Defines the sandbox evaluating the individuals (to report its failed evaluations)
+    def set_sandbox(self, sandbox):
+        self.sandbox = sandbox
+
+    # Defines the broker evaluating the individuals (to report its workers)
+    def set_broker(self, broker):
+        self.broker = broker
+
+    # Defines the refiner of the best individuals (to report the refinement)
+    def set_refiner(self, refiner):
+        self.refiner = refiner
+
+    # Advances the generation of the evaluations being logged (called after each generation)
+    def next_generation(self):
+        self.generation += 1
+
+    # Logs every evaluation to binary columnar files
+    def define_log(self, chunk_size=1000):
+        column_info = [("generation", "int32"), ("wall_time", "float64")]
+        column_info += [(f"param_{name}", "float64") for name in self.model.get_param_names()]
+        column_info += [(f"error_{info}", "float64") for info in self.error_info]
+        column_info += [(f"constraint_{info}", "float64") for info in self.constraint_info]
+        column_info += [("feasible", "uint8"), ("duration", "float64"), ("fidelity", "float32")]
+        self.logger = Logger(f"{self.path}_log", column_info, chunk_size)
+
+    # Writes any pending results (and the final timings)
+    def close(self):
+        if self.writer != None:
+            self.writer.close()
+        if self.logger != None:
+            self.logger.close()
+        if is_enabled():
+            write_timings(f"{self.path}_timing.json")
+
+    # Writes the results to an excel file
+    def __write_results__(self, file_path):
+        with Timer("write results"):
+            writer = pd.ExcelWriter(file_path, engine = "xlsxwriter")
+            self.record_settings(writer)
+            self.record_results(writer)
+            if self.export_front:
+                self.record_front(writer)
+            self.record_plot(writer, "creep")
+            self.record_plot(writer, "tensile")
+            writer.save()
 
     # Updates the results after X iterations
-    def update_results(self, params, errors, constraints):
+    def update_results(self, params, errors, constraints, prd_curves=[], duration=0):
 
         # Update optimisation progress
         self.num_evals_completed += 1
-        self.num_gens_completed = (self.num_evals_completed - self.init_pop) / self.offspring + 1
+        self.update_progress()
+        
+        # Log the evaluation
+        if self.logger != None:
+            feasible = not False in [constraint <= 0 for constraint in constraints]
+            self.logger.append([self.generation, time.time() - self.start_time] + list(params) + list(errors) + list(constraints) + [feasible, duration, self.model.get_fidelity()])
         
         # If parameters are valid, update the population
         if not BIG_VALUE in errors:
-            self.update_population(params, errors, constraints)
+            self.update_population(params, errors, constraints, prd_curves)
 
         # Record results after X generations
-        if self.num_gens_completed > 0 and self.num_gens_completed % self.interval == 0:
+        self.check_interval()
 
-            # Get time since previous update in seconds
-            current_time = time.time()
-            update_duration = round(current_time - self.update_time)
-            self.update_time = current_time
+    # Updates the progress for an individual that was rejected by the screener (without counting it as an evaluation)
+    def update_screened(self):
+        self.num_screened += 1
+        self.update_progress()
+        self.check_interval()
 
-            # Display output
-            num_gens_completed_padded = str(round(self.num_gens_completed)).zfill(len(str(self.num_gens)))
-            file_path = f"{self.path}_{num_gens_completed_padded} ({update_duration}s).xlsx"
-            self.write_results(file_path)
+    # Updates the number of generations completed (from the individuals of the generations)
+    def update_progress(self):
+        num_individuals = self.num_evals_completed + self.num_screened
+        self.num_gens_completed = (num_individuals - self.init_pop) / self.offspring + 1
 
-            # Display progress in console
-            progress = f"{num_gens_completed_padded}/{self.num_gens}"
-            index = round(self.num_gens_completed//self.interval)
-            print(f"  {index}]\tRecorded ({progress} in {update_duration}s)")
+    # Records the results if X generations have been completed since they were last recorded
+    def check_interval(self):
+        if self.num_gens_completed > 0 and self.num_gens_completed % self.interval == 0:
+            self.record_progress()
+
+    # Records the results when the optimisation stops early (unless they were just recorded)
+    def record_stop(self, stop_reason):
+        self.stop_reason = stop_reason
+        if self.num_evals_recorded != self.num_evals_completed:
+            self.record_progress()
+        self.record_event(f"Stopped ({stop_reason})")
+
+    # Displays an event of the optimisation (e.g., a change of fidelity) with the progress
+    def record_event(self, message):
+        print(f"  {message}")
+
+    # Writes the results and displays the progress
+    def record_progress(self):
+        self.num_evals_recorded = self.num_evals_completed
+
+        # Get time since previous update in seconds
+        current_time = time.time()
+        update_duration = round(current_time - self.update_time)
+        self.update_time = current_time
+
+        # Display output
+        num_gens_completed_padded = str(round(self.num_gens_completed)).zfill(len(str(self.num_gens)))
+        file_path = f"{self.path}_{num_gens_completed_padded} ({update_duration}s).xlsx"
+        self.write_results(file_path)
+
+        # Display progress in console (with the convergence of the archive)
+        progress = f"{num_gens_completed_padded}/{self.num_gens}"
+        index = round(self.num_gens_completed//self.interval)
+        convergence = "" if len(self.archive) == 0 else f", best={np.min(self.archive.get_error_sqr_sums()):0.3e}, front={len(self.archive)}"
+        print(f"  {index}]\tRecorded ({progress} in {update_duration}s{convergence})")
     
-    # Updates the population
-    def update_population(self, params, errors, constraints):
-        params, errors = list(params), list(errors)
-        constraints = [constraint <= 0 for constraint in constraints]
-        err_sqr_sum = sum([error**2 for error in errors])
-
-        # If the stored parameters exceed the limit, remove the worst
-        if len(self.opt_params) == self.population:
-            if self.opt_errors[-1][-1] < err_sqr_sum:
-                return
-            self.opt_params.pop()
-            self.opt_errors.pop()
-            self.opt_constraints.pop()
-        
-        # Adds new params in order
-        inserted = False
-        for i in range(0, len(self.opt_params)):
-            if err_sqr_sum < self.opt_errors[i][-1]:
-                self.opt_params.insert(i, params)
-                self.opt_errors.insert(i, errors + [err_sqr_sum])
-                self.opt_constraints.insert(i, constraints)
-                inserted = True
-                break
-
-        # If new params is worst between existing params
-        if not inserted:
-            self.opt_params.append(params)
-            self.opt_errors.append(errors + [err_sqr_sum])
-            self.opt_constraints.append(constraints)
+    # Updates the population (predicted training curves of the best individuals are kept to avoid resimulating them)
+    def update_population(self, params, errors, constraints, prd_curves=[]):
+        if self.archive.insert(params, errors, constraints, prd_curves):
+            self.archive.keep_curves(self.archive.get_best_indexes(self.population))
+
+    # Returns the predicted training and testing curves of the optimal parameters
+    #   (testing curves are only simulated once per optimal parameters)
+    def get_opt_prd_curves(self):
+        index = self.archive.get_best_indexes(1)[0]
+        opt_params = self.archive.params[index]
+        curves = self.archive.get_curves(index)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore") # ignore warnings
+            if curves[0] == []:
+                curves[0] = self.model.get_specified_prd_curves(opt_params, self.train_curves)
+            if curves[1] == None:
+                curves[1] = self.model.get_specified_prd_curves(opt_params, self.test_curves) if self.test_curves != [] else []
+        return curves[0], curves[1]
 
     # Records the settings
     def record_settings(self, writer):
+        end_time = time.time() if self.snapshot_time == None else self.snapshot_time
         settings = {
             "Status":           ["Complete" if self.num_gens_completed == self.num_gens else "Incomplete"],
+            "Stop Reason":      [self.get_stop_reason()],
             "Progress":         [f"{round(self.num_gens_completed)}/{self.num_gens}"],
             "Start Time":       [self.start_time_str],
-            "End Time":         [time.strftime("%A, %D, %H:%M:%S", time.localtime())],
-            "Time Elapsed":     [f"{round(time.time() - self.start_time)}s"],
+            "End Time":         [time.strftime("%A, %D, %H:%M:%S", time.localtime(end_time))],
+            "Time Elapsed":     [f"{round(end_time - self.start_time)}s"],
             "Model":            [self.model.get_name()],
+            "Fidelity":         [self.model.get_fidelity()],
             "Params":           self.model.get_param_names(),
             "Lower Bound":      self.model.get_param_lower_bounds(),
             "Upper Bound":      self.model.get_param_upper_bounds(),
@@ -138,61 +282,94 @@ class Recorder:
             "Constraints":      self.constraint_info,
             "Training Data":    [f"{train_curve['title']}" for train_curve in self.train_curves],
             "Testing Data":     [f"{test_curve['title']}" for test_curve in self.test_curves],
+            "Evaluations":      [self.num_evals_completed],
+            "Screened":         [self.num_screened],
             "num_gens":         [self.num_gens],
             "init_pop":         [self.init_pop],
             "offspring":        [self.offspring],
             "crossover":        [self.crossover],
             "mutation":         [self.mutation],
         }
+        if isinstance(self.model, CachedModel):
+            cache_summary = self.model.get_cache_summary()
+            settings["Cache"] = [f"{key}={cache_summary[key]}" for key in cache_summary.keys()]
+        if self.sandbox != None:
+            sandbox_summary = self.sandbox.get_summary()
+            settings["Sandbox"] = [f"{key}={sandbox_summary[key]}" for key in sandbox_summary.keys()]
+        if self.broker != None:
+            broker_summary = self.broker.get_summary()
+            settings["Broker"] = [f"{key}={broker_summary[key]}" for key in broker_summary.keys()]
+        if self.refiner != None:
+            refiner_summary = self.refiner.get_summary()
+            settings["Refinement"] = [f"{key}={refiner_summary[key]}" for key in refiner_summary.keys()]
         write_with_fit_column_widths(settings, writer, "settings")
     
-    # Records the results
+    # Returns the reason that the optimisation stopped
+    def get_stop_reason(self):
+        if self.stop_reason != None:
+            return self.stop_reason
+        return f"Reached the number of generations ({self.num_gens})" if self.num_gens_completed == self.num_gens else "-"
+
+    # Records the results (of the best individuals in the archive)
     def record_results(self, writer):
-        
+        results = self.get_results(self.archive.get_best_indexes(self.population))
+        write_with_fit_column_widths(results, writer, "results")
+
+    # Records every individual in the archive (unsorted)
+    def record_front(self, writer):
+        results = self.get_results(list(range(len(self.archive))))
+        pd.DataFrame(results).to_excel(writer, "front", index=False)
+
+    # Returns the parameters, errors, and constraints of individuals in the archive
+    def get_results(self, indexes):
+        opt_params, opt_errors, opt_constraints = self.archive.get_individuals(indexes)
+        opt_constraints = opt_constraints <= 0
+
         # Add parameters
-        results = {"P": ["|" for _ in range(len(self.opt_params))]}
+        results = {"P": ["|" for _ in range(len(indexes))]}
         for i in range(len(self.model.param_info)):
-            results[self.model.param_info[i]["name"]] = [params[i] for params in self.opt_params]
+            results[self.model.param_info[i]["name"]] = list(opt_params[:,i])
         
         # Add errors (and total error)
         if len(self.error_info) > 0:
-            results["E"] = ["|" for _ in range(len(self.opt_errors))]
+            results["E"] = ["|" for _ in range(len(indexes))]
         for i in range(len(self.error_info)):
-            results[self.error_info[i]] = [errors[i] for errors in self.opt_errors]
-        results["error_sqr_sum"] = [errors[-1] for errors in self.opt_errors]
+            results[self.error_info[i]] = list(opt_errors[:,i])
+        results["error_sqr_sum"] = list(np.sum(opt_errors**2, axis=1))
 
         # Add constraints
         if len(self.constraint_info) > 0:
-            results["C"] = ["|" for _ in range(len(self.opt_constraints))]
+            results["C"] = ["|" for _ in range(len(indexes))]
         for i in range(len(self.constraint_info)):
-            results[self.constraint_info[i]] = [constraints[i] for constraints in self.opt_constraints]
-        
-        # Write all results
-        write_with_fit_column_widths(results, writer, "results")
+            results[self.constraint_info[i]] = list(opt_constraints[:,i])
+        return results
 
     # Records the plot
     def record_plot(self, writer, type):
 
         # If there are no optimal parameters / curves, leave
-        if len(self.opt_params) == 0 or not type in [curve["type"] for curve in self.train_curves+self.test_curves]:
+        if len(self.archive) == 0 or not type in [curve["type"] for curve in self.train_curves+self.test_curves]:
             return
         
-        # Create plot for curves
+        # Create plot for curves (using the stored predictions)
         train_curves = [curve for curve in self.train_curves if curve["type"] == type]
         test_curves = [curve for curve in self.test_curves if curve["type"] == type]
-        prd_train_curves = self.model.get_specified_prd_curves(self.opt_params[0], train_curves)
-        prd_test_curves = self.model.get_specified_prd_curves(self.opt_params[0], test_curves)
+        all_prd_train_curves, all_prd_test_curves = self.get_opt_prd_curves()
+        prd_train_curves = filter_by_type(all_prd_train_curves, self.train_curves, type)
+        prd_test_curves = filter_by_type(all_prd_test_curves, self.test_curves, type)
         add_plot_sheet(writer, f"{type}_y", test_curves, train_curves, prd_test_curves, prd_train_curves)
 
-        # Create plot for derivative of curves
-        test_d_curves       = [differentiate_curve(curve) for curve in test_curves]
-        train_d_curves      = [differentiate_curve(curve) for curve in train_curves]
-        prd_test_curves     = self.model.get_specified_prd_curves(self.opt_params[0], test_curves)
+        # Create plot for derivative of curves (the experimental derivatives are indexed)
+        test_d_curves       = [get_d_curve(curve) for curve in test_curves]
+        train_d_curves      = [get_d_curve(curve) for curve in train_curves]
         prd_test_d_curves   = [differentiate_curve(curve) for curve in prd_test_curves]
-        prd_train_curves    = self.model.get_specified_prd_curves(self.opt_params[0], train_curves)
         prd_train_d_curves  = [differentiate_curve(curve) for curve in prd_train_curves]
         add_plot_sheet(writer, f"{type}_dy", test_d_curves, train_d_curves, prd_test_d_curves, prd_train_d_curves)
 
+# Returns the predicted curves whose experimental curves are of a certain type
+def filter_by_type(prd_curves, exp_curves, type):
+    return [prd_curves[i] for i in range(len(prd_curves)) if exp_curves[i]["type"] == type]
+
 # For creating a sheet for a plot
 def add_plot_sheet(writer, sheet_name, test_curves, train_curves, prd_test_curves, prd_train_curves):
     
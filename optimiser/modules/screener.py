@@ -0,0 +1,111 @@
+"""
+ Title:         Screener
+ Description:   For screening individuals with surrogate models before evaluating them with the model
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import math, sys
+import numpy as np
+from modules.moga.objective import BIG_VALUE
+
+# Helper libraries
+sys.path += ["..", "../__common__"]
+from surrogator.modules.trainers.__trainer_factory__ import get_trainer
+from surrogator.modules.surrogates.__surrogate_factory__ import get_surrogate
+from curve import validate_curve
+
+# The Screener class
+class Screener:
+
+    # Constructor
+    #   trainer_name:     representation of the curves predicted by the surrogates
+    #   surrogate_name:   type of the surrogates (one per experimental curve)
+    #   fraction:         share of the individuals with the best predicted errors that are evaluated
+    #   exploration:      share of the remaining individuals that are randomly evaluated
+    #   min_samples:      number of evaluations before the surrogates are first trained
+    #   retrain_interval: number of new evaluations before the surrogates are retrained
+    def __init__(self, objective, trainer_name="simple", surrogate_name="ann", fraction=0.25, exploration=0.05, min_samples=400, retrain_interval=400):
+        
+        # Initialise
+        self.objective        = objective
+        self.exp_curves       = objective.get_model().get_exp_curves()
+        self.surrogate_name   = surrogate_name
+        self.fraction         = fraction
+        self.exploration      = exploration
+        self.min_samples      = min_samples
+        self.retrain_interval = retrain_interval
+        self.num_screened, self.num_evaluated = 0, 0
+        
+        # Define a trainer and surrogate for each experimental curve
+        self.trainer_list   = [get_trainer(trainer_name, objective.get_model()) for _ in self.exp_curves]
+        self.surrogate_list = [None] * len(self.exp_curves)
+        self.input_list     = [[] for _ in self.exp_curves]
+        self.output_list    = [[] for _ in self.exp_curves]
+        self.num_samples, self.num_new_samples = 0, 0
+
+    # Returns whether the surrogates have been trained
+    def is_trained(self):
+        return not None in self.surrogate_list
+
+    # Adds the predicted curves of evaluated individuals to the training data (and retrains if required)
+    def add_samples(self, params_list, prd_curves_list):
+        for params, prd_curves in zip(params_list, prd_curves_list):
+            if prd_curves == [] or False in [validate_curve(prd_curve) for prd_curve in prd_curves]:
+                continue
+            for i in range(len(self.exp_curves)):
+                mapped_input, mapped_output = self.trainer_list[i].__get_io__(list(params), prd_curves[i])
+                self.input_list[i].append(mapped_input)
+                self.output_list[i].append(mapped_output)
+            self.num_samples += 1
+            self.num_new_samples += 1
+        
+        # Train the surrogates when there are enough samples
+        if self.num_samples >= self.min_samples and (not self.is_trained() or self.num_new_samples >= self.retrain_interval):
+            self.train()
+
+    # Trains the surrogates with all the samples
+    def train(self):
+        for i in range(len(self.exp_curves)):
+            if self.surrogate_list[i] == None:
+                input_size, output_size = self.trainer_list[i].get_shape()
+                self.surrogate_list[i] = get_surrogate(self.surrogate_name, input_size, output_size)
+            self.surrogate_list[i].fit(self.input_list[i], self.output_list[i])
+        self.num_new_samples = 0
+
+    # Returns the curves predicted by the surrogates for each set of parameters
+    def predict(self, params_list):
+        prd_curves_list = [[] for _ in params_list]
+        for i in range(len(self.exp_curves)):
+            mapped_inputs = [self.trainer_list[i].map_input(list(params)) for params in params_list]
+            mapped_outputs = self.surrogate_list[i].predict_batch(mapped_inputs)
+            for j in range(len(params_list)):
+                prd_curves_list[j].append(self.trainer_list[i].restore_curve(list(mapped_outputs[j])))
+        return prd_curves_list
+
+    # Returns the indexes of the individuals that should be evaluated with the model
+    #   (the individuals with the best predicted errors, and a random share of the rest)
+    def screen(self, params_list):
+        num_individuals = len(params_list)
+        if not self.is_trained():
+            return list(range(num_individuals))
+
+        # Rank the individuals by their predicted errors
+        predicted_scores = []
+        for prd_curves in self.predict(params_list):
+            errors = self.objective.get_error_values(prd_curves)
+            predicted_scores.append(np.inf if BIG_VALUE in errors else sum([error**2 for error in errors]))
+        ranked_indexes = list(np.argsort(predicted_scores, kind="stable"))
+        
+        # Select the best individuals and explore the rest
+        num_best = math.ceil(self.fraction * num_individuals)
+        selected_indexes = ranked_indexes[:num_best]
+        remaining_indexes = ranked_indexes[num_best:]
+        num_explored = min(math.ceil(self.exploration * num_individuals), len(remaining_indexes))
+        selected_indexes += list(np.random.choice(remaining_indexes, num_explored, replace=False)) if num_explored > 0 else []
+        
+        # Update the number of screened individuals and return
+        self.num_screened += num_individuals - len(selected_indexes)
+        self.num_evaluated += len(selected_indexes)
+        return sorted([int(index) for index in selected_indexes])
@@ -0,0 +1,57 @@
+"""
+ Title:         Writer
+ Description:   For writing snapshots of the results in the background
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import atexit, queue, threading, traceback
+
+# The Writer class
+class Writer:
+
+    # Constructor
+    #   max_pending: number of snapshots that can wait to be written (older ones are dropped when full)
+    def __init__(self, max_pending=1):
+        self.queue = queue.Queue(max_pending)
+        self.num_written, self.num_dropped = 0, 0
+        self.closed = False
+        self.thread = threading.Thread(target=self.__run__, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    # Submits a snapshot to be written (replacing the stalest pending snapshot if full)
+    def submit(self, snapshot, file_path):
+        while True:
+            try:
+                self.queue.put_nowait((snapshot, file_path))
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.num_dropped += 1
+                except queue.Empty:
+                    pass
+
+    # Writes the pending snapshots and stops the thread
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+
+    # Writes snapshots until closed
+    def __run__(self):
+        while True:
+            item = self.queue.get()
+            if item == None:
+                return
+            snapshot, file_path = item
+            try:
+                snapshot.write_results(file_path)
+                self.num_written += 1
+            except Exception:
+                print(f"  Failed to write '{file_path}'")
+                traceback.print_exc()
@@ -0,0 +1,55 @@
+"""
+ Title:         Test Configuration
+ Description:   For running the tests from the optimiser directory (the modules add helper paths relative to it)
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import os, sys
+import numpy as np
+import pytest
+
+# Run from the optimiser directory
+OPTIMISER_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(OPTIMISER_PATH)
+sys.path.insert(0, OPTIMISER_PATH)
+sys.path += ["../__common__", "../__models__"]
+from curve import get_curve
+from modules.api import API
+
+# Returns synthetic creep curves (with the conditions of the experimental data)
+def get_creep_curves(stresses=[80, 70]):
+    creep_curves = []
+    for stress in stresses:
+        x_list = np.linspace(0, 2000, 200)
+        y_list = 1e-4 * (stress/10)**2 * x_list**0.5
+        creep_curves.append(get_curve(x_list, y_list, {"temp": 800, "stress": stress, "type": "creep", "title": f"s{stress}", "file_path": f"s{stress}.csv"}))
+    return creep_curves
+
+# Returns an API for the TH model that is ready to optimise (with the errors and recorder defined)
+def get_api(train_curves, output_path, test_curves=[], error_names=["y_area", "y_end"], interval=100, population=10, num_processes=1):
+    api = API(display=0, output_path=output_path)
+    api.train_curves, api.test_curves = train_curves, test_curves
+    api.define_model("th", num_processes=num_processes)
+    api.define_errors("creep", error_names)
+    api.define_recorder(interval, population)
+    return api
+
+# Removes the results directory that the APIs create (if it was created by the tests and is empty)
+@pytest.fixture(scope="session", autouse=True)
+def results_dir():
+    existed = os.path.exists("./results")
+    yield
+    if not existed and os.path.exists("./results") and os.listdir("./results") == []:
+        os.rmdir("./results")
+
+# Synthetic creep curves
+@pytest.fixture
+def creep_curves():
+    return get_creep_curves()
+
+# An API for the TH model with the synthetic creep curves (writing to a temporary directory)
+@pytest.fixture
+def api(creep_curves, tmp_path):
+    return get_api(creep_curves, str(tmp_path))
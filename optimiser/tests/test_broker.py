@@ -0,0 +1,99 @@
+"""
+ Title:         Broker Tests
+ Description:   For testing the evaluation of individuals on workers that connect over TCP (on localhost)
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import socket, subprocess, sys, threading, time
+import multiprocessing as mp
+import worker
+from modules.moga.broker import Broker
+from modules.moga.objective import Objective
+from modules.moga.pool import evaluate
+from modules.moga.sandbox import run_worker
+from modules.errors.__error_factory__ import get_error_list
+
+# Helper libraries
+sys.path += ["../__models__"]
+from __model_factory__ import get_model
+
+# Constants
+AUTHKEY = "test-key"
+TASK_DURATION = 0.5
+
+# Returns a free port on localhost
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+# Returns an objective for the TH model
+def get_objective(creep_curves):
+    return Objective(get_model("th", creep_curves), get_error_list("creep", ["y_area", "y_end"], creep_curves), [])
+
+# Returns distinct parameters of the TH model
+def get_params_list(num_params):
+    return [[1e-6*(i+1), 2.0, -0.5] for i in range(num_params)]
+
+# Runs an evaluator that takes a while for each task (so that workers can be killed mid-task)
+def run_slow_worker(connection, init_args):
+    original_recv = connection.recv
+    def slow_recv():
+        task = original_recv()
+        time.sleep(TASK_DURATION)
+        return task
+    connection.recv = slow_recv
+    run_worker(connection, init_args)
+
+# Starts a worker process that connects to a broker
+def start_worker(port):
+    process = mp.Process(target=worker.main, args=("localhost", port, AUTHKEY)) # not daemonic, as workers start evaluators
+    process.start()
+    return process
+
+# Tests that the tasks of a killed worker are requeued, and that every result is returned exactly once
+def test_lost_worker(creep_curves, monkeypatch):
+    monkeypatch.setattr(worker, "run_worker", run_slow_worker)
+    objective = get_objective(creep_curves)
+    port = get_free_port()
+    broker = Broker(objective, ("localhost", port), AUTHKEY, heartbeat=0.2, lost_timeout=5)
+    workers = [start_worker(port) for _ in range(2)]
+    killer = threading.Timer(3*TASK_DURATION, workers[0].kill)
+    try:
+        killer.start()
+        params_list = get_params_list(8)
+        results = broker.evaluate(params_list)
+        assert len(results) == len(params_list)
+        for params, result in zip(params_list, results):
+            assert result[1] == evaluate(objective, params)[1]
+        summary = broker.get_summary()
+        assert summary["lost"] == 1 and summary["requeued"] + summary["duplicates"] >= 1
+        assert summary["workers"] == 1 and summary["crashes"] == 0
+    finally:
+        killer.cancel()
+        broker.close()
+        for process in workers:
+            process.kill()
+            process.join()
+
+# Tests that the worker script joins a broker with a custom address and key
+def test_worker_script(creep_curves):
+    objective = get_objective(creep_curves)
+    port = get_free_port()
+    broker = Broker(objective, ("localhost", port), AUTHKEY, heartbeat=0.2)
+    process = subprocess.Popen([sys.executable, "worker.py", "--host", "localhost", "--port", str(port), "--authkey", AUTHKEY], stdout=subprocess.DEVNULL)
+    try:
+        params_list = get_params_list(3)
+        results = broker.evaluate(params_list)
+        assert [result[1] for result in results] == [evaluate(objective, params)[1] for params in params_list]
+    finally:
+        broker.close()
+        process.kill()
+        process.wait()
+
+# Tests the arguments of the worker script
+def test_arguments():
+    arguments = worker.get_arguments(["--port", "6001", "--authkey", AUTHKEY])
+    assert (arguments.host, arguments.port, arguments.authkey) == ("localhost", 6001, AUTHKEY)
@@ -0,0 +1,82 @@
+"""
+ Title:         Cache Tests
+ Description:   For testing the memoisation of the predictions of the model
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import sys
+
+# Helper libraries
+sys.path += ["../__models__"]
+from __model__ import CachedModel
+from __model_factory__ import get_model
+
+# Parameters of the TH model
+PARAMS = [1e-6, 2.0, -0.5]
+
+# Tests that repeated predictions are returned from the cache
+def test_hits(creep_curves):
+    model = CachedModel(get_model("th", creep_curves))
+    prd_curves = model.get_prd_curves(*PARAMS)
+    cached_prd_curves = model.get_prd_curves(*PARAMS)
+    assert list(prd_curves[0]["y"]) == list(cached_prd_curves[0]["y"])
+    assert model.get_cache_summary()["hits"] == 1
+    assert model.get_cache_summary()["misses"] == 1
+
+# Tests that the least recently used predictions are evicted when the cache is full
+def test_size(creep_curves):
+    model = CachedModel(get_model("th", creep_curves), size=2)
+    for i in range(3):
+        model.get_prd_curves(PARAMS[0]*(i+1), *PARAMS[1:])
+    assert not model.is_cached([PARAMS[0], *PARAMS[1:]])
+    assert model.get_cache_summary()["size"] == 2
+    assert model.get_cache_summary()["evictions"] == 1
+
+# Tests that predictions are evicted when the stored curves exceed the memory
+def test_memory(creep_curves):
+    model = CachedModel(get_model("th", creep_curves), max_memory=0)
+    for i in range(3):
+        model.get_prd_curves(PARAMS[0]*(i+1), *PARAMS[1:])
+    summary = model.get_cache_summary()
+    assert summary["size"] == 1 and summary["evictions"] == 2
+    assert model.total_bytes == sum([model.num_bytes[key] for key in model.cache.keys()])
+
+# Tests that the cache is used by the objective and recorder when defined after the recorder
+def test_define_after_recorder(api):
+    api.define_cache()
+    assert isinstance(api.objective.get_model(), CachedModel)
+    assert isinstance(api.recorder.model, CachedModel)
+
+
+# Tests that cached predictions of a batch are returned even if storing the others evicts them
+def test_batch_eviction(creep_curves):
+    model = CachedModel(get_model("th", creep_curves), size=2)
+    prd_curves = model.get_prd_curves(*PARAMS)
+    param_matrix = [PARAMS, [PARAMS[0]*2, *PARAMS[1:]], [PARAMS[0]*3, *PARAMS[1:]]]
+    prd_curves_list = model.get_prd_curves_batch(param_matrix)
+    assert list(prd_curves_list[0][0]["y"]) == list(prd_curves[0]["y"])
+    assert not model.is_cached(PARAMS) and model.get_cache_summary()["evictions"] == 1
+
+# Tests that duplicates in a batch are simulated and stored once
+def test_batch_duplicates(creep_curves):
+    model = CachedModel(get_model("th", creep_curves))
+    simulated = []
+    get_prd_curves_batch = model.model.get_prd_curves_batch
+    model.model.get_prd_curves_batch = lambda param_matrix: simulated.append(len(param_matrix)) or get_prd_curves_batch(param_matrix)
+    prd_curves_list = model.get_prd_curves_batch([PARAMS, PARAMS, PARAMS])
+    assert simulated == [1]
+    assert prd_curves_list[0] is not prd_curves_list[1]
+    assert list(prd_curves_list[0][0]["y"]) == list(prd_curves_list[2][0]["y"])
+    summary = model.get_cache_summary()
+    assert summary["size"] == 1 and summary["hits"] == 2 and summary["misses"] == 1
+    assert model.total_bytes == sum([model.num_bytes[key] for key in model.cache.keys()])
+
+# Tests that overwriting stored predictions does not count their memory twice
+def test_overwrite(creep_curves):
+    model = CachedModel(get_model("th", creep_curves))
+    prd_curves = model.get_prd_curves(*PARAMS)
+    key = model.get_key(PARAMS, creep_curves)
+    model.store(key, prd_curves)
+    assert model.total_bytes == model.num_bytes[key]
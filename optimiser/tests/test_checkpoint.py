@@ -0,0 +1,87 @@
+"""
+ Title:         Checkpoint Tests
+ Description:   For testing the checkpointing and resumption of the optimisation
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import os, pickle, random, signal
+import numpy as np
+import pytest
+import conftest
+from modules.moga import moga as moga_module
+from modules.moga.checkpoint import save_checkpoint, load_checkpoint
+
+# Hyperparameters of the optimisations
+NUM_GENS, INIT_POP, OFFSPRING = 6, 10, 6
+
+# Returns an API that is ready to optimise with checkpoints
+def get_api(creep_curves, output_path):
+    api = conftest.get_api(creep_curves, output_path)
+    api.define_checkpoint(3)
+    return api
+
+# Seeds the random number generators
+def seed(value):
+    np.random.seed(value)
+    random.seed(value)
+
+# Tests that the state is only built when a checkpoint is due, and that the last generation is checkpointed
+def test_interval(creep_curves, tmp_path, monkeypatch):
+    saved_gens = []
+    get_state = moga_module.MOGA.get_state
+    monkeypatch.setattr(moga_module.MOGA, "get_state", lambda moga: saved_gens.append(moga.algo.n_gen - 1) or get_state(moga))
+    seed(0)
+    get_api(creep_curves, str(tmp_path)).optimise(NUM_GENS, INIT_POP, OFFSPRING)
+    assert saved_gens == [3, NUM_GENS]
+
+# Tests that resuming from a checkpoint gives the same optimisation as an uninterrupted run
+def test_resume(creep_curves, tmp_path, monkeypatch):
+
+    # Run without interruption (keeping the checkpoint of the third generation)
+    states = []
+    monkeypatch.setattr(moga_module, "save_checkpoint", lambda file_path, state: states.append(state) or save_checkpoint(file_path, state))
+    seed(0)
+    api = get_api(creep_curves, str(tmp_path / "uninterrupted"))
+    moga = api.get_moga(NUM_GENS, INIT_POP, OFFSPRING, 0.65, 0.35)
+    moga.optimise()
+    save_checkpoint(str(tmp_path / "checkpoint.pkl"), states[0])
+
+    # Resume from the third generation and compare
+    api = get_api(creep_curves, str(tmp_path / "resumed"))
+    resumed = api.get_moga(*pickle.loads(states[0])["hyperparameters"])
+    resumed.resume(load_checkpoint(str(tmp_path / "checkpoint.pkl")))
+    assert np.array_equal(moga.algo.pop.get("X"), resumed.algo.pop.get("X"))
+    assert np.array_equal(moga.algo.pop.get("F"), resumed.algo.pop.get("F"))
+    assert moga.problem.recorder.num_evals_completed == resumed.problem.recorder.num_evals_completed
+    assert np.array_equal(moga.problem.recorder.archive.get_error_sqr_sums(), resumed.problem.recorder.archive.get_error_sqr_sums())
+
+# A terminator that sends SIGTERM during a generation
+class SignallingTerminator:
+
+    # Constructor
+    def __init__(self, generation):
+        self.generation = generation
+
+    # Sends SIGTERM to this process after the generation
+    def update(self, recorder):
+        if recorder.generation == self.generation:
+            os.kill(os.getpid(), signal.SIGTERM)
+        return None
+
+    # Returns the state (for checkpointing)
+    def get_state(self):
+        return None
+
+# Tests that SIGTERM saves the state once the current generation finishes and exits
+def test_terminate(creep_curves, tmp_path):
+    seed(0)
+    api = get_api(creep_curves, str(tmp_path))
+    api.terminator = SignallingTerminator(2)
+    with pytest.raises(SystemExit) as exit_info:
+        api.optimise(NUM_GENS, INIT_POP, OFFSPRING)
+    assert exit_info.value.code == 128 + signal.SIGTERM
+    state = load_checkpoint(api.get_output("checkpoint.pkl"))
+    assert state["recorder"]["generation"] == 2
+    assert signal.getsignal(signal.SIGTERM) == signal.SIG_DFL
@@ -0,0 +1,43 @@
+"""
+ Title:         Feature Tests
+ Description:   For testing that the feature index is written once per preparation and shared by the constraints
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import os
+from modules.features import FeatureIndex, feature_index, get_average
+from modules.errors.__error_factory__ import get_error_list
+from modules.constraints.__constraint_factory__ import get_constraint_list
+
+# Tests that computing features does not write the file, but that saving does (once)
+def test_save(creep_curves, tmp_path):
+    file_path = str(tmp_path / "features.pkl")
+    index = FeatureIndex()
+    index.file_path = file_path
+    for curve in creep_curves:
+        index.get(curve, "average y", lambda curve: sum(curve["y"]))
+    assert not os.path.exists(file_path) and index.dirty
+    index.save()
+    assert os.path.exists(file_path) and not index.dirty
+    loaded_index = FeatureIndex()
+    loaded_index.set_file_path(file_path)
+    assert loaded_index.get(creep_curves[0], "average y", None) == sum(creep_curves[0]["y"])
+    assert loaded_index.get_summary() == {"size": 2, "hits": 1, "misses": 0}
+
+# Tests that preparing the errors and constraints computes their features through the index and writes it
+def test_prepare(creep_curves, tmp_path, monkeypatch):
+    file_path = str(tmp_path / "features.pkl")
+    monkeypatch.setattr(feature_index, "features", {})
+    monkeypatch.setattr(feature_index, "file_path", file_path)
+    get_average(creep_curves[0], "x")
+    assert not os.path.exists(file_path)
+    get_error_list("creep", ["y_area"], creep_curves)
+    assert os.path.exists(file_path) and not feature_index.dirty
+    constraint_list = get_constraint_list("creep", ["dec_x_end", "inc_y_end"], creep_curves)
+    hits = feature_index.hits
+    get_constraint_list("creep", ["dec_x_end", "inc_y_end"], creep_curves)
+    assert feature_index.hits == hits + 2
+    assert [list(constraint.lower_indexes) for constraint in constraint_list] == [[1], [1]]
+    assert [list(constraint.higher_indexes) for constraint in constraint_list] == [[0], [0]]
@@ -0,0 +1,59 @@
+"""
+ Title:         Fidelity Tests
+ Description:   For testing that promoting the fidelity reevaluates and ranks the individuals again, and is logged
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import random
+import numpy as np
+from pymoo.util.nds.non_dominated_sorting import NonDominatedSorting
+from modules.logger import read_log
+
+# A schedule that promotes the fidelity after a number of generations
+class GenerationScheduler:
+
+    # Constructor
+    def __init__(self, num_gens):
+        self.num_gens = num_gens
+        self.fidelity = 0.5
+
+    # Returns the current fidelity
+    def get_fidelity(self):
+        return self.fidelity
+
+    # Returns the full fidelity once the number of generations is reached (None to stay)
+    def update(self, recorder):
+        if self.fidelity == 1.0 or recorder.num_gens_completed < self.num_gens:
+            return None
+        self.fidelity = 1.0
+        return self.fidelity
+
+# Tests that promoting reevaluates the archive and population, ranks the population again, and logs the fidelity
+def test_promote(api):
+    np.random.seed(0)
+    random.seed(0)
+    api.define_log()
+    api.scheduler = GenerationScheduler(2)
+    moga = api.get_moga(4, 20, 10, 0.65, 0.35)
+
+    # Reevaluate with errors that rank the individuals differently (as a change of fidelity may, here by shuffling them)
+    reevaluated, promoted = [], []
+    reevaluate = moga.problem.reevaluate
+    moga.problem.reevaluate = lambda params_list: reevaluated.append(params_list) or reevaluate(params_list)[::-1]
+    promote = moga.promote
+    moga.promote = lambda fidelity: promote(fidelity) or promoted.append((moga.algo.pop.get("X"), moga.algo.pop.get("F"), moga.algo.pop.get("rank")))
+    moga.optimise()
+    api.recorder.close()
+
+    # Check the reevaluation, ranks, and fidelities
+    assert len(reevaluated) == 1 and len(promoted) == 1
+    params_list, error_values_list, ranks = promoted[0]
+    assert set(map(tuple, params_list)) <= set(map(tuple, reevaluated[0]))
+    assert list(ranks) == list(NonDominatedSorting().do(error_values_list, return_rank=True)[1])
+    log = read_log(api.get_output("moga_log"))
+    promoted_generation = log["generation"][np.argmax(log["fidelity"] == 1.0)]
+    assert log["fidelity"][0] == 0.5 and log["fidelity"][-1] == 1.0 and promoted_generation > 0
+    assert set(log["fidelity"][log["generation"] < promoted_generation]) == {0.5}
+    assert set(log["fidelity"][log["generation"] >= promoted_generation]) == {1.0}
@@ -0,0 +1,55 @@
+"""
+ Title:         Islands Tests
+ Description:   For testing the optimisation with independent populations and migration
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import pickle, queue
+import numpy as np
+import pytest
+from conftest import get_api
+from modules.moga.problem import Problem
+from modules.moga.islands import Relay, migrate
+from modules.moga.moga import get_algorithm
+
+# Returns an evolved algorithm with an island problem
+def get_evolved_algorithm(objective, seed):
+    problem = Problem(objective, Relay(0, queue.Queue()))
+    algo = get_algorithm(10, 10, 0.65, 0.35)
+    algo.setup(problem, termination=("n_gen", 10), seed=seed, verbose=False)
+    algo.next()
+    algo.next()
+    return algo, problem
+
+# Tests that migrants arrive as the evaluated individuals that were sent
+def test_migrate(creep_curves, tmp_path):
+    api = get_api(creep_curves, str(tmp_path))
+    sender, sender_problem = get_evolved_algorithm(api.objective, 0)
+    receiver, receiver_problem = get_evolved_algorithm(api.objective, 1)
+    channel = queue.Queue()
+    migrate(sender, sender_problem, 3, queue.Queue(), channel)
+    migrants = pickle.loads(pickle.dumps(channel.queue[0])) # as sent between processes
+    migrate(receiver, receiver_problem, 3, channel, queue.Queue())
+    for migrant in migrants:
+        matches = [individual for individual in receiver.pop if np.array_equal(individual.X, migrant.X)]
+        for individual in matches:
+            assert np.array_equal(individual.F, migrant.F)
+            assert np.array_equal(individual.G, migrant.G) and np.array_equal(individual.CV, migrant.CV)
+    assert len(receiver.pop) == 10
+
+# Tests that the islands refuse settings that they would otherwise ignore
+def test_unsupported_settings(creep_curves, tmp_path):
+    api = get_api(creep_curves, str(tmp_path))
+    api.define_sandbox(10)
+    api.define_termination(max_evals=10)
+    with pytest.raises(ValueError, match="sandbox, termination"):
+        api.optimise_islands(num_islands=2, num_gens=2, init_pop=4, offspring=4)
+
+# Tests that every evaluation of the islands is recorded
+def test_optimise(creep_curves, tmp_path):
+    api = get_api(creep_curves, str(tmp_path))
+    api.define_evaluation(batched=True)
+    api.optimise_islands(num_islands=2, num_gens=3, init_pop=6, offspring=4, migration_interval=1, num_migrants=2)
+    assert api.recorder.num_evals_completed == 2 * (6 + 4 * 2)
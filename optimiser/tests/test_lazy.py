@@ -0,0 +1,107 @@
+"""
+ Title:         Lazy Evaluation Tests
+ Description:   For testing that evaluations stop early once individuals are infeasible or hopeless
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import numpy as np
+import pytest
+from __model__ import CachedModel
+from __model_factory__ import get_model
+from modules.errors.__error_factory__ import get_error_list
+from modules.constraints.__constraint_factory__ import get_constraint_list
+from modules.moga.objective import Objective, BIG_VALUE
+from modules.moga.pool import UnfinishedCurves, evaluate, evaluate_lazily, evaluate_curves
+from modules.moga.problem import Problem
+
+# Parameters of the TH model
+PARAMS_LIST = [[1e-6, 2.0, -0.5], [3e-6, 1.5, -0.2], [5e-7, 2.5, -0.8]]
+
+# A constraint that is violated by any simulated curve
+class SimulatedConstraint:
+
+    # Returns the name of the constraint
+    def get_name(self):
+        return "simulated"
+
+    # Returns the type of the constraint
+    def get_type(self):
+        return "creep"
+
+    # Returns the number of simulated curves
+    def get_value(self, prd_curves):
+        return len([prd_curve for prd_curve in prd_curves if prd_curve != None])
+
+# Returns an objective whose model counts the curves that it simulates
+def get_objective(creep_curves, constraint_list=[]):
+    model = get_model("th", creep_curves)
+    model.num_simulated = 0
+    get_specified_prd_curves = model.get_specified_prd_curves
+    def count(params, exp_curves):
+        model.num_simulated += len(exp_curves)
+        return get_specified_prd_curves(params, exp_curves)
+    model.get_specified_prd_curves = count
+    error_list = get_error_list("creep", ["dy_area", "x_area", "y_area", "x_end", "y_end"], creep_curves)
+    return Objective(model, error_list, constraint_list)
+
+# Tests that an infeasible partial result stops the remaining simulations
+def test_infeasible(creep_curves):
+    objective = get_objective(creep_curves, [SimulatedConstraint()])
+    prd_curves, error_values, _, _ = evaluate_lazily(objective, PARAMS_LIST[0])
+    assert objective.get_model().num_simulated == 1
+    assert isinstance(prd_curves, UnfinishedCurves) and prd_curves == []
+    assert error_values == [BIG_VALUE] * len(error_values)
+
+# Tests that a hopeless partial result stops the remaining simulations (and that others are evaluated fully)
+def test_hopeless(creep_curves):
+    objective = get_objective(creep_curves)
+    prd_curves, _, _, _ = evaluate_lazily(objective, PARAMS_LIST[0], [[0] * 5])
+    assert objective.get_model().num_simulated == 1 and isinstance(prd_curves, UnfinishedCurves)
+    objective.get_model().num_simulated = 0
+    prd_curves, error_values, _, _ = evaluate_lazily(objective, PARAMS_LIST[0], [[BIG_VALUE] * 5])
+    assert objective.get_model().num_simulated == len(creep_curves) and not isinstance(prd_curves, UnfinishedCurves)
+    assert error_values == evaluate(objective, PARAMS_LIST[0])[1]
+
+# Tests that the errors and constraints of partial curves are lower bounds of those of the full curves
+def test_lower_bounds(creep_curves):
+    constraint_list = get_constraint_list("creep", ["dec_x_end", "inc_y_end"], creep_curves)
+    objective = get_objective(creep_curves, constraint_list)
+    for params in PARAMS_LIST:
+        prd_curves = objective.get_model().get_prd_curves(*params)
+        assert prd_curves != []
+        error_values = np.array(objective.get_error_values(prd_curves))
+        constraint_values = np.array(objective.get_constraint_values(prd_curves))
+        for i in range(len(prd_curves)):
+            partial_curves = [prd_curve if j == i else None for j, prd_curve in enumerate(prd_curves)]
+            assert np.all(np.array(objective.get_error_values(partial_curves)) <= error_values)
+            assert np.all(np.array(objective.get_constraint_values(partial_curves)) <= constraint_values)
+
+# A pool that stops every evaluation before it finishes
+class StoppingPool:
+
+    # Constructor
+    def __init__(self, objective):
+        self.objective = objective
+
+    # Evaluates the parameters as if they were stopped
+    def evaluate(self, params_list, batched=False, bound_errors=None):
+        return [evaluate_curves(self.objective, UnfinishedCurves(), 0) for _ in params_list]
+
+# Tests that evaluations stopped before they finished are not cached
+def test_not_cached(api):
+    api.define_cache()
+    problem = Problem(api.objective, api.recorder)
+    problem.pool = StoppingPool(api.objective)
+    problem.get_model_results(np.array(PARAMS_LIST))
+    api.recorder.close()
+    assert isinstance(problem.model, CachedModel) and len(problem.model.cache) == 0
+
+# Tests that early abortion cannot be used with batched evaluations
+def test_batched(api):
+    api.define_evaluation(batched=True)
+    api.define_early_abort()
+    with pytest.raises(ValueError):
+        api.optimise(2, 4, 4)
+    api.recorder.close()
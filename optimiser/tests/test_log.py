@@ -0,0 +1,42 @@
+"""
+ Title:         Log Tests
+ Description:   For testing the logging of every evaluation to binary columnar files
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import numpy as np
+from modules.logger import Logger, read_log, get_column_path
+
+# Tests that the logged records are read back with the types of their columns
+def test_round_trip(tmp_path):
+    column_info = [("generation", "int32"), ("error", "float64"), ("feasible", "uint8")]
+    logger = Logger(str(tmp_path / "log"), column_info, chunk_size=2)
+    records = [[i, 0.1*i, i % 2] for i in range(5)]
+    for record in records:
+        logger.append(record)
+    logger.close()
+    log = read_log(str(tmp_path / "log"))
+    assert list(log["generation"]) == [0, 1, 2, 3, 4] and log["generation"].dtype == np.int32
+    assert list(log["error"]) == [0.1*i for i in range(5)]
+    assert list(log["feasible"]) == [0, 1, 0, 1, 0] and log["feasible"].dtype == np.uint8
+
+# Tests that incomplete records (e.g., if interrupted while appending) are ignored
+def test_incomplete_records(tmp_path):
+    logger = Logger(str(tmp_path / "log"), [("a", "float64"), ("b", "float64")])
+    logger.append([1, 2])
+    logger.close()
+    with open(get_column_path(str(tmp_path / "log"), "a"), "ab") as file:
+        np.array([3.0]).tofile(file)
+    log = read_log(str(tmp_path / "log"))
+    assert list(log["a"]) == [1] and list(log["b"]) == [2]
+
+# Tests that the initial population is logged as generation 0, and the offspring of each generation after it
+def test_generations(api):
+    api.define_log()
+    api.optimise(num_gens=4, init_pop=20, offspring=10)
+    log = read_log(api.get_output("moga_log"))
+    generations, counts = np.unique(log["generation"], return_counts=True)
+    assert list(generations) == [0, 1, 2, 3]
+    assert list(counts) == [20, 10, 10, 10]
@@ -0,0 +1,55 @@
+"""
+ Title:         Model Tests
+ Description:   For testing that the batched predictions of the models equal their predictions of each individual
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import numpy as np
+import pytest
+from __model_factory__ import get_model
+
+# Number of parameter sets to compare for each model
+NUM_SAMPLES = 200
+
+# Returns parameter sets within the bounds of a model
+#   (half are sampled uniformly, as by the optimiser, and half uniformly over the orders of magnitude)
+def get_params_list(model, num_samples, seed=0):
+    random = np.random.default_rng(seed)
+    lower_bounds = np.array(model.get_param_lower_bounds(), dtype=float)
+    upper_bounds = np.array(model.get_param_upper_bounds(), dtype=float)
+    uniform_list = lower_bounds + random.random((num_samples//2, len(lower_bounds))) * (upper_bounds - lower_bounds)
+    signs = np.where(upper_bounds > 0, 1, -1)
+    log_bounds = np.log10(np.sort(np.abs([lower_bounds, upper_bounds]), axis=0))
+    log_uniform_list = signs * 10**(log_bounds[0] + random.random((num_samples - num_samples//2, len(lower_bounds))) * (log_bounds[1] - log_bounds[0]))
+    return np.vstack([uniform_list, log_uniform_list])
+
+# Tolerance of the predicted strains, relative to the largest strain of the curve
+#   (vectorised powers may differ from scalar powers in the last bit, which the KR model amplifies by subtracting
+#   nearly equal numbers at small times)
+TOLERANCE = 1e-5
+
+# Checks that predicted curves have the same times, and strains within the tolerance
+def check_equal(prd_curves, expected_curves, params):
+    message = f"Different predictions for {list(params)}"
+    assert len(prd_curves) == len(expected_curves), message
+    for prd_curve, expected_curve in zip(prd_curves, expected_curves):
+        assert list(prd_curve["x"]) == list(expected_curve["x"]), message
+        scale = np.max(np.abs(expected_curve["y"])) if len(expected_curve["y"]) > 0 else 0
+        assert np.allclose(prd_curve["y"], expected_curve["y"], rtol=0, atol=TOLERANCE*scale), message
+
+# Tests that the batched predictions equal the predictions of each individual (including failed predictions)
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("model_name, args", [("th", []), ("thkr", []), ("thkr_s", [3.2237e-13, 4.9694, -0.24685])])
+def test_batch(creep_curves, model_name, args):
+    model = get_model(model_name, creep_curves, args)
+    params_list = get_params_list(model, NUM_SAMPLES)
+    prd_curves_list = model.get_prd_curves_batch(params_list)
+    assert len(prd_curves_list) == len(params_list)
+    num_valid = 0
+    for params, prd_curves in zip(params_list, prd_curves_list):
+        expected_curves = model.get_prd_curves(*params)
+        check_equal(prd_curves, expected_curves, params)
+        num_valid += 0 if model.ensure_validity(expected_curves) == [] else 1
+    assert num_valid > 0
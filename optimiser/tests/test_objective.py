@@ -0,0 +1,44 @@
+"""
+ Title:         Objective Tests
+ Description:   For testing that the batched errors and constraints equal those of each individual
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import numpy as np
+from __model_factory__ import get_model
+from curve import get_curve
+from modules.errors.__error_factory__ import get_error_list
+from modules.constraints.__constraint_factory__ import get_constraint_list
+from modules.moga.objective import Objective, BIG_VALUE
+
+# Returns predicted curves that differ from the experimental curves (in their values and number of points)
+def get_prd_curves(exp_curves, scale, num_points):
+    prd_curves = []
+    for exp_curve in exp_curves:
+        x_list = np.linspace(0, exp_curve["x"][-1] * scale, num_points)
+        y_list = scale * 1e-4 * (exp_curve["stress"]/10)**2 * x_list**0.5
+        prd_curves.append(get_curve(x_list, y_list, {key: exp_curve[key] for key in exp_curve.keys() if not key in ["x", "y"]}))
+    return prd_curves
+
+# Tests that the batched errors and constraints equal those evaluated for each individual
+#   (including failed predictions, violated constraints, and curves that have not been simulated yet)
+def test_batch(creep_curves):
+    error_list = get_error_list("creep", ["dy_area", "x_area", "y_area", "x_end", "y_end"], creep_curves)
+    constraint_list = get_constraint_list("creep", ["dec_x_end", "inc_y_end"], creep_curves)
+    objective = Objective(get_model("th", creep_curves), error_list, constraint_list)
+    prd_curves_list = [
+        get_prd_curves(creep_curves, 1.0, 200),
+        get_prd_curves(creep_curves, 0.8, 37),
+        get_prd_curves(creep_curves, 1.3, 500),
+        [],
+        [get_prd_curves(creep_curves, 0.9, 120)[0], None],
+        [get_prd_curves(creep_curves, 1.1, 80)[1], get_prd_curves(creep_curves, 0.7, 150)[0]], # violates the constraints
+    ]
+    error_values_list, constraint_values_list = objective.get_values_batch(prd_curves_list)
+    for i, prd_curves in enumerate(prd_curves_list):
+        assert np.allclose(error_values_list[i], objective.get_error_values(prd_curves))
+        assert np.allclose(constraint_values_list[i], objective.get_constraint_values(prd_curves))
+    assert np.all(error_values_list[3] == BIG_VALUE) and np.all(error_values_list[:3] < BIG_VALUE)
+    assert np.isclose(constraint_values_list[5][0], 2000*1.1 - 2000*0.7)
@@ -0,0 +1,22 @@
+"""
+ Title:         Parallel Model Tests
+ Description:   For testing that the processes of a parallel model are closed when the optimisation finishes
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+from conftest import get_api
+
+# Tests that the pool is closed after the optimisation (and restarted if the model is used again)
+def test_close(creep_curves, tmp_path):
+    api = get_api(creep_curves, str(tmp_path), num_processes=2)
+    api.define_cache()
+    parallel_model = api.model.get_model()
+    api.optimise(2, 4, 4)
+    assert parallel_model.pool == None
+    prd_curves = api.model.get_specified_prd_curves([1e-6, 2.0, -0.5], creep_curves)
+    expected_curves = parallel_model.get_model().get_specified_prd_curves([1e-6, 2.0, -0.5], creep_curves)
+    api.close_model()
+    assert parallel_model.pool == None
+    assert [list(curve["y"]) for curve in prd_curves] == [list(curve["y"]) for curve in expected_curves]
@@ -0,0 +1,54 @@
+"""
+ Title:         Reader Tests
+ Description:   For testing that the cache of the experimental data is reused until the files change
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import os
+import pytest
+import modules.reader as reader
+
+# Writes a file of experimental data (with the same size for any single-digit scale)
+def write_data(file_path, scale):
+    with open(file_path, "w") as file:
+        file.write("x,y,stress,temp,type\n")
+        file.write(f"0.0,0.{scale}0,80,800,creep\n")
+        file.write(f"1.0,0.{scale}5,,,\n")
+
+# Returns the data and conditions of curves (for comparing them)
+def get_contents(curves):
+    return [(list(curve["x"]), list(curve["y"]), {key: curve[key] for key in curve.keys() if not key in ["x", "y"]}) for curve in curves]
+
+# Tests that the cached data is reused, and invalidated when the modification time changes
+def test_cache(tmp_path, monkeypatch):
+    file_paths = [str(tmp_path / "a.csv"), str(tmp_path / "b.csv")]
+    cache_path = str(tmp_path / "cache")
+    write_data(file_paths[0], 1)
+    write_data(file_paths[1], 2)
+    exp_curves = reader.read_experimental_data(file_paths, num_processes=1, cache_path=None)
+    assert [list(curve["y"]) for curve in exp_curves] == [[0.1, 0.15], [0.2, 0.25]]
+    assert exp_curves[0]["stress"] == 80 and exp_curves[0]["type"] == "creep"
+    assert get_contents(reader.read_experimental_data(file_paths, num_processes=1, cache_path=cache_path)) == get_contents(exp_curves)
+
+    # Read unchanged files from the cache (without parsing them)
+    with monkeypatch.context() as patch:
+        patch.setattr(reader, "read_curve", lambda file_path: pytest.fail(f"'{file_path}' was parsed"))
+        cached_curves = reader.read_experimental_data(file_paths, num_processes=1, cache_path=cache_path)
+    assert get_contents(cached_curves) == get_contents(exp_curves)
+
+    # Change a file without changing its size, and only reparse it once its modification time changes
+    stat = os.stat(file_paths[0])
+    write_data(file_paths[0], 3)
+    os.utime(file_paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    stale_curves = reader.read_experimental_data(file_paths, num_processes=1, cache_path=cache_path)
+    assert list(stale_curves[0]["y"]) == [0.1, 0.15]
+    os.utime(file_paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    parsed_file_paths, read_curve = [], reader.read_curve
+    with monkeypatch.context() as patch:
+        patch.setattr(reader, "read_curve", lambda file_path: parsed_file_paths.append(file_path) or read_curve(file_path))
+        new_curves = reader.read_experimental_data(file_paths, num_processes=1, cache_path=cache_path)
+    assert parsed_file_paths == [file_paths[0]]
+    assert [list(curve["y"]) for curve in new_curves] == [[0.3, 0.35], [0.2, 0.25]]
+    assert get_contents(reader.read_experimental_data(file_paths, num_processes=1, cache_path=cache_path)) == get_contents(new_curves)
@@ -0,0 +1,78 @@
+"""
+ Title:         Recorder Tests
+ Description:   For testing the recording of the results
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import threading, warnings
+from conftest import get_api
+from modules.writer import Writer
+from modules import recorder as recorder_module
+
+# Parameters of the TH model
+PARAMS = [1e-6, 2.0, -0.5]
+
+# A model that warns when it predicts curves
+class WarningModel:
+
+    # Constructor
+    def __init__(self, model):
+        self.model = model
+
+    # Passes everything else to the wrapped model
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    # Gets the predicted curves for specified curves (with a warning)
+    def get_specified_prd_curves(self, params, exp_curves):
+        warnings.warn("overflow", RuntimeWarning)
+        return self.model.get_specified_prd_curves(params, exp_curves)
+
+# Returns a recorder for the TH model
+def get_recorder(train_curves, test_curves, output_path):
+    api = get_api(train_curves, output_path, test_curves, ["y_area"], 1, 1)
+    api.recorder.define_hyperparameters(1, 1, 1, 0.65, 0.35)
+    return api.recorder
+
+# Tests that the warnings of the model are suppressed when simulating the curves of the optimal parameters
+def test_opt_prd_curves_warnings(creep_curves, tmp_path):
+    recorder = get_recorder(creep_curves[:1], creep_curves[1:], str(tmp_path))
+    recorder.update_population(PARAMS, [0.1], [], [])
+    recorder.model = WarningModel(recorder.model)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        prd_train_curves, prd_test_curves = recorder.get_opt_prd_curves()
+    assert len(prd_train_curves) == 1 and len(prd_test_curves) == 1
+
+# Tests that the results are written synchronously by default
+def test_synchronous_default(creep_curves, tmp_path):
+    recorder = get_recorder(creep_curves, [], str(tmp_path))
+    assert recorder.writer == None
+
+# Tests that the snapshots and timings are only written by the writer's thread when asynchronous
+def test_asynchronous_timings(creep_curves, tmp_path, monkeypatch):
+    threads = []
+    monkeypatch.setattr(recorder_module, "is_enabled", lambda: True)
+    monkeypatch.setattr(recorder_module, "write_timings", lambda file_path: threads.append(threading.current_thread()))
+    recorder = get_recorder(creep_curves, [], str(tmp_path))
+    recorder.writer = Writer()
+    recorder.update_population(PARAMS, [0.1], [], [])
+    recorder.write_results(str(tmp_path / "results.xlsx"))
+    recorder.writer.close()
+    assert (tmp_path / "results.xlsx").exists()
+    assert len(threads) == 1 and threads[0] != threading.main_thread()
+
+# Tests that the results are not recorded again when the optimisation stops just after they were recorded
+def test_record_stop(creep_curves, tmp_path, monkeypatch):
+    recorder = get_recorder(creep_curves, [], str(tmp_path))
+    file_paths = []
+    monkeypatch.setattr(recorder, "write_results", lambda file_path: file_paths.append(file_path))
+    recorder.update_results(PARAMS, [0.1], [], [])
+    recorder.record_stop("Stagnated error (1 generations)")
+    assert len(file_paths) == 1
+    recorder.interval = 10
+    recorder.update_results(PARAMS, [0.2], [], [])
+    recorder.record_stop("Reached the maximum time (1s)")
+    assert len(file_paths) == 2
@@ -0,0 +1,50 @@
+"""
+ Title:         Refiner Tests
+ Description:   For testing that the refiner bounds the residuals and reports the starts that do not converge
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import warnings
+import numpy as np
+from modules.moga.problem import Problem
+from modules.moga.refiner import Refiner
+from modules.moga.objective import BIG_VALUE
+
+# A problem whose errors overflow away from its optimum
+class OverflowProblem:
+
+    # Constructor
+    def __init__(self):
+        self.xl, self.xu = [0, 0], [1, 1]
+
+    # Returns errors that are huge, infinite, or NaN away from the optimum
+    def reevaluate(self, params_list):
+        error_values_list = []
+        for params in params_list:
+            distance = np.linalg.norm(params - 0.5)
+            error_values_list.append([1e300 * distance, np.inf if distance > 0.3 else distance, np.nan if distance > 0.6 else distance])
+        return np.array(error_values_list)
+
+# Tests that the residuals are clipped to the big error (so that the jacobian does not overflow)
+def test_residuals():
+    refiner = Refiner(OverflowProblem())
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        residuals = refiner.get_residuals(np.array([0.0, 0.0]))
+        jacobian = refiner.get_jacobian(np.array([0.0, 0.0]))
+    assert np.all(residuals == BIG_VALUE)
+    assert np.all(np.isfinite(jacobian))
+
+# Tests that the starts that do not converge are counted in the summary
+def test_unconverged(api):
+    api.recorder.define_hyperparameters(10, 4, 4, 0.65, 0.35)
+    problem = Problem(api.objective, api.recorder)
+    problem.evaluate(np.array([[1e-6, 2.0, -0.5]]), return_values_of=["F"])
+    refiner = Refiner(problem, num_starts=1, max_iters=1)
+    refiner.refine()
+    api.recorder.close()
+    summary = refiner.get_summary()
+    assert summary["unconverged"] == 1 and summary["evaluations"] > 0
+    assert summary["refined_best"] <= summary["initial_best"]
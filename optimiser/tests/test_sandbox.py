@@ -0,0 +1,50 @@
+"""
+ Title:         Sandbox Tests
+ Description:   For testing the evaluation of individuals in worker processes that time out or crash
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import os, sys, time
+from modules.moga import sandbox as sandbox_module
+from modules.moga.sandbox import Sandbox
+from modules.moga.objective import Objective, BIG_VALUE
+from modules.moga.pool import initialise_worker, evaluate_in_worker
+from modules.errors.__error_factory__ import get_error_list
+
+# Helper libraries
+sys.path += ["../__models__"]
+from __model_factory__ import get_model
+
+# Parameters of the TH model (and parameters that make the worker hang or crash)
+PARAMS, HANG_PARAMS, CRASH_PARAMS = [1e-6, 2.0, -0.5], [-1, 0, 0], [-2, 0, 0]
+
+# Runs a worker process that hangs or crashes for some parameters
+def run_faulty_worker(connection, init_args):
+    initialise_worker(*init_args)
+    while True:
+        task = connection.recv()
+        if task == None:
+            return
+        params, _ = task
+        if list(params) == HANG_PARAMS:
+            time.sleep(60)
+        if list(params) == CRASH_PARAMS:
+            os._exit(1)
+        connection.send(evaluate_in_worker(params))
+
+# Tests that individuals that time out or crash are counted and given big errors, and the workers are replaced
+def test_failures(creep_curves, monkeypatch):
+    monkeypatch.setattr(sandbox_module, "run_worker", run_faulty_worker)
+    objective = Objective(get_model("th", creep_curves), get_error_list("creep", ["y_area"], creep_curves), [])
+    sandbox = Sandbox(objective, 2, timeout=2)
+    try:
+        results = sandbox.evaluate([PARAMS, HANG_PARAMS, CRASH_PARAMS, PARAMS])
+        assert [result[0] == [] for result in results] == [False, True, True, False]
+        assert results[1][1] == [BIG_VALUE] and results[2][1] == [BIG_VALUE]
+        assert sandbox.get_summary() == {"timeouts": 1, "crashes": 1}
+        results = sandbox.evaluate([PARAMS, PARAMS])
+        assert [result[0] == [] for result in results] == [False, False]
+    finally:
+        sandbox.close()
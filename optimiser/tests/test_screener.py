@@ -0,0 +1,37 @@
+"""
+ Title:         Screener Tests
+ Description:   For testing that the individuals rejected by the screener are not counted as evaluations
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import numpy as np
+from modules.logger import read_log
+from modules.moga.problem import Problem
+from modules.moga.objective import BIG_VALUE
+
+# A screener that only accepts the first individual of each population
+class FirstScreener:
+
+    # Returns the indexes of the individuals that should be evaluated
+    def screen(self, params_list):
+        return [0]
+
+    # Ignores the evaluated individuals
+    def add_samples(self, params_list, prd_curves_list):
+        pass
+
+# Tests that rejected individuals are given big errors without being counted, logged, or archived
+def test_screened(api):
+    api.define_log()
+    api.recorder.define_hyperparameters(10, 4, 4, 0.65, 0.35)
+    problem = Problem(api.objective, api.recorder, screener=FirstScreener())
+    params_list = np.array([[1e-6, 2.0, -0.5], [2e-6, 2.0, -0.5], [3e-6, 2.0, -0.5], [4e-6, 2.0, -0.5]])
+    error_values_list = problem.evaluate(params_list, return_values_of=["F"])
+    api.recorder.close()
+    assert np.all(error_values_list[1:] == BIG_VALUE) and np.all(error_values_list[0] < BIG_VALUE)
+    assert api.recorder.num_evals_completed == 1 and api.recorder.num_screened == 3
+    assert api.recorder.num_gens_completed == 1
+    assert len(read_log(api.get_output("moga_log"))["generation"]) == 1
+    assert len(api.recorder.archive) == 1
@@ -0,0 +1,58 @@
+"""
+ Title:         Terminator Tests
+ Description:   For testing the criteria that stop the optimisation
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import time
+import numpy as np
+from modules.archive import Archive
+from modules.moga.terminator import Terminator
+
+# A recorder with an archive (in place of the recorder of an optimisation)
+class ArchiveRecorder:
+
+    # Constructor
+    def __init__(self):
+        self.archive = Archive(1, 2, 0)
+        self.num_evals_completed = 0
+        self.start_time = time.time()
+
+    # Adds an individual to the archive
+    def insert(self, errors):
+        self.archive.insert([0], errors, [])
+        self.num_evals_completed += 1
+
+# Tests that the optimisation stops when the best error stagnates over the window
+def test_error_stagnation():
+    terminator = Terminator("error", window=3, tolerance=0.01)
+    recorder = ArchiveRecorder()
+    stop_reasons = []
+    for i in range(6):
+        recorder.insert([1.0/(i+1), 1.0/(i+1)] if i < 2 else [1.0, 1.0])
+        stop_reasons.append(terminator.update(recorder))
+    assert stop_reasons[:4] == [None] * 4
+    assert stop_reasons[4] == "Stagnated error (3 generations)"
+
+# Tests that the hypervolume is only computed once per window
+def test_hypervolume_sampling(monkeypatch):
+    terminator = Terminator("hypervolume", window=5, tolerance=0.01)
+    num_computed = []
+    get_hypervolume = terminator.get_hypervolume
+    monkeypatch.setattr(terminator, "get_hypervolume", lambda archive: num_computed.append(1) or get_hypervolume(archive))
+    recorder = ArchiveRecorder()
+    recorder.insert([1.0, 2.0])
+    stop_reasons = [terminator.update(recorder) for _ in range(10)]
+    assert len(num_computed) == 2
+    assert stop_reasons.index("Stagnated hypervolume (5 generations)") == 5
+
+# Tests that the budgets stop the optimisation
+def test_budgets():
+    recorder = ArchiveRecorder()
+    recorder.insert([1.0, 1.0])
+    assert Terminator(None, max_evals=1).update(recorder) == "Reached the maximum number of evaluations (1)"
+    recorder.start_time -= 10
+    assert Terminator(None, max_time=5).update(recorder) == "Reached the maximum time (5s)"
+    assert Terminator(None, max_evals=2, max_time=20).update(recorder) == None
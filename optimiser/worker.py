@@ -0,0 +1,104 @@
+"""
+ Title:         Worker
+ Description:   For evaluating individuals for a broker over TCP (python3 worker.py --host <host> --port <port> --authkey <key>)
+ Author:        Janzen Choi
+
+"""
+
+# Libraries
+import argparse, time
+import multiprocessing as mp
+from multiprocessing.connection import Client
+from modules.moga.sandbox import run_worker
+
+# Constants
+AUTHKEY = "calibrate"
+RETRY_INTERVAL = 1
+
+# Runs a process that evaluates the tasks
+#   (the connections inherited from the worker are closed, so that the broker and the evaluator notice if the worker dies)
+def run_evaluator(connection, inherited_connections, init_args):
+    for inherited_connection in inherited_connections:
+        inherited_connection.close()
+    try:
+        run_worker(connection, init_args)
+    except EOFError:
+        return
+
+# Starts a process that evaluates the tasks (so that heartbeats can be sent during long evaluations)
+def start_evaluator(init_args, broker_connection):
+    parent_connection, child_connection = mp.Pipe()
+    process = mp.Process(target=run_evaluator, args=(child_connection, [parent_connection, broker_connection], init_args), daemon=True)
+    process.start()
+    child_connection.close()
+    return process, parent_connection
+
+# Stops the process evaluating the tasks
+def stop_evaluator(evaluator):
+    process, connection = evaluator
+    process.kill()
+    process.join()
+    connection.close()
+
+# Evaluates the tasks of a broker until it stops or is lost
+def serve(connection):
+    evaluator = None
+    try:
+        while True:
+            message = connection.recv()
+
+            # Prepare the model and objective
+            if message[0] == "init":
+                _, init_args, heartbeat = message
+                if evaluator != None:
+                    stop_evaluator(evaluator)
+                evaluator = start_evaluator(init_args, connection)
+
+            # Evaluate a task (sending heartbeats while waiting, and restarting the evaluator if it crashes)
+            elif message[0] == "task":
+                _, task_id, params, bound_errors = message
+                evaluator[1].send((params, bound_errors))
+                while not evaluator[1].poll(heartbeat):
+                    connection.send(("heartbeat",))
+                try:
+                    result, timings = evaluator[1].recv()
+                    connection.send(("result", task_id, result, timings))
+                except (EOFError, OSError):
+                    stop_evaluator(evaluator)
+                    evaluator = start_evaluator(init_args, connection)
+                    connection.send(("crashed", task_id))
+
+            # Stop serving the broker
+            elif message[0] == "stop":
+                return
+    except (EOFError, OSError):
+        return
+    finally:
+        if evaluator != None:
+            stop_evaluator(evaluator)
+        connection.close()
+
+# Connects to brokers and evaluates their tasks (until interrupted)
+def main(host="localhost", port=6000, authkey=AUTHKEY):
+    while True:
+        try:
+            connection = Client((host, port), authkey=authkey.encode())
+        except OSError:
+            time.sleep(RETRY_INTERVAL)
+            continue
+        print(f"Connected to the broker at {host}:{port}")
+        serve(connection)
+        print(f"Disconnected from the broker at {host}:{port}")
+
+# Returns the arguments of the command line
+def get_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluates individuals for a broker over TCP")
+    parser.add_argument("--host", default="localhost", help="host of the broker")
+    parser.add_argument("--port", type=int, default=6000, help="port of the broker")
+    parser.add_argument("--authkey", default=AUTHKEY, help="key that the broker was defined with")
+    return parser.parse_args(argv)
+
+# Main function
+if __name__ == "__main__":
+    arguments = get_arguments()
+    main(arguments.host, arguments.port, arguments.authkey)
@@ -7,9 +7,9 @@
 
 # Libraries
 import sys
-from modules.sampler import Sampler
-from modules.surrogates.__surrogate_factory__ import get_surrogate
-from modules.trainers.__trainer_factory__ import get_trainer
+from .sampler import Sampler
+from .surrogates.__surrogate_factory__ import get_surrogate
+from .trainers.__trainer_factory__ import get_trainer
 
 # Helper libraries
 sys.path += ["../__common__", "../__models__"]
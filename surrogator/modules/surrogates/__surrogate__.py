@@ -28,4 +28,8 @@ class Surrogate:
 
     # Makes a single prediction (placeholder)
     def predict(self):
+        raise NotImplementedError
+
+    # Makes a prediction for each input (placeholder)
+    def predict_batch(self):
         raise NotImplementedError
\ No newline at end of file
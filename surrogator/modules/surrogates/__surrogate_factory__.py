@@ -6,7 +6,7 @@
 """
 
 # surrogates
-from modules.surrogates.ann import ANN
+from .ann import ANN
 
 # Creates and return a surrogate
 def get_surrogate(surrogate_name, input_size, output_size):
@@ -6,7 +6,7 @@
 """
 
 # Libraries
-from modules.surrogates.__surrogate__ import Surrogate
+from .__surrogate__ import Surrogate
 import numpy as np
 import os; os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3" # disable warnings
 import tensorflow.keras as kr
@@ -57,3 +57,9 @@ class ANN(Surrogate):
         x_test = np.array([x_test])
         y_pred = self.model.predict(x_test, batch_size=10)
         return y_pred
+
+    # Makes a prediction for each input
+    def predict_batch(self, x_test_list, batch_size=256):
+        x_test_list = np.array(x_test_list)
+        y_pred_list = self.model.predict(x_test_list, batch_size=batch_size, verbose=0)
+        return y_pred_list
@@ -7,7 +7,7 @@
 
 # Libraries
 import sys
-from modules.mapper import MultiMapper
+from ..mapper import MultiMapper
 
 # Helper libraries
 sys.path.append("../__common__")
@@ -6,8 +6,8 @@
 """
 
 # trainers
-from modules.trainers.simple import Simple
-from modules.trainers.strain import Strain
+from .simple import Simple
+from .strain import Strain
 
 # Creates and return a trainer
 def get_trainer(trainer_name, model):
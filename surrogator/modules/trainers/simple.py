@@ -6,7 +6,7 @@
 """
 
 # Libraries
-from modules.trainers.__trainer__ import Trainer
+from .__trainer__ import Trainer
 from scipy.interpolate import splev, splrep, splder
 import math
 